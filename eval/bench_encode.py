@@ -0,0 +1,102 @@
+"""Benchmark: MedCPT article encoding throughput on CPU, fixed vs length-bucketed.
+
+The fixed path encodes chunks in input order in batches of 32, each padded to
+its longest member. The bucketed path (the default in encode_articles) sorts
+by token length and batches by a padded-token budget. Chunks come from the
+built index when available (--from-db), otherwise a synthetic mix of short
+paragraphs and long table chunks.
+
+    python eval/bench_encode.py --n 512
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+import torch
+
+from atheria.config import ARTICLE_MAX_BATCH, ARTICLE_TOKEN_BUDGET
+from atheria.db.connection import get_connection
+from atheria.index import dense_index
+from atheria.index.dense_index import _length_bucketed_batches, encode_articles
+
+
+def _articles_from_db(n: int) -> list[list[str]]:
+    conn = get_connection()
+    try:
+        rows = conn.execute(
+            "SELECT section_path, text FROM chunks ORDER BY rowid LIMIT ?", [n]
+        ).fetchall()
+    finally:
+        conn.close()
+    return [[" → ".join(json.loads(r["section_path"])) or "Section", r["text"]] for r in rows]
+
+
+def _synthetic_articles(n: int, seed: int = 0) -> list[list[str]]:
+    """~85% short paragraphs, ~15% long table-like chunks, shuffled."""
+    rng = random.Random(seed)
+    words = "cardiomyocyte calcium transient action potential duration contractile force " \
+            "maturation electrophysiology assay measurement baseline metric sarcomere".split()
+    articles = []
+    for _ in range(n):
+        n_words = rng.randint(250, 450) if rng.random() < 0.15 else rng.randint(15, 80)
+        articles.append(["Methods → Assessment", " ".join(rng.choices(words, k=n_words))])
+    return articles
+
+
+def _padding_efficiency(lengths: list[int], batches: list[list[int]]) -> float:
+    real = sum(lengths)
+    padded = sum(len(b) * max(lengths[i] for i in b) for b in batches)
+    return real / padded if padded else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--n", type=int, default=512, help="Number of chunks to encode")
+    parser.add_argument("--from-db", action="store_true", help="Use chunks from the built index")
+    parser.add_argument("--threads", type=int, default=None, help="torch intra-op threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    articles = _articles_from_db(args.n) if args.from_db else _synthetic_articles(args.n)
+    if not articles:
+        print("No chunks to encode.")
+        return
+
+    dense_index._ensure_article_model()
+    tok = dense_index._article_tokenizer
+    lengths = [len(ids) for ids in tok(articles, truncation=True, max_length=512)["input_ids"]]
+    fixed_batches = [list(range(i, min(i + 32, len(lengths)))) for i in range(0, len(lengths), 32)]
+    bucketed = _length_bucketed_batches(lengths, ARTICLE_TOKEN_BUDGET, ARTICLE_MAX_BATCH)
+
+    encode_articles(articles[:8])  # warm-up
+    runs = {}
+    for name, kwargs in (
+        ("fixed", {"batch_size": 32, "token_budget": None}),
+        ("bucketed", {}),
+    ):
+        start = time.perf_counter()
+        encode_articles(articles, **kwargs)
+        runs[name] = time.perf_counter() - start
+
+    print(f"{len(articles)} chunks, torch threads={torch.get_num_threads()}")
+    print(
+        f"   fixed: {len(articles) / runs['fixed']:7.1f} chunks/s  "
+        f"padding efficiency {_padding_efficiency(lengths, fixed_batches):.0%}"
+    )
+    print(
+        f"bucketed: {len(articles) / runs['bucketed']:7.1f} chunks/s  "
+        f"padding efficiency {_padding_efficiency(lengths, bucketed):.0%}"
+    )
+    print(f"speedup: {runs['fixed'] / runs['bucketed']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
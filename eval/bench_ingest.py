@@ -0,0 +1,130 @@
+"""Benchmark: SQLite write throughput for ingesting a thousand-paper corpus.
+
+Compares the legacy per-row write path (one execute per paper, chunk and
+vector under default PRAGMAs) with the bulk path used by build_index
+(executemany over pre-serialized rows in one bulk_load transaction).
+Parsing and encoding are excluded; papers, chunks and embeddings are
+synthetic so only the write path is measured.
+
+    python eval/bench_ingest.py --papers 1000 --chunks-per-paper 40
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from atheria.db.connection import bulk_load, get_connection, has_vec0_module
+from atheria.db.migrations import apply_migrations
+from atheria.db.repositories.chunk_repo import ChunkRepository
+from atheria.db.repositories.paper_repo import PaperRepository
+from atheria.index.dense_index import store_embeddings
+from atheria.models.chunk import Chunk, ChunkType
+from atheria.models.paper import Paper
+
+try:
+    import sqlite_vec
+except Exception:  # pragma: no cover - optional dependency at runtime
+    sqlite_vec = None  # type: ignore[assignment]
+
+
+def synth_corpus(n_papers: int, chunks_per_paper: int, dim: int = 768, seed: int = 0):
+    """Return (papers, chunks, embeddings) shaped like a parsed PMC corpus."""
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(5000)]
+    papers: list[Paper] = []
+    chunks: list[Chunk] = []
+    for p in range(n_papers):
+        paper = Paper.create(
+            title=f"Synthetic paper {p}",
+            pmid=str(10_000_000 + p),
+            source_url=f"synthetic://{p}",
+            metadata={"doi": f"10.0000/synthetic.{p}"},
+        )
+        papers.append(paper)
+        for c in range(chunks_per_paper):
+            text = " ".join(rng.choices(vocab, k=120))
+            chunks.append(
+                Chunk.create(
+                    paper_id=str(paper.paper_id),
+                    chunk_type=ChunkType.PARAGRAPH,
+                    section_path=["Methods", f"Subsection {c % 5}"],
+                    page_start=1 + c // 10,
+                    page_end=1 + c // 10,
+                    text=text,
+                )
+            )
+    embeddings = [[rng.random() for _ in range(dim)] for _ in chunks]
+    return papers, chunks, embeddings
+
+
+def _legacy_write(conn, papers, chunks, embeddings, with_vec: bool) -> None:
+    paper_repo = PaperRepository(conn)
+    chunk_repo = ChunkRepository(conn)
+    for paper in papers:
+        paper_repo.insert(paper)
+    for chunk in chunks:
+        chunk_repo.insert(chunk)
+    if with_vec:
+        for chunk, embedding in zip(chunks, embeddings):
+            conn.execute(
+                "INSERT INTO vec_chunks(embedding, paper_id, chunk_id) VALUES (?, ?, ?)",
+                [sqlite_vec.serialize_float32(embedding), str(chunk.paper_id), chunk.chunk_id],
+            )
+    conn.commit()
+
+
+def _bulk_write(conn, papers, chunks, embeddings, with_vec: bool) -> None:
+    with bulk_load(conn):
+        PaperRepository(conn).insert_many(papers)
+        ChunkRepository(conn).insert_many(chunks)
+        if with_vec:
+            store_embeddings(conn, chunks, embeddings)
+
+
+def run(n_papers: int, chunks_per_paper: int) -> dict:
+    papers, chunks, embeddings = synth_corpus(n_papers, chunks_per_paper)
+    results = {}
+    for name, write in (("legacy", _legacy_write), ("bulk", _bulk_write)):
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = get_connection(Path(tmp) / "bench.db")
+            apply_migrations(conn)
+            with_vec = has_vec0_module(conn) and sqlite_vec is not None
+            rows = len(papers) + len(chunks) + (len(chunks) if with_vec else 0)
+            start = time.perf_counter()
+            write(conn, papers, chunks, embeddings, with_vec)
+            elapsed = time.perf_counter() - start
+            conn.close()
+        results[name] = {
+            "rows": rows,
+            "seconds": elapsed,
+            "rows_per_second": rows / elapsed if elapsed else float("inf"),
+            "vectors": with_vec,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--papers", type=int, default=1000)
+    parser.add_argument("--chunks-per-paper", type=int, default=40)
+    args = parser.parse_args()
+
+    results = run(args.papers, args.chunks_per_paper)
+    for name, r in results.items():
+        vec = "with vectors" if r["vectors"] else "no sqlite-vec"
+        print(
+            f"{name:>6}: {r['rows']} rows in {r['seconds']:.2f}s "
+            f"-> {r['rows_per_second']:,.0f} rows/s ({vec})"
+        )
+    speedup = results["legacy"]["seconds"] / results["bulk"]["seconds"]
+    print(f"speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Benchmark: API throughput and latency under concurrent clients.
+
+Sends POST /api/query (or /api/query/stream) requests from 1, 8 and 32
+concurrent clients against a running server and reports requests/s and
+p50/p99 latency at each level. Queries come from eval/queries.json; each
+request gets a unique suffix by default so the query result, embedding and
+rerank score caches do not turn the run into a cache benchmark.
+
+Run it once per server build under different labels to compare, e.g.
+before and after the async query path; every run is merged into
+eval/bench_load.json and the labels are printed side by side:
+
+    uvicorn atheria.api.app:app &
+    python eval/bench_load.py --label after
+    python eval/bench_load.py --levels 1 8 --requests 64 --endpoint stream
+
+Requires httpx (pip install httpx).
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover - benchmark-only dependency
+    sys.exit("bench_load.py needs httpx: pip install httpx")
+
+ENDPOINTS = {"query": "/api/query", "stream": "/api/query/stream"}
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+async def _client(
+    client: httpx.AsyncClient,
+    path: str,
+    bodies: list[dict],
+    next_body: list[int],
+    latencies: list[float],
+    errors: list[str],
+) -> None:
+    # Clients pull from a shared counter so every level sends exactly len(bodies)
+    while next_body[0] < len(bodies):
+        body = bodies[next_body[0]]
+        next_body[0] += 1
+        start = time.perf_counter()
+        try:
+            r = await client.post(path, json=body)
+            r.raise_for_status()
+        except httpx.HTTPError as exc:
+            errors.append(f"{type(exc).__name__}: {exc}")
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+async def run_level(url: str, path: str, bodies: list[dict], concurrency: int, timeout: float) -> dict:
+    latencies: list[float] = []
+    errors: list[str] = []
+    next_body = [0]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(_client(client, path, bodies, next_body, latencies, errors) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "seconds": elapsed,
+        "req_per_s": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000.0 if latencies else None,
+        "p99_ms": _percentile(latencies, 99) * 1000.0 if latencies else None,
+    }
+
+
+def _bodies(queries: list[str], n: int, top_n: int, unique: bool, offset: int) -> list[dict]:
+    bodies = []
+    for i in range(n):
+        q = queries[i % len(queries)]
+        if unique:
+            q = f"{q} run{offset + i}"
+        bodies.append({"query": q, "top_n": top_n})
+    return bodies
+
+
+def _fmt(ms: float | None) -> str:
+    return f"{ms:8.1f}" if ms is not None else "       -"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server base URL")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="query")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32], help="Concurrent clients")
+    parser.add_argument("--requests", type=int, default=96, help="Requests per level")
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument(
+        "--no-unique", dest="unique", action="store_false",
+        help="Repeat eval queries verbatim (measures the cached path)",
+    )
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout (s)")
+    parser.add_argument("--label", default="run", help="Name of this run in bench_load.json")
+    args = parser.parse_args()
+
+    with open(ROOT / "eval" / "queries.json") as f:
+        queries = [q["query"] for q in json.load(f)]
+
+    # A server still warming up would make the first level measure model loads
+    health = httpx.get(f"{args.url}/api/health", timeout=args.timeout)
+    if health.status_code != 200:
+        print(f"Warning: /api/health returned {health.status_code} ({health.json().get('status')})")
+
+    path = ENDPOINTS[args.endpoint]
+    levels = []
+    for i, concurrency in enumerate(args.levels):
+        bodies = _bodies(queries, args.requests, args.top_n, args.unique, offset=i * args.requests)
+        level = asyncio.run(run_level(args.url, path, bodies, concurrency, args.timeout))
+        levels.append(level)
+        print(
+            f"{concurrency:>3} clients  {level['req_per_s']:7.2f} req/s  "
+            f"p50 {_fmt(level['p50_ms'])} ms  p99 {_fmt(level['p99_ms'])} ms  "
+            f"errors {level['errors']}"
+        )
+
+    out_path = ROOT / "eval" / "bench_load.json"
+    runs = json.loads(out_path.read_text()) if out_path.exists() else {}
+    runs[args.label] = {
+        "url": args.url,
+        "endpoint": path,
+        "requests_per_level": args.requests,
+        "unique_queries": args.unique,
+        "levels": levels,
+    }
+    with open(out_path, "w") as f:
+        json.dump(runs, f, indent=2)
+
+    if len(runs) > 1:
+        print(f"\n{'clients':>7}  " + "  ".join(f"{label:>26}" for label in runs))
+        for concurrency in args.levels:
+            cells = []
+            for run in runs.values():
+                level = next((l for l in run["levels"] if l["concurrency"] == concurrency), None)
+                cells.append(
+                    f"{level['req_per_s']:7.2f}/s p50{_fmt(level['p50_ms'])} p99{_fmt(level['p99_ms'])}"
+                    if level else f"{'-':>26}"
+                )
+            print(f"{concurrency:>7}  " + "  ".join(f"{c:>26}" for c in cells))
+    print(f"Results written to {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Benchmark: ONNX Runtime backends vs eager PyTorch for the three MedCPT models.
+
+For each backend the script encodes the eval queries, encodes a set of
+passages with the article encoder and reranks those passages for each query
+with the cross-encoder, timing each step. Outputs of the ONNX backends are
+checked for parity against eager fp32:
+
+- query / article embeddings: minimum cosine similarity to the eager vector
+- rerank: max absolute score difference, mean Spearman rank correlation of
+  each query's passage ranking, and top-5 overlap
+
+Passages come from the built index when available (--from-db), otherwise
+the synthetic mix from bench_encode.py. Run `atheria export-onnx` first.
+Exits non-zero when a backend misses the parity thresholds.
+
+    python eval/bench_onnx.py --from-db
+    python eval/bench_onnx.py --backends onnx-int8 --passages 64
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "eval"))
+
+import numpy as np
+from transformers import AutoTokenizer
+
+from atheria.config import MEDCPT_ARTICLE_ENCODER, MEDCPT_CROSS_ENCODER, MEDCPT_QUERY_ENCODER
+from atheria.inference.backend import load_model
+from bench_encode import _articles_from_db, _synthetic_articles
+
+PARITY_MIN_COSINE = 0.99  # query / article embeddings vs eager fp32
+PARITY_MIN_SPEARMAN = 0.95  # per-query rerank order vs eager fp32
+
+
+def _ms(samples: list[float]) -> dict:
+    return {
+        "p50_ms": statistics.median(samples) * 1000.0,
+        "mean_ms": statistics.fmean(samples) * 1000.0,
+    }
+
+
+def _ranks(x: np.ndarray) -> np.ndarray:
+    return np.argsort(np.argsort(-x)).astype(np.float64)
+
+
+def _spearman(a: np.ndarray, b: np.ndarray) -> float:
+    ra, rb = _ranks(a), _ranks(b)
+    if ra.std() == 0 or rb.std() == 0:
+        return 1.0
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+def _min_cosine(a: np.ndarray, b: np.ndarray) -> float:
+    num = (a * b).sum(axis=1)
+    den = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    return float((num / np.maximum(den, 1e-12)).min())
+
+
+def run_backend(
+    backend: str,
+    queries: list[str],
+    articles: list[list[str]],
+    tokenizers: dict,
+    batch_size: int,
+) -> dict:
+    """Encode queries and articles and rerank articles per query with one backend."""
+    start = time.perf_counter()
+    query_model = load_model(MEDCPT_QUERY_ENCODER, "cls", backend)
+    article_model = load_model(MEDCPT_ARTICLE_ENCODER, "cls", backend)
+    cross_model = load_model(MEDCPT_CROSS_ENCODER, "logit", backend)
+    load_seconds = time.perf_counter() - start
+
+    q_tok, a_tok, c_tok = tokenizers["query"], tokenizers["article"], tokenizers["cross"]
+    query_model(q_tok(queries[:1], return_tensors="np"))  # warm-up
+    q_times, q_vecs = [], []
+    for q in queries:
+        t = time.perf_counter()
+        enc = q_tok([q], truncation=True, padding=True, return_tensors="np", max_length=64)
+        q_vecs.append(query_model(enc)[0])
+        q_times.append(time.perf_counter() - t)
+
+    a_times, a_vecs = [], []
+    for i in range(0, len(articles), batch_size):
+        t = time.perf_counter()
+        enc = a_tok(
+            articles[i : i + batch_size],
+            truncation=True, padding=True, return_tensors="np", max_length=512,
+        )
+        a_vecs.append(article_model(enc))
+        a_times.append((time.perf_counter() - t) / len(articles[i : i + batch_size]))
+
+    texts = [text for _, text in articles]
+    r_times, r_scores = [], []
+    for q in queries:
+        t = time.perf_counter()
+        enc = c_tok(
+            [[q, text] for text in texts],
+            truncation=True, padding=True, return_tensors="np", max_length=512,
+        )
+        r_scores.append(cross_model(enc))
+        r_times.append(time.perf_counter() - t)
+
+    return {
+        "load_seconds": load_seconds,
+        "query_encode": _ms(q_times),
+        "article_encode_per_passage": _ms(a_times),
+        "rerank_per_query": _ms(r_times),
+        "_queries": np.stack(q_vecs),
+        "_articles": np.concatenate(a_vecs),
+        "_scores": np.stack(r_scores),
+    }
+
+
+def parity(reference: dict, candidate: dict) -> dict:
+    ref_s, cand_s = reference["_scores"], candidate["_scores"]
+    spearman = [_spearman(r, c) for r, c in zip(ref_s, cand_s)]
+    k = min(5, ref_s.shape[1])
+    top_overlap = [
+        len(set(np.argsort(-r)[:k]) & set(np.argsort(-c)[:k])) / k
+        for r, c in zip(ref_s, cand_s)
+    ]
+    result = {
+        "query_min_cosine": _min_cosine(reference["_queries"], candidate["_queries"]),
+        "article_min_cosine": _min_cosine(reference["_articles"], candidate["_articles"]),
+        "rerank_max_abs_diff": float(np.abs(ref_s - cand_s).max()),
+        "rerank_mean_spearman": statistics.fmean(spearman),
+        "rerank_top5_overlap": statistics.fmean(top_overlap),
+    }
+    result["passed"] = (
+        result["query_min_cosine"] >= PARITY_MIN_COSINE
+        and result["article_min_cosine"] >= PARITY_MIN_COSINE
+        and result["rerank_mean_spearman"] >= PARITY_MIN_SPEARMAN
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--backends", nargs="+", default=["onnx", "onnx-int8"],
+        choices=["onnx", "onnx-int8"], help="Backends compared against eager torch",
+    )
+    parser.add_argument("--queries", type=int, default=20, help="Eval queries to use")
+    parser.add_argument("--passages", type=int, default=32, help="Passages per query")
+    parser.add_argument("--batch-size", type=int, default=16, help="Article encode batch")
+    parser.add_argument("--from-db", action="store_true", help="Use chunks from the built index")
+    args = parser.parse_args()
+
+    with open(ROOT / "eval" / "queries.json") as f:
+        queries = [q["query"] for q in json.load(f)][: args.queries]
+    articles = (
+        _articles_from_db(args.passages) if args.from_db else _synthetic_articles(args.passages)
+    )
+    if not articles:
+        print("No passages to score.")
+        return
+    tokenizers = {
+        "query": AutoTokenizer.from_pretrained(MEDCPT_QUERY_ENCODER),
+        "article": AutoTokenizer.from_pretrained(MEDCPT_ARTICLE_ENCODER),
+        "cross": AutoTokenizer.from_pretrained(MEDCPT_CROSS_ENCODER),
+    }
+
+    runs = {}
+    for backend in ["torch", *args.backends]:
+        runs[backend] = run_backend(backend, queries, articles, tokenizers, args.batch_size)
+        r = runs[backend]
+        print(
+            f"{backend:>9}  query {r['query_encode']['p50_ms']:7.1f} ms  "
+            f"rerank x{len(articles)} {r['rerank_per_query']['p50_ms']:8.1f} ms  "
+            f"article {r['article_encode_per_passage']['p50_ms']:6.1f} ms/passage"
+        )
+
+    failed = False
+    for backend in args.backends:
+        runs[backend]["parity"] = p = parity(runs["torch"], runs[backend])
+        failed |= not p["passed"]
+        print(
+            f"{backend:>9}  cosine q {p['query_min_cosine']:.4f} a {p['article_min_cosine']:.4f}  "
+            f"spearman {p['rerank_mean_spearman']:.4f}  top5 {p['rerank_top5_overlap']:.2f}  "
+            f"max|d| {p['rerank_max_abs_diff']:.4f}  {'ok' if p['passed'] else 'FAIL'}"
+        )
+
+    out = {
+        "n_queries": len(queries),
+        "n_passages": len(articles),
+        "runs": {b: {k: v for k, v in r.items() if not k.startswith("_")} for b, r in runs.items()},
+    }
+    out_path = ROOT / "eval" / "bench_onnx.json"
+    with open(out_path, "w") as f:
+        json.dump(out, f, indent=2)
+    print(f"Results written to {out_path}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
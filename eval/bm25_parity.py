@@ -0,0 +1,162 @@
+"""Parity check: BM25Index (numpy CSR) against rank_bm25.BM25Okapi.
+
+Builds both indexes over the same corpus, feeding BM25Index in ingest-sized
+windows plus a deletion and a replacement, so the incremental update path is
+checked too. It then compares every query's scores:
+
+- every document BM25Index returns must score the same in BM25Okapi
+  (absolute difference <= --tol, since tf and lengths are float32)
+- BM25Index must return exactly the documents sharing a query term
+- the top-k order must agree (ties aside)
+
+BM25Okapi ranks every document, so when fewer than k documents share a query
+term its top-k is padded with zero-overlap documents; BM25Index returns only
+the matching documents. The padding is counted and reported, not treated as a
+mismatch. Exits non-zero on any mismatch.
+
+    pip install atheria[dev]  # rank-bm25 is a dev-only dependency
+    python eval/bm25_parity.py --from-db
+    python eval/bm25_parity.py --docs 5000 --queries 500
+"""
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+import numpy as np
+
+try:
+    from rank_bm25 import BM25Okapi
+except ImportError:  # pragma: no cover - dev-only dependency
+    sys.exit("bm25_parity.py needs rank-bm25: pip install atheria[dev]")
+
+from atheria.config import K_SPARSE
+from atheria.db.connection import get_connection
+from atheria.db.repositories.chunk_repo import ChunkRepository
+from atheria.index.bm25_index import BM25Index, _tokenize
+
+
+def _chunks_from_db() -> list[SimpleNamespace]:
+    conn = get_connection()
+    try:
+        return ChunkRepository(conn).load_all_for_bm25()
+    finally:
+        conn.close()
+
+
+def _synthetic_chunks(n: int, seed: int = 0) -> list[SimpleNamespace]:
+    """Zipf-ish vocabulary, so some terms are in over half the documents
+    (exercising the negative-IDF floor)."""
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(2000)]
+    weights = [1.0 / (i + 1) for i in range(len(vocab))]
+    return [
+        SimpleNamespace(
+            chunk_id=f"chunk-{i}",
+            bm25_fields=[" ".join(rng.choices(vocab, weights, k=rng.randint(5, 120)))],
+        )
+        for i in range(n)
+    ]
+
+
+def _text(chunk) -> str:
+    return " ".join(chunk.bm25_fields) if chunk.bm25_fields else getattr(chunk, "text", "")
+
+
+def _queries(chunks: list, n: int, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    with open(ROOT / "eval" / "queries.json") as f:
+        queries = [q["query"] for q in json.load(f)]
+    for _ in range(max(0, n - len(queries))):
+        tokens = _tokenize(_text(rng.choice(chunks)))
+        queries.append(" ".join(rng.sample(tokens, min(len(tokens), rng.randint(1, 6)))))
+    return queries[:n]
+
+
+def build_incremental(chunks: list, window: int) -> tuple[BM25Index, list]:
+    """BM25Index built window by window, then one chunk deleted and one
+    replaced; returns it with the equivalent live corpus for BM25Okapi."""
+    index = BM25Index()
+    for i in range(0, len(chunks), window):
+        index = index.updated(chunks[i : i + window])
+    live = list(chunks)
+    if len(live) > 2:
+        removed = live.pop(0)
+        replaced = SimpleNamespace(chunk_id=live[0].chunk_id, bm25_fields=list(live[-1].bm25_fields))
+        index = index.updated([replaced], [removed.chunk_id])
+        # A replaced chunk moves to the end of the document order
+        live = live[1:] + [replaced]
+    return index, live
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--from-db", action="store_true", help="Use chunks from the built index")
+    parser.add_argument("--docs", type=int, default=2000, help="Synthetic corpus size")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--window", type=int, default=256, help="Chunks per incremental update")
+    parser.add_argument("--k", type=int, default=K_SPARSE, help="Top-k compared")
+    parser.add_argument("--tol", type=float, default=1e-4, help="Max absolute score difference")
+    args = parser.parse_args()
+
+    chunks = _chunks_from_db() if args.from_db else _synthetic_chunks(args.docs)
+    if not chunks:
+        print("No chunks to index.")
+        return
+    index, live = build_incremental(chunks, args.window)
+    okapi = BM25Okapi([_tokenize(_text(c)) for c in live])
+    doc_tokens = [set(_tokenize(_text(c))) for c in live]
+    ids = [c.chunk_id for c in live]
+
+    max_diff = 0.0
+    mismatches: list[str] = []
+    padded_queries = padding_docs = 0
+    queries = _queries(live, args.queries)
+    for query in queries:
+        terms = _tokenize(query)
+        reference = okapi.get_scores(terms)
+        matching = {ids[i] for i, toks in enumerate(doc_tokens) if toks.intersection(terms)}
+        got = index.retrieve(query, k=len(ids))
+        got_scores = dict(got)
+        if set(got_scores) != matching:
+            mismatches.append(f"{query!r}: {len(got_scores)} docs returned, {len(matching)} match")
+            continue
+        by_id = dict(zip(ids, reference))
+        diff = max((abs(s - by_id[cid]) for cid, s in got), default=0.0)
+        max_diff = max(max_diff, diff)
+        if diff > args.tol:
+            mismatches.append(f"{query!r}: score difference {diff:.2e}")
+            continue
+
+        top_ref = np.argsort(-reference, kind="stable")[: args.k]
+        padding = sum(ids[i] not in matching for i in top_ref)
+        padded_queries += padding > 0
+        padding_docs += padding
+        # Compare top-k scores in rank order (ids may swap within ties)
+        ours = [s for _, s in got[: args.k]]
+        theirs = [reference[i] for i in top_ref if ids[i] in matching]
+        if len(ours) != len(theirs) or not np.allclose(ours, theirs, atol=args.tol, rtol=0):
+            mismatches.append(f"{query!r}: top-{args.k} order differs")
+
+    print(f"{len(live)} docs, {len(queries)} queries, top-{args.k}")
+    print(f"max |score difference|: {max_diff:.2e}")
+    print(
+        f"rank_bm25 zero-overlap padding: {padded_queries} queries, "
+        f"{padding_docs} padded docs (not returned by BM25Index)"
+    )
+    for line in mismatches[:20]:
+        print("MISMATCH", line)
+    if mismatches:
+        print(f"{len(mismatches)} mismatching queries")
+        sys.exit(1)
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
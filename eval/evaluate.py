@@ -1,20 +1,56 @@
-"""Evaluation script: Recall@5, MRR."""
+"""Evaluation script: Recall@5, MRR.
 
+    python eval/evaluate.py                      # default fusion and rerank depth
+    python eval/evaluate.py --sweep              # recall/latency curve over fusion x depth
+    python eval/evaluate.py --cascade-sweep      # recall/latency vs cascade width (and off)
+    python eval/evaluate.py --metric-sweep       # recall/latency per dense KNN metric
+
+The live vec_chunks is never rebuilt here (that is 'atheria migrate-vec'): a
+--vec-metric other than the one it is declared for, and every metric in the
+sweep, runs against a temporary copy of the database.
+"""
+
+import argparse
 import json
 import sys
+import tempfile
+import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
 
 # Add project root
 ROOT = Path(__file__).resolve().parent.parent
 sys.path.insert(0, str(ROOT / "src"))
 
+import numpy as np
+
+from atheria.config import (
+    CASCADE,
+    CASCADE_WIDTH,
+    FUSION_METHOD,
+    K_DENSE,
+    RERANK_ADAPTIVE,
+    RERANK_DEPTH,
+    VEC_METRIC,
+)
 from atheria.db.connection import get_connection
-from atheria.db.migrations import apply_migrations
+from atheria.db.migrations import (
+    VEC_TABLE_METRICS,
+    _vec_table_metric,
+    apply_migrations,
+    migrate_vec_metric,
+)
 from atheria.index.build_index import load_state
-from atheria.index.dense_index import SqliteVecAdapter
+from atheria.index.dense_index import SqliteVecAdapter, encode_query, retrieve_dense
 from atheria.retrieval.formatter import format_results
+from atheria.retrieval.fusion import FUSION_METHODS
 from atheria.retrieval.hybrid import hybrid_retrieve
 
+SWEEP_DEPTHS = (10, 20, 40, 100)
+CASCADE_SWEEP_WIDTHS = (8, 16, 24, 40)
+METRIC_SWEEP = ("l2", "cosine", "ip-rescored")
+
 
 def _section_match(retrieved_path: str, correct_path: str) -> bool:
     """Check if retrieved section path matches correct (substring or equality)."""
@@ -32,28 +68,41 @@ def _section_match(retrieved_path: str, correct_path: str) -> bool:
 def evaluate(
     queries_path: str | Path | None = None,
     top_n: int = 5,
+    fusion: str = FUSION_METHOD,
+    rerank_depth: int = RERANK_DEPTH,
+    adaptive: bool = RERANK_ADAPTIVE,
+    cascade: bool = CASCADE,
+    cascade_width: int = CASCADE_WIDTH,
+    vec_metric: str = VEC_METRIC,
+    db_path: str | Path | None = None,
 ) -> dict:
-    """Run evaluation. Returns dict with Recall@5, MRR, and per-query details."""
+    """Run evaluation. Returns dict with Recall@5, MRR, latency, and per-query details.
+
+    db_path defaults to the live database. Its vec_chunks is not rebuilt, so
+    for a vec_metric it is not declared for, pass a copy from _vec_metric_db.
+    """
     queries_path = queries_path or ROOT / "eval" / "queries.json"
 
     with open(queries_path) as f:
         queries = json.load(f)
 
-    conn = get_connection()
-    apply_migrations(conn)
+    conn = get_connection(db_path)
+    apply_migrations(conn, vec_metric)
+    dense = SqliteVecAdapter(conn, metric=vec_metric)
     paper_by_id, chunk_by_id, bm25 = load_state(conn)
-    dense = SqliteVecAdapter(conn)
 
     recall_at_5 = 0.0
     mrr_sum = 0.0
     n = len(queries)
     details = []
+    total_seconds = 0.0
 
     for q in queries:
         query = q["query"]
         correct_path = q.get("correct_section_path", "")
         correct_chunk_ids = set(q.get("correct_chunk_ids", []))
 
+        start = time.perf_counter()
         results = hybrid_retrieve(
             query,
             bm25,
@@ -62,7 +111,13 @@ def evaluate(
             paper_by_id,
             top_n=top_n,
             use_query_expansion=True,
+            fusion=fusion,
+            rerank_depth=rerank_depth,
+            adaptive=adaptive,
+            cascade=cascade,
+            cascade_width=cascade_width,
         )
+        total_seconds += time.perf_counter() - start
         formatted = format_results(results, paper_by_id)
 
         found_rank = None
@@ -90,14 +145,223 @@ def evaluate(
         "recall_at_5": recall_at_5 / n if n else 0,
         "mrr": mrr_sum / n if n else 0,
         "n_queries": n,
+        "fusion": fusion,
+        "rerank_depth": rerank_depth,
+        "adaptive": adaptive,
+        "cascade_width": cascade_width if cascade else None,
+        "vec_metric": vec_metric,
+        "latency_ms": total_seconds / n * 1000.0 if n else 0,
         "details": details,
     }
 
 
+def sweep(
+    queries_path: str | Path | None = None,
+    depths=SWEEP_DEPTHS,
+    adaptive: bool = RERANK_ADAPTIVE,
+) -> list[dict]:
+    """Recall@5 / MRR / latency for every fusion method at each rerank depth."""
+    evaluate(queries_path, rerank_depth=min(depths))  # warm models and caches
+    rows = []
+    for fusion in FUSION_METHODS:
+        for depth in depths:
+            r = evaluate(queries_path, fusion=fusion, rerank_depth=depth, adaptive=adaptive)
+            rows.append({k: v for k, v in r.items() if k != "details"})
+            print(
+                f"{fusion:>8}  depth {depth:4d}  Recall@5 {r['recall_at_5']:.3f}  "
+                f"MRR {r['mrr']:.3f}  {r['latency_ms']:8.1f} ms/query"
+            )
+    return rows
+
+
+def cascade_sweep(
+    queries_path: str | Path | None = None,
+    widths=CASCADE_SWEEP_WIDTHS,
+    adaptive: bool = RERANK_ADAPTIVE,
+) -> list[dict]:
+    """Recall@5 / MRR / latency with the cascade off and at each first-stage width."""
+    evaluate(queries_path, cascade=False)  # warm models and caches
+    rows = []
+    for width in (None, *widths):
+        r = evaluate(
+            queries_path, adaptive=adaptive, cascade=width is not None,
+            cascade_width=width or CASCADE_WIDTH,
+        )
+        rows.append({k: v for k, v in r.items() if k != "details"})
+        label = "off" if width is None else f"{width:3d}"
+        print(
+            f"cascade {label:>3}  Recall@5 {r['recall_at_5']:.3f}  "
+            f"MRR {r['mrr']:.3f}  {r['latency_ms']:8.1f} ms/query"
+        )
+    return rows
+
+
+@contextmanager
+def _vec_metric_db(vec_metric: str) -> Iterator[Path | None]:
+    """Database to evaluate vec_metric on: None (the live one) if its
+    vec_chunks is already declared for vec_metric or has not been built,
+    else a temporary copy with vec_chunks rebuilt for it."""
+    conn = get_connection()
+    try:
+        current = _vec_table_metric(conn) if SqliteVecAdapter(conn).available else None
+    finally:
+        conn.close()
+    if current is None or current == VEC_TABLE_METRICS[vec_metric]:
+        yield None
+        return
+    with tempfile.TemporaryDirectory(prefix="atheria-eval-") as tmp:
+        path = Path(tmp) / "atheria.db"
+        _copy_db(path)
+        _rebuild_vec(path, vec_metric)
+        yield path
+
+
+def _copy_db(path: Path) -> None:
+    """Copy the live database to path (SQLite online backup, WAL included)."""
+    conn = get_connection()
+    copy = get_connection(path)
+    try:
+        conn.backup(copy)
+    finally:
+        copy.close()
+        conn.close()
+
+
+def _rebuild_vec(path: Path, vec_metric: str) -> None:
+    conn = get_connection(path)
+    try:
+        migrate_vec_metric(conn, vec_metric)
+    finally:
+        conn.close()
+
+
+def _dense_stats(
+    queries: list[str], metric: str, k: int = K_DENSE, db_path: str | Path | None = None
+) -> dict:
+    """Dense-only KNN latency and overlap of its top-k with exact inner-product top-k."""
+    conn = get_connection(db_path)
+    try:
+        rows = conn.execute("SELECT chunk_id, embedding FROM vec_chunks").fetchall()
+        if not rows:
+            return {}
+        ids = [r["chunk_id"] for r in rows]
+        matrix = np.frombuffer(b"".join(r["embedding"] for r in rows), dtype=np.float32)
+        matrix = matrix.reshape(len(rows), -1)
+        embeddings = [encode_query(q) for q in queries]
+        seconds, overlap = 0.0, 0.0
+        for emb in embeddings:
+            start = time.perf_counter()
+            hits = retrieve_dense(conn, emb, k, metric=metric)
+            seconds += time.perf_counter() - start
+            exact = matrix @ np.asarray(emb, dtype=np.float32)
+            top = {ids[i] for i in np.argsort(-exact)[:k]}
+            overlap += len(top & {cid for cid, _ in hits}) / min(k, len(ids))
+    finally:
+        conn.close()
+    return {
+        "dense_k": k,
+        "dense_knn_ms": seconds / len(embeddings) * 1000.0,
+        "dense_ip_overlap": overlap / len(embeddings),
+    }
+
+
+def metric_sweep(
+    queries_path: str | Path | None = None,
+    metrics=METRIC_SWEEP,
+    adaptive: bool = RERANK_ADAPTIVE,
+) -> list[dict]:
+    """Recall@5 / MRR / latency per dense KNN metric, plus dense-only KNN
+    latency and top-K_DENSE overlap with an exact inner-product ranking.
+
+    Runs on one temporary copy of the database whose vec_chunks is rebuilt
+    for each metric in turn; the live database is only read.
+    """
+    with open(queries_path or ROOT / "eval" / "queries.json") as f:
+        queries = [q["query"] for q in json.load(f)]
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="atheria-eval-") as tmp:
+        path = Path(tmp) / "atheria.db"
+        _copy_db(path)
+        for i, metric in enumerate(metrics):
+            _rebuild_vec(path, metric)
+            if i == 0:
+                evaluate(queries_path, vec_metric=metric, db_path=path)  # warm models and caches
+            r = evaluate(queries_path, adaptive=adaptive, vec_metric=metric, db_path=path)
+            row = {k: v for k, v in r.items() if k != "details"}
+            row.update(_dense_stats(queries, metric, db_path=path))
+            rows.append(row)
+            print(
+                f"{metric:>11}  Recall@5 {r['recall_at_5']:.3f}  MRR {r['mrr']:.3f}  "
+                f"{r['latency_ms']:8.1f} ms/query  dense {row.get('dense_knn_ms', 0.0):6.2f} ms  "
+                f"ip overlap@{K_DENSE} {row.get('dense_ip_overlap', 0.0):.3f}"
+            )
+    return rows
+
+
 def main():
-    result = evaluate()
+    parser = argparse.ArgumentParser(description="Evaluate retrieval: Recall@5, MRR")
+    parser.add_argument("--queries", default=None, help="Queries JSON (default eval/queries.json)")
+    parser.add_argument("--fusion", default=FUSION_METHOD, choices=sorted(FUSION_METHODS))
+    parser.add_argument("--depth", type=int, default=RERANK_DEPTH, help="Candidates reranked")
+    parser.add_argument(
+        "--exhaustive", action="store_true",
+        help="Rerank every candidate up to --depth (disable adaptive early cutoff)",
+    )
+    parser.add_argument(
+        "--sweep", action="store_true",
+        help=f"Recall/latency curve over fusion methods x depths {SWEEP_DEPTHS}",
+    )
+    parser.add_argument("--no-cascade", action="store_true", help="Skip the cascade first stage")
+    parser.add_argument(
+        "--cascade-width", type=int, default=CASCADE_WIDTH, help="Cascade survivors reranked"
+    )
+    parser.add_argument(
+        "--cascade-sweep", action="store_true",
+        help=f"Recall/latency with the cascade off and at widths {CASCADE_SWEEP_WIDTHS}",
+    )
+    parser.add_argument(
+        "--vec-metric", default=VEC_METRIC, choices=sorted(VEC_TABLE_METRICS),
+        help="Dense KNN metric (runs on a temporary copy of the DB if vec_chunks is declared for another)",
+    )
+    parser.add_argument(
+        "--metric-sweep", action="store_true",
+        help=f"Recall/latency and exact-inner-product overlap for metrics {METRIC_SWEEP}",
+    )
+    args = parser.parse_args()
+
+    if args.metric_sweep:
+        rows = metric_sweep(args.queries, adaptive=not args.exhaustive)
+        out_path = ROOT / "eval" / "metric_sweep.json"
+        with open(out_path, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"Sweep written to {out_path}")
+        return
+
+    if args.cascade_sweep:
+        rows = cascade_sweep(args.queries, adaptive=not args.exhaustive)
+        out_path = ROOT / "eval" / "cascade_sweep.json"
+        with open(out_path, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"Sweep written to {out_path}")
+        return
+
+    if args.sweep:
+        rows = sweep(args.queries, adaptive=not args.exhaustive)
+        out_path = ROOT / "eval" / "fusion_sweep.json"
+        with open(out_path, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"Sweep written to {out_path}")
+        return
+
+    with _vec_metric_db(args.vec_metric) as db_path:
+        result = evaluate(
+            args.queries, fusion=args.fusion, rerank_depth=args.depth, adaptive=not args.exhaustive,
+            cascade=not args.no_cascade, cascade_width=args.cascade_width,
+            vec_metric=args.vec_metric, db_path=db_path,
+        )
     print("Recall@5:", f"{result['recall_at_5']:.3f}")
     print("MRR:", f"{result['mrr']:.3f}")
+    print("Latency:", f"{result['latency_ms']:.1f} ms/query")
     print("N queries:", result["n_queries"])
 
     out_path = ROOT / "eval" / "eval_results.json"
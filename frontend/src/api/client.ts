@@ -1,4 +1,11 @@
-import type { ChunkContextOut, Paper, QueryResponse, Topic, TopicDrillDown } from "../types";
+import type {
+  ChunkContextOut,
+  Paper,
+  QueryResponse,
+  QueryStreamEvent,
+  Topic,
+  TopicDrillDown,
+} from "../types";
 
 const BASE = import.meta.env.VITE_API_URL ?? "";
 
@@ -11,12 +18,14 @@ async function request<T>(path: string, options?: RequestInit): Promise<T> {
   return res.json() as Promise<T>;
 }
 
-export async function postQuery(params: {
+interface QueryParams {
   query: string;
   paper_id?: string;
   top_n?: number;
   use_query_expansion?: boolean;
-}): Promise<QueryResponse> {
+}
+
+export async function postQuery(params: QueryParams): Promise<QueryResponse> {
   return request<QueryResponse>("/api/query", {
     method: "POST",
     headers: { "Content-Type": "application/json" },
@@ -24,6 +33,38 @@ export async function postQuery(params: {
   });
 }
 
+/** POST /api/query/stream, calling onEvent for each NDJSON event as it arrives. */
+export async function streamQuery(
+  params: QueryParams,
+  onEvent: (event: QueryStreamEvent) => void,
+): Promise<void> {
+  const res = await fetch(`${BASE}/api/query/stream`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(params),
+  });
+  if (!res.ok || !res.body) {
+    const text = await res.text();
+    throw new Error(`API error ${res.status}: ${text}`);
+  }
+
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffer += decoder.decode(value, { stream: !done });
+    let newline: number;
+    while ((newline = buffer.indexOf("\n")) >= 0) {
+      const line = buffer.slice(0, newline).trim();
+      buffer = buffer.slice(newline + 1);
+      if (line) onEvent(JSON.parse(line) as QueryStreamEvent);
+    }
+    if (done) break;
+  }
+  if (buffer.trim()) onEvent(JSON.parse(buffer) as QueryStreamEvent);
+}
+
 export async function getPapers(): Promise<Paper[]> {
   return request<Paper[]>("/api/papers");
 }
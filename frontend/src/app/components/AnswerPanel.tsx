@@ -5,6 +5,7 @@ import type { Paper, SectionPointer } from "../../types";
 interface AnswerPanelProps {
   papers: Paper[];
   isLoading: boolean;
+  isReranking: boolean;
   error: string | null;
   results: SectionPointer[];
   selectedResult: SectionPointer | null;
@@ -21,6 +22,7 @@ function confidenceColor(c: SectionPointer["confidence"]) {
 export function AnswerPanel({
   papers,
   isLoading,
+  isReranking,
   error,
   results,
   selectedResult,
@@ -114,6 +116,13 @@ export function AnswerPanel({
       {/* Results */}
       {!isLoading && (
         <div className="flex-1 overflow-y-auto">
+          {isReranking && (
+            <div className="px-4 py-2 flex items-center gap-2 text-xs text-slate-500 border-b border-gray-100">
+              <Loader2 className="w-3 h-3 animate-spin" />
+              Reranking first-stage matches...
+            </div>
+          )}
+
           {results.length === 0 && !error && (
             <div className="p-6 text-center text-sm text-gray-500">
               Submit a query to find relevant paper sections.
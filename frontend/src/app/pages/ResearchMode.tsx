@@ -16,7 +16,7 @@ export interface HistoryItem {
 
 export default function ResearchMode() {
   const { papers } = usePapers();
-  const { results, isLoading, error, search } = useQuery();
+  const { results, isLoading, isReranking, error, search } = useQuery();
   const [queryHistory, setQueryHistory] = useState<HistoryItem[]>([]);
   const [selectedResult, setSelectedResult] = useState<SectionPointer | null>(null);
 
@@ -44,6 +44,7 @@ export default function ResearchMode() {
         <AnswerPanel
           papers={papers}
           isLoading={isLoading}
+          isReranking={isReranking}
           error={error}
           results={results?.results ?? []}
           onSearch={handleSearch}
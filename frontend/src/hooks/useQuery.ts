@@ -1,5 +1,5 @@
-import { useState } from "react";
-import { postQuery } from "../api/client";
+import { useRef, useState } from "react";
+import { streamQuery } from "../api/client";
 import type { QueryResponse } from "../types";
 
 interface SearchParams {
@@ -11,24 +11,40 @@ interface SearchParams {
 export function useQuery() {
   const [results, setResults] = useState<QueryResponse | null>(null);
   const [isLoading, setIsLoading] = useState(false);
+  // First-stage candidates are shown while the cross-encoder reranks them
+  const [isReranking, setIsReranking] = useState(false);
   const [error, setError] = useState<string | null>(null);
+  // Events from a search superseded by a newer one are ignored
+  const latest = useRef(0);
 
   async function search({ query, paperId, topN }: SearchParams) {
+    const id = ++latest.current;
     setIsLoading(true);
+    setIsReranking(false);
     setError(null);
     try {
-      const data = await postQuery({
-        query,
-        paper_id: paperId || undefined,
-        top_n: topN,
-      });
-      setResults(data);
+      await streamQuery(
+        {
+          query,
+          paper_id: paperId || undefined,
+          top_n: topN,
+        },
+        (event) => {
+          if (id !== latest.current) return;
+          setResults(event.response);
+          setIsLoading(false);
+          setIsReranking(event.event === "candidates");
+        },
+      );
     } catch (e: unknown) {
-      setError(e instanceof Error ? e.message : String(e));
+      if (id === latest.current) setError(e instanceof Error ? e.message : String(e));
     } finally {
-      setIsLoading(false);
+      if (id === latest.current) {
+        setIsLoading(false);
+        setIsReranking(false);
+      }
     }
   }
 
-  return { results, isLoading, error, search };
+  return { results, isLoading, isReranking, error, search };
 }
@@ -18,6 +18,12 @@ export interface QueryResponse {
   total: number;
 }
 
+/** One NDJSON line of /api/query/stream: first-stage candidates, then reranked results. */
+export interface QueryStreamEvent {
+  event: "candidates" | "results";
+  response: QueryResponse;
+}
+
 export interface Paper {
   paper_id: string;
   title: string;
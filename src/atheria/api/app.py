@@ -2,81 +2,66 @@
 
 import argparse
 import asyncio
+import json
 import logging
+import os
 import sys
-import threading
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from atheria.api.dependencies import get_bm25_index
+from atheria.api.dependencies import get_bm25_index, get_ingest_jobs
 from atheria.api.routers import chunks, ingest, papers, query, topics
-from atheria.config import RAW_DIR
+from atheria.config import RAW_DIR, RERANK_BATCHING, VEC_METRIC
 from atheria.db.connection import get_connection
-from atheria.db.migrations import apply_migrations
+from atheria.db.migrations import VEC_TABLE_METRICS, apply_migrations, migrate_vec_metric
+from atheria.db.pool import get_connection_pool
+from atheria.db.readers import get_reader_pool
 from atheria.db.repositories.chunk_repo import ChunkRepository
 from atheria.db.repositories.paper_repo import PaperRepository
 from atheria.index.dense_index import SqliteVecAdapter, count_embeddings
+from atheria.index.query_cache import get_query_embedding_cache
+from atheria.inference.backend import configure_threads
+from atheria.inference.executor import get_inference_executor
+from atheria.retrieval.batching import get_rerank_batcher
 from atheria.retrieval.formatter import format_results
 from atheria.retrieval.hybrid import hybrid_retrieve
+from atheria.retrieval.reranker import get_reranker
+from atheria.retrieval.score_cache import get_pair_score_cache
+from atheria.services.result_cache import get_query_result_cache
+from atheria.services.warmup import get_model_warmup
 from atheria.schemas.papers import HealthOut
 
 logger = logging.getLogger(__name__)
 
 
-def _auto_ingest_raw_dir(conn) -> None:
-    """Index any new files in RAW_DIR that have not yet been indexed."""
-    from atheria.index.build_index import build_index
-
-    raw_path = Path(RAW_DIR)
-    if not raw_path.exists():
-        return
-
-    files = (
-        list(raw_path.glob("*.xml"))
-        + list(raw_path.glob("*.nxml"))
-        + list(raw_path.glob("*.html"))
-        + list(raw_path.glob("*.htm"))
-        + list(raw_path.glob("*.pdf"))
-    )
-    if not files:
-        return
-
-    indexed = {p.source_url for p in PaperRepository(conn).get_all() if p.source_url}
-    new_files = [f for f in files if str(f.resolve()) not in indexed]
-
-    if not new_files:
-        logger.info("Auto-ingest: all files already indexed.")
-        return
-
-    logger.info("Auto-ingest: indexing %d new file(s)...", len(new_files))
-    for f in new_files:
-        build_index(f, append=True)
-    logger.info("Auto-ingest: done.")
-
-
-def _auto_ingest_background() -> None:
-    """Run auto-ingest in a background thread so startup doesn't block."""
-    try:
-        conn = get_connection()
-        _auto_ingest_raw_dir(conn)
-        conn.close()
-    except Exception:
-        logger.exception("Auto-ingest background thread failed")
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Startup: apply schema, warm up BM25, kick off background auto-ingest."""
-    conn = get_connection()
-    apply_migrations(conn)
-    conn.close()
-    get_bm25_index()  # triggers @lru_cache build
-    t = threading.Thread(target=_auto_ingest_background, daemon=True)
-    t.start()
+    """Startup: apply schema, map BM25, size inference threads, warm up the models
+    in the background, queue an auto-ingest job."""
+    with get_connection_pool().writer() as conn:
+        apply_migrations(conn)
+    get_bm25_index()  # maps in the BM25 snapshot (or rebuilds it)
+    # /api/health stays 503 until all three models have loaded and run dummy passes
+    get_model_warmup().start(threads=configure_threads())
+    if RERANK_BATCHING:
+        get_rerank_batcher().start()
+    if Path(RAW_DIR).exists():
+        # Same job pool as POST /api/ingest; the ingest ledger skips unchanged files
+        job = get_ingest_jobs().submit(str(RAW_DIR))
+        logger.info("Auto-ingest: queued job %s for %s", job.job_id, RAW_DIR)
     yield
+    get_ingest_jobs().shutdown()
+    get_inference_executor().shutdown()
+    get_reader_pool().shutdown()
+    # Caches flush their queued side-table writes through the pool's writer
+    get_query_embedding_cache().close()
+    get_pair_score_cache().close()
+    get_connection_pool().close()
+    if RERANK_BATCHING:
+        get_rerank_batcher().stop()
 
 
 def create_app() -> FastAPI:
@@ -100,20 +85,38 @@ def create_app() -> FastAPI:
     _app.include_router(topics.router, prefix="/api")
 
     @_app.get("/api/health", response_model=HealthOut)
-    def health():
-        conn = get_connection()
-        try:
-            paper_count = PaperRepository(conn).count()
-            chunk_count = ChunkRepository(conn).count()
-            vec_count = count_embeddings(conn)
-        finally:
-            conn.close()
-        status = "ok" if chunk_count > 0 else "no_index"
+    async def health(response: Response):
+        paper_count, chunk_count, vec_count = await get_reader_pool().run(
+            lambda conn: (
+                PaperRepository(conn).count(),
+                ChunkRepository(conn).count(),
+                count_embeddings(conn),
+            )
+        )
+        warmup = get_model_warmup()
+        if warmup.ready:
+            status = "ok" if chunk_count > 0 else "no_index"
+        else:
+            status = warmup.status  # pending, warming or failed
+            response.status_code = 503
         return HealthOut(
             status=status,
+            ready=warmup.ready,
             paper_count=paper_count,
             chunk_count=chunk_count,
             vec_count=vec_count,
+            metrics={
+                "warmup": warmup.stats(),
+                "reranker": get_reranker().stats(),
+                "rerank_batcher": get_rerank_batcher().stats(),
+                "inference_executor": get_inference_executor().stats(),
+                "reader_pool": get_reader_pool().stats(),
+                "db_pool": get_connection_pool().stats(),
+                "ingest_jobs": get_ingest_jobs().stats(),
+                "query_embedding_cache": get_query_embedding_cache().stats(),
+                "query_result_cache": get_query_result_cache().stats(),
+                "rerank_score_cache": get_pair_score_cache().stats(),
+            },
         )
 
     return _app
@@ -128,7 +131,7 @@ app = create_app()
 # ---------------------------------------------------------------------------
 
 def main() -> None:
-    """CLI entry point (atheria build / atheria query)."""
+    """CLI entry point (atheria build / query / export-onnx / migrate-vec)."""
     from atheria.index.build_index import build_index, load_state
 
     parser = argparse.ArgumentParser(description="Atheria Section Finder")
@@ -136,20 +139,101 @@ def main() -> None:
 
     build_p = sub.add_parser("build", help="Build index from paper(s)")
     build_p.add_argument("--input", "-i", required=True, help="Path to PMC XML/HTML or dir")
+    build_p.add_argument(
+        "--workers", "-w", type=int, default=1,
+        help="Processes for parsing/chunking (default 1; 0 = all CPUs)",
+    )
 
     query_p = sub.add_parser("query", help="Query for relevant sections")
-    query_p.add_argument("query", nargs="+", help="Query text")
+    query_p.add_argument("query", nargs="*", help="Query text")
+    query_p.add_argument(
+        "--file", "-f", default=None,
+        help="JSONL of queries (QueryRequest objects or strings); prints NDJSON results",
+    )
+    query_p.add_argument("--out", "-o", default=None, help="Write --file results here")
     query_p.add_argument("--paper", "-p", default=None, help="Filter by paper_id")
     query_p.add_argument("--top", "-n", type=int, default=8, help="Number of results")
 
+    export_p = sub.add_parser(
+        "export-onnx", help="Export the MedCPT models to ONNX (fp32 and int8)"
+    )
+    export_p.add_argument("--out", "-o", default=None, help="Output dir (default data/onnx)")
+    export_p.add_argument(
+        "--no-quantize", action="store_true", help="Skip the dynamic int8 graphs"
+    )
+
+    migrate_p = sub.add_parser(
+        "migrate-vec", help="Rebuild vec_chunks for a dense KNN metric (stop the API first)"
+    )
+    migrate_p.add_argument(
+        "--metric", "-m", default=VEC_METRIC, choices=sorted(VEC_TABLE_METRICS),
+        help=f"Dense KNN metric (default VEC_METRIC, {VEC_METRIC!r})",
+    )
+
     args = parser.parse_args()
 
+    if args.cmd == "migrate-vec":
+        conn = get_connection()
+        try:
+            apply_migrations(conn, args.metric)
+            previous = migrate_vec_metric(conn, args.metric)
+        finally:
+            conn.close()
+        table_metric = VEC_TABLE_METRICS[args.metric]
+        if previous is None:
+            print(f"vec_chunks already uses distance metric {table_metric}")
+        else:
+            print(f"Rebuilt vec_chunks: distance metric {previous} -> {table_metric}")
+        return
+
+    if args.cmd == "export-onnx":
+        from atheria.config import ONNX_DIR
+        from atheria.inference.export import export_all
+
+        for path in export_all(args.out or ONNX_DIR, quantize=not args.no_quantize):
+            print(f"Wrote {path}")
+        return
+
     if args.cmd == "build":
-        papers_list, chunks_list = build_index(args.input)
-        print(f"Indexed {len(papers_list)} paper(s), {len(chunks_list)} chunk(s)")
+        def report(result) -> None:
+            line = f"{result.status:>11}  {result.seconds:6.2f}s  {len(result.chunks):4d} chunks  {result.path.name}"
+            print(line + (f"  ({result.error})" if result.error else ""))
+
+        workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+        n_papers, n_chunks = build_index(args.input, workers=workers, on_file=report)
+        print(f"Indexed {n_papers} paper(s), {n_chunks} chunk(s)")
+        return
+
+    if args.cmd == "query" and args.file:
+        from atheria.index.build_index import load_bm25
+        from atheria.schemas.query import QueryBatchItem, QueryRequest
+        from atheria.services.query_service import QueryService
+
+        requests = []
+        with open(args.file) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                obj = json.loads(line)
+                obj = {"query": obj} if isinstance(obj, str) else obj
+                requests.append(QueryRequest(**{"top_n": args.top, "paper_id": args.paper, **obj}))
+
+        conn = get_connection()
+        apply_migrations(conn)
+        out = open(args.out, "w") if args.out else sys.stdout
+        try:
+            responses = QueryService(conn, load_bm25(conn)).search_batch(requests)
+            for i, response in enumerate(responses):
+                out.write(QueryBatchItem(index=i, response=response).model_dump_json() + "\n")
+        finally:
+            conn.close()
+            if out is not sys.stdout:
+                out.close()
         return
 
     if args.cmd == "query":
+        if not args.query:
+            query_p.error("query text or --file is required")
         query_text = " ".join(args.query)
         conn = get_connection()
         apply_migrations(conn)
@@ -1,42 +1,57 @@
 """FastAPI dependency providers."""
 
-import json
-import sqlite3
+import threading
 from functools import lru_cache
-from types import SimpleNamespace
-from typing import Generator
 
-from atheria.db.connection import get_connection
+from atheria.db.pool import get_connection_pool
 from atheria.index.bm25_index import BM25Index
+from atheria.index.build_index import load_bm25
+from atheria.services.ingest_jobs import IngestJobManager
+
+
+_bm25_lock = threading.Lock()
+_bm25: BM25Index | None = None
+# Bumped on every live index update; keys the query result cache
+_index_generation = 0
 
 
-@lru_cache(maxsize=1)
 def get_bm25_index() -> BM25Index:
-    """Build the in-memory BM25 index from bm25_fields stored in the chunks table.
-    Cached for the lifetime of the process; call get_bm25_index.cache_clear()
-    after ingest to trigger a rebuild on next access.
+    """Return the live BM25 index, mapping in the persisted snapshot on first use
+    (rebuilt from the chunks table if stale). Requests keep whichever index
+    object they received, so a concurrent update_bm25_index never affects them.
+    """
+    global _bm25
+    index = _bm25
+    if index is not None:
+        return index
+    with _bm25_lock:
+        if _bm25 is None:
+            with get_connection_pool().reader() as conn:
+                _bm25 = load_bm25(conn)
+        return _bm25
+
+
+def update_bm25_index(added: list, removed_ids: list[str] = ()) -> None:
+    """Apply newly ingested (or deleted) chunks and atomically swap the live index.
+
+    Cost is proportional to the changed chunks: untouched postings segments
+    are shared with the previous index.
     """
-    conn = get_connection()
-    try:
-        rows = conn.execute("SELECT chunk_id, bm25_fields FROM chunks").fetchall()
-    finally:
-        conn.close()
-
-    bm25 = BM25Index()
-    pseudo_chunks = []
-    for row in rows:
-        ns = SimpleNamespace()
-        ns.chunk_id = row["chunk_id"]
-        ns.bm25_fields = json.loads(row["bm25_fields"])
-        pseudo_chunks.append(ns)
-    bm25.add_chunks(pseudo_chunks)
-    return bm25
-
-
-def get_db() -> Generator[sqlite3.Connection, None, None]:
-    """Yield a per-request SQLite connection, closed on teardown."""
-    conn = get_connection()
-    try:
-        yield conn
-    finally:
-        conn.close()
+    global _bm25, _index_generation
+    if not added and not removed_ids:
+        return
+    get_bm25_index()  # make sure there is a base index to extend
+    with _bm25_lock:
+        _bm25 = _bm25.updated(added, removed_ids)
+        _index_generation += 1
+
+
+def get_index_generation() -> int:
+    """Counter that changes whenever ingest adds or removes indexed chunks."""
+    return _index_generation
+
+
+@lru_cache(maxsize=1)
+def get_ingest_jobs() -> IngestJobManager:
+    """Return the process-wide ingest job manager; jobs update the live BM25 index."""
+    return IngestJobManager(on_chunks_indexed=update_bm25_index)
@@ -1,10 +1,8 @@
 """GET /api/chunks endpoints."""
 
-import sqlite3
+from fastapi import APIRouter, HTTPException
 
-from fastapi import APIRouter, Depends, HTTPException
-
-from atheria.api.dependencies import get_db
+from atheria.db.readers import get_reader_pool
 from atheria.db.repositories.chunk_repo import ChunkRepository
 from atheria.schemas.papers import ChunkContextOut, ChunkOut
 
@@ -24,18 +22,18 @@ def _chunk_to_out(chunk) -> ChunkOut:
 
 
 @router.get("/chunks/{chunk_id}", response_model=ChunkOut)
-def get_chunk(chunk_id: str, conn: sqlite3.Connection = Depends(get_db)):
-    repo = ChunkRepository(conn)
-    chunk = repo.get_by_id(chunk_id)
+async def get_chunk(chunk_id: str):
+    chunk = await get_reader_pool().run(lambda conn: ChunkRepository(conn).get_by_id(chunk_id))
     if chunk is None:
         raise HTTPException(status_code=404, detail="Chunk not found")
     return _chunk_to_out(chunk)
 
 
 @router.get("/chunks/{chunk_id}/context", response_model=ChunkContextOut)
-def get_chunk_context(chunk_id: str, conn: sqlite3.Connection = Depends(get_db)):
-    repo = ChunkRepository(conn)
-    prev, current, nxt = repo.get_context(chunk_id)
+async def get_chunk_context(chunk_id: str):
+    prev, current, nxt = await get_reader_pool().run(
+        lambda conn: ChunkRepository(conn).get_context(chunk_id)
+    )
     if current is None:
         raise HTTPException(status_code=404, detail="Chunk not found")
     return ChunkContextOut(
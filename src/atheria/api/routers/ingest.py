@@ -1,19 +1,28 @@
-"""POST /api/ingest endpoint."""
+"""POST /api/ingest and GET /api/ingest/{job_id} endpoints."""
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 
-from atheria.api.dependencies import get_bm25_index
-from atheria.schemas.ingest import IngestRequest, IngestResponse
-from atheria.services.ingest_service import IngestService
+from atheria.api.dependencies import get_ingest_jobs
+from atheria.schemas.ingest import IngestJobOut, IngestRequest
+from atheria.services.ingest_jobs import IngestQueueFull
 
 router = APIRouter()
 
 
-@router.post("/ingest", response_model=IngestResponse)
-def ingest(req: IngestRequest):
-    svc = IngestService()
-    response = svc.run(req.input_path)
-    # Rebuild the cached BM25 index to include newly ingested chunks
-    get_bm25_index.cache_clear()
-    get_bm25_index()
-    return response
+@router.post("/ingest", response_model=IngestJobOut, status_code=202)
+async def ingest(req: IngestRequest):
+    # Runs on the background job pool; new chunks are appended to the live
+    # BM25 index window by window and swapped in atomically
+    try:
+        job = get_ingest_jobs().submit(req.input_path)
+    except IngestQueueFull as exc:
+        raise HTTPException(status_code=429, detail=str(exc))
+    return job.to_out()
+
+
+@router.get("/ingest/{job_id}", response_model=IngestJobOut)
+async def get_ingest_job(job_id: str):
+    job = get_ingest_jobs().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    return job.to_out()
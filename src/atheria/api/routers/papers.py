@@ -1,10 +1,8 @@
 """GET /api/papers endpoints."""
 
-import sqlite3
+from fastapi import APIRouter, HTTPException
 
-from fastapi import APIRouter, Depends, HTTPException
-
-from atheria.api.dependencies import get_db
+from atheria.db.readers import get_reader_pool
 from atheria.db.repositories.chunk_repo import ChunkRepository
 from atheria.db.repositories.paper_repo import PaperRepository
 from atheria.schemas.papers import ChunkOut, PaperOut
@@ -13,9 +11,10 @@ router = APIRouter()
 
 
 @router.get("/papers", response_model=list[PaperOut])
-def list_papers(conn: sqlite3.Connection = Depends(get_db)):
-    repo = PaperRepository(conn)
-    rows = repo.get_all_with_chunk_counts()
+async def list_papers():
+    rows = await get_reader_pool().run(
+        lambda conn: PaperRepository(conn).get_all_with_chunk_counts()
+    )
     return [
         PaperOut(
             paper_id=r["paper_id"],
@@ -30,9 +29,10 @@ def list_papers(conn: sqlite3.Connection = Depends(get_db)):
 
 
 @router.get("/papers/{paper_id}", response_model=PaperOut)
-def get_paper(paper_id: str, conn: sqlite3.Connection = Depends(get_db)):
-    repo = PaperRepository(conn)
-    rows = repo.get_all_with_chunk_counts()
+async def get_paper(paper_id: str):
+    rows = await get_reader_pool().run(
+        lambda conn: PaperRepository(conn).get_all_with_chunk_counts()
+    )
     for r in rows:
         if r["paper_id"] == paper_id:
             return PaperOut(
@@ -47,9 +47,8 @@ def get_paper(paper_id: str, conn: sqlite3.Connection = Depends(get_db)):
 
 
 @router.get("/papers/{paper_id}/chunks", response_model=list[ChunkOut])
-def get_paper_chunks(paper_id: str, conn: sqlite3.Connection = Depends(get_db)):
-    chunk_repo = ChunkRepository(conn)
-    chunks = chunk_repo.get_by_paper(paper_id)
+async def get_paper_chunks(paper_id: str):
+    chunks = await get_reader_pool().run(lambda conn: ChunkRepository(conn).get_by_paper(paper_id))
     return [
         ChunkOut(
             chunk_id=c.chunk_id,
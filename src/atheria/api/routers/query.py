@@ -1,22 +1,94 @@
-"""POST /api/query endpoint."""
+"""POST /api/query, /api/query/stream and /api/query/batch endpoints."""
 
-import sqlite3
+from typing import AsyncIterator, Iterator
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 
-from atheria.api.dependencies import get_bm25_index, get_db
-from atheria.index.bm25_index import BM25Index
-from atheria.schemas.query import QueryRequest, QueryResponse
-from atheria.services.query_service import QueryService
+from atheria.api.dependencies import get_bm25_index, get_index_generation
+from atheria.config import QUERY_BATCH_GROUP
+from atheria.db.pool import get_connection_pool
+from atheria.schemas.query import (
+    QueryBatchItem,
+    QueryBatchRequest,
+    QueryRequest,
+    QueryResponse,
+    QueryStreamEvent,
+)
+from atheria.services.query_service import AsyncQueryService, QueryService
+from atheria.services.result_cache import get_query_result_cache
 
 router = APIRouter()
 
 
 @router.post("/query", response_model=QueryResponse)
-def search(
-    req: QueryRequest,
-    conn: sqlite3.Connection = Depends(get_db),
-    bm25: BM25Index = Depends(get_bm25_index),
-):
-    svc = QueryService(conn, bm25)
-    return svc.search(req)
+async def search(req: QueryRequest):
+    # Read the generation before taking the index: if ingest lands mid-search
+    # the response is stored under the old generation and never served.
+    generation = get_index_generation()
+    cache = get_query_result_cache()
+    cached = cache.get(req, generation)
+    if cached is not None:
+        return cached
+
+    # SQLite and model work run on their own executors; see AsyncQueryService
+    response = await AsyncQueryService(get_bm25_index()).search(req)
+    cache.put(req, generation, response)
+    return response
+
+
+@router.post("/query/stream")
+async def search_stream(req: QueryRequest):
+    """Same search as /query, streamed as NDJSON QueryStreamEvent lines: the
+    first-stage candidates first, then the reranked results. A cached
+    response is sent as a single "results" event."""
+    generation = get_index_generation()
+    cache = get_query_result_cache()
+    cached = cache.get(req, generation)
+
+    async def events() -> AsyncIterator[str]:
+        if cached is not None:
+            yield QueryStreamEvent(event="results", response=cached).model_dump_json() + "\n"
+            return
+        async for event in AsyncQueryService(get_bm25_index()).search_stream(req):
+            if event.event == "results":
+                cache.put(req, generation, event.response)
+            yield event.model_dump_json() + "\n"
+
+    # X-Accel-Buffering: keep reverse proxies from holding back the first event
+    return StreamingResponse(
+        events(), media_type="application/x-ndjson", headers={"X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/query/batch")
+async def search_batch(req: QueryBatchRequest):
+    """Answer many queries, streamed back as NDJSON QueryBatchItem lines in
+    request order. Cached responses are reused; the rest are encoded and
+    reranked in pooled batches."""
+    generation = get_index_generation()
+    cache = get_query_result_cache()
+    cached = [cache.get(q, generation) for q in req.queries]
+    todo = [q for q, hit in zip(req.queries, cached) if hit is None]
+
+    def computed() -> Iterator[QueryResponse]:
+        # A reader is leased per group and released before the group's lines
+        # are sent, so a slow client never pins a connection between groups
+        for start in range(0, len(todo), QUERY_BATCH_GROUP):
+            group = todo[start : start + QUERY_BATCH_GROUP]
+            with get_connection_pool().reader() as conn:
+                responses = list(QueryService(conn, get_bm25_index()).search_batch(group))
+            yield from responses
+
+    # A sync generator: StreamingResponse iterates it on a worker thread, so the
+    # long-running pooled batch never blocks the event loop
+    def lines() -> Iterator[str]:
+        results = computed()
+        for i, (q, hit) in enumerate(zip(req.queries, cached)):
+            response = hit
+            if response is None:
+                response = next(results)
+                cache.put(q, generation, response)
+            yield QueryBatchItem(index=i, response=response).model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
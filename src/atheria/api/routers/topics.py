@@ -1,13 +1,12 @@
 """GET /api/topics endpoints for topic browse and drill-down."""
 
 import json
-import sqlite3
 from itertools import groupby
 from operator import itemgetter
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, HTTPException
 
-from atheria.api.dependencies import get_db
+from atheria.db.readers import get_reader_pool
 from atheria.db.repositories.chunk_repo import ChunkRepository
 from atheria.schemas.topics import (
     PaperGroupOut,
@@ -20,16 +19,14 @@ router = APIRouter()
 
 
 @router.get("/topics", response_model=list[TopicOut])
-def list_topics(conn: sqlite3.Connection = Depends(get_db)):
-    repo = ChunkRepository(conn)
-    rows = repo.get_all_topics()
+async def list_topics():
+    rows = await get_reader_pool().run(lambda conn: ChunkRepository(conn).get_all_topics())
     return [TopicOut(**r) for r in rows]
 
 
 @router.get("/topics/{topic}/chunks", response_model=TopicDrillDownOut)
-def get_topic_chunks(topic: str, conn: sqlite3.Connection = Depends(get_db)):
-    repo = ChunkRepository(conn)
-    rows = repo.get_chunks_by_topic(topic)
+async def get_topic_chunks(topic: str):
+    rows = await get_reader_pool().run(lambda conn: ChunkRepository(conn).get_chunks_by_topic(topic))
     if not rows:
         raise HTTPException(status_code=404, detail=f"No chunks found for topic '{topic}'")
 
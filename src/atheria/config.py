@@ -8,13 +8,111 @@ K_DENSE = 50
 K_MERGE = 100
 TOP_N = 8
 
+# Fusion of the BM25 and dense rankings (see atheria.retrieval.fusion)
+FUSION_METHOD = "rrf"  # rrf, weighted, concat (legacy BM25-then-dense order)
+FUSION_WEIGHTS = (1.0, 1.0)  # (bm25, dense)
+RRF_K = 60
+RERANK_DEPTH = 40  # top fused candidates sent to the cross-encoder (of up to K_MERGE)
+RERANK_ADAPTIVE = True  # score in first-stage order, stop once steps stop reaching top_n
+RERANK_ADAPTIVE_STEP = 8  # candidates per step after the first top_n + step
+RERANK_ADAPTIVE_PATIENCE = 2  # consecutive stale steps before stopping
+RERANK_ADAPTIVE_MARGIN = 1.0  # cross-encoder logits below the top_n cutoff for a step to count as stale
+
+# Cascade: a cheap first stage (query . stored article vector) prunes the
+# fused candidates before the cross-encoder
+CASCADE = True
+CASCADE_POOL = 100  # fused candidates scored by the first stage
+CASCADE_WIDTH = 24  # survivors by dot product sent on to the cross-encoder (request rerank_budget overrides)
+CASCADE_KEEP_FUSED = 8  # top fused candidates that always survive (e.g. exact BM25 hits)
+
+# Dense KNN scoring: "cosine" scores vectors as if they were normalized,
+# "ip-rescored" rescores an over-fetched cosine KNN by dot product (what MedCPT
+# is trained for, but only among the cosine neighbours, so not exact inner-product
+# KNN), "l2" is the legacy 1 / (1 + L2 distance). vec_chunks is declared for one
+# distance metric; after changing this, run `atheria migrate-vec` to rebuild it.
+VEC_METRIC = "cosine"
+VEC_IP_OVERFETCH = 4  # "ip-rescored": cosine KNN hits fetched per result
+
 # MedCPT models
 MEDCPT_ARTICLE_ENCODER = "ncbi/MedCPT-Article-Encoder"
 MEDCPT_QUERY_ENCODER = "ncbi/MedCPT-Query-Encoder"
 MEDCPT_CROSS_ENCODER = "ncbi/MedCPT-Cross-Encoder"
 
+# Inference backend for all three models: "torch" (eager fp32), "onnx" (fp32)
+# or "onnx-int8" (dynamically quantized); ONNX graphs come from `atheria export-onnx`
+INFERENCE_BACKEND = "torch"
+ONNX_OPSET = 17
+
+# API inference threads: each API worker process gets its share of the cores
+API_WORKERS = 1  # uvicorn worker processes on this host
+INFERENCE_INTRA_OP_THREADS = 0  # per process; 0 = cpu_count // API_WORKERS
+INFERENCE_INTER_OP_THREADS = 1  # single-op graphs gain nothing from more
+MODEL_WARMUP_ROUNDS = 2  # dummy forward passes per model before /api/health is ready
+
+# Async API executors: model calls and SQLite reads run off the event loop
+INFERENCE_WORKERS = 4  # concurrent query-encode / rerank calls per process
+DB_READ_WORKERS = 4  # reader threads, each leasing a pooled connection per call
+
+# SQLite connection pool (atheria.db.pool): read-only query connections plus
+# one writer connection shared by ingest jobs
+DB_POOL_SIZE = 8  # read-only connections per process (>= DB_READ_WORKERS)
+DB_POOL_TIMEOUT_SECONDS = 10.0  # max wait for a free reader before PoolTimeout
+DB_MMAP_SIZE = 268_435_456  # 256 MiB of the DB file memory-mapped per reader
+DB_CACHE_SIZE = -65536  # page cache per reader, in KiB when negative (64 MiB)
+DB_CACHED_STATEMENTS = 256  # prepared statements kept per connection
+
+# Cache side tables (query_embeddings, rerank_scores): lookups lease a pooled
+# reader, new rows are queued and flushed on the pooled writer by a background
+# thread (atheria.db.write_behind)
+CACHE_READ_TIMEOUT_SECONDS = 0.1  # skip a persisted lookup rather than wait longer for a reader
+CACHE_WRITE_QUEUE_MAX = 10_000  # rows pending per cache; beyond this new rows are dropped
+CACHE_WRITE_BATCH = 1024  # rows per flush transaction
+
+# Article encoding: length-bucketed batches capped by padded tokens
+ARTICLE_TOKEN_BUDGET = 16384  # max batch_size * padded_length per forward pass
+ARTICLE_MAX_BATCH = 128
+
+# Query embedding cache (normalized query text -> float32 vector)
+QUERY_EMBEDDING_CACHE_SIZE = 4096  # in-memory LRU entries (~3 KiB each)
+QUERY_EMBEDDING_CACHE_PERSIST = True  # persist to the query_embeddings table
+QUERY_EMBEDDING_CACHE_PERSIST_MAX = 100_000  # rows kept in the side table
+
+# Batch queries (POST /api/query/batch, atheria query --file)
+QUERY_BATCH_MAX = 1000  # queries per API request
+QUERY_BATCH_GROUP = 32  # queries encoded, retrieved and reranked together
+QUERY_ENCODE_BATCH = 64  # queries per query-encoder forward pass
+
+# Query result cache (full /api/query responses, invalidated by ingest)
+QUERY_RESULT_CACHE_SIZE = 1024
+QUERY_RESULT_CACHE_TTL_SECONDS = 300.0
+
+# Cross-encoder score cache ((query, chunk_id, content hash, model) -> score)
+RERANK_SCORE_CACHE = True
+RERANK_SCORE_CACHE_SIZE = 200_000  # in-memory pairs
+RERANK_SCORE_CACHE_PERSIST = True  # persist to the rerank_scores table
+RERANK_SCORE_CACHE_PERSIST_MAX = 2_000_000  # rows kept in the side table
+
+# Streaming ingest: papers parsed, encoded and committed per window
+INGEST_WINDOW = 64
+
+# Background ingest jobs (POST /api/ingest)
+INGEST_JOB_WORKERS = 2  # jobs running at once; they lease the pooled writer per commit
+INGEST_MAX_ENCODE_JOBS = 1  # jobs allowed in the article encoder at once
+INGEST_MAX_PENDING_JOBS = 16  # queued + running; beyond this POST returns 429
+INGEST_JOB_HISTORY = 200  # finished jobs kept for GET /api/ingest/{job_id}
+
+# Reranker
+RERANK_BATCH_SIZE = 32
+RERANK_LATENCY_WINDOW = 1024  # recent batch latencies kept for p50/p99
+RERANK_BATCHING = True  # coalesce concurrent API rerank calls into shared batches
+RERANK_MAX_WAIT_MS = 5.0  # how long the first queued request waits for company
+RERANK_MAX_BATCH = 64  # max (query, chunk) pairs per micro-batch
+RERANK_RESULT_TIMEOUT_SECONDS = 60.0  # max wait for a queued request's scores
+
 # Paths (relative to project root)
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 DATA_DIR = PROJECT_ROOT / "data"
 RAW_DIR = DATA_DIR / "raw"
 DB_PATH = DATA_DIR / "atheria.db"
+BM25_SNAPSHOT_DIR = DATA_DIR / "index" / "bm25_snapshot"
+ONNX_DIR = DATA_DIR / "onnx"
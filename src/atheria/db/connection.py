@@ -2,16 +2,25 @@
 
 import sqlite3
 import logging
-from typing import Final
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Final, Iterator
 
 try:
     import sqlite_vec
 except Exception:  # pragma: no cover - optional dependency at runtime
     sqlite_vec = None  # type: ignore[assignment]
 
-from atheria.config import DB_PATH
+from atheria.config import DB_CACHE_SIZE, DB_CACHED_STATEMENTS, DB_MMAP_SIZE, DB_PATH
 
 _PRAGMA_MODULE_LIST: Final[str] = "PRAGMA module_list"
+# Applied for the duration of bulk_load(); WAL + synchronous=NORMAL stays
+# crash-safe while skipping the fsync on every commit.
+_BULK_LOAD_PRAGMAS: Final[dict[str, str]] = {
+    "synchronous": "NORMAL",
+    "cache_size": "-262144",  # 256 MiB page cache
+    "temp_store": "MEMORY",
+}
 logger = logging.getLogger(__name__)
 
 
@@ -24,10 +33,27 @@ def has_vec0_module(conn: sqlite3.Connection) -> bool:
     return any(row[0] == "vec0" for row in rows)
 
 
-def get_connection() -> sqlite3.Connection:
-    """Open a WAL-mode sqlite3 connection and load sqlite-vec when possible."""
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH), check_same_thread=False)
+def get_connection(
+    db_path: str | Path | None = None, read_only: bool = False
+) -> sqlite3.Connection:
+    """Open a WAL-mode sqlite3 connection and load sqlite-vec when possible.
+
+    read_only opens the existing database with mode=ro and sizes the page
+    cache and memory map for query traffic (see atheria.db.pool).
+    """
+    db_path = Path(db_path) if db_path is not None else DB_PATH
+    if read_only:
+        conn = sqlite3.connect(
+            db_path.resolve().as_uri() + "?mode=ro",
+            uri=True,
+            check_same_thread=False,
+            cached_statements=DB_CACHED_STATEMENTS,
+        )
+    else:
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(
+            str(db_path), check_same_thread=False, cached_statements=DB_CACHED_STATEMENTS
+        )
     conn.row_factory = sqlite3.Row
 
     if sqlite_vec is not None and hasattr(conn, "enable_load_extension") and hasattr(conn, "load_extension"):
@@ -39,6 +65,37 @@ def get_connection() -> sqlite3.Connection:
         finally:
             conn.enable_load_extension(False)
 
-    conn.execute("PRAGMA journal_mode=WAL")
-    conn.execute("PRAGMA foreign_keys=ON")
+    if read_only:
+        # journal_mode is persistent in the file, set by the writer
+        conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+        conn.execute(f"PRAGMA cache_size={DB_CACHE_SIZE}")
+    else:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA foreign_keys=ON")
     return conn
+
+
+@contextmanager
+def bulk_load(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Run a batch of writes in one explicit transaction with load-tuned PRAGMAs.
+
+    Commits on success, rolls back on error, and restores the previous
+    PRAGMA values either way.
+    """
+    if conn.in_transaction:
+        conn.commit()
+    previous = {
+        name: conn.execute(f"PRAGMA {name}").fetchone()[0] for name in _BULK_LOAD_PRAGMAS
+    }
+    for name, value in _BULK_LOAD_PRAGMAS.items():
+        conn.execute(f"PRAGMA {name}={value}")
+    conn.execute("BEGIN")
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        for name, value in previous.items():
+            conn.execute(f"PRAGMA {name}={value}")
@@ -1,8 +1,10 @@
 """SQLite schema migrations."""
 
+import re
 import sqlite3
 import logging
 
+from atheria.config import VEC_METRIC
 from atheria.db.connection import has_vec0_module
 
 logger = logging.getLogger(__name__)
@@ -22,7 +24,8 @@ CREATE TABLE IF NOT EXISTS papers (
 );
 
 CREATE TABLE IF NOT EXISTS chunks (
-    chunk_id        TEXT PRIMARY KEY,
+    chunk_key       INTEGER PRIMARY KEY,
+    chunk_id        TEXT NOT NULL UNIQUE,
     paper_id        TEXT NOT NULL REFERENCES papers(paper_id) ON DELETE CASCADE,
     chunk_type      TEXT NOT NULL,
     section_path    TEXT NOT NULL DEFAULT '[]',
@@ -35,16 +38,119 @@ CREATE TABLE IF NOT EXISTS chunks (
 CREATE INDEX IF NOT EXISTS idx_chunks_paper_id ON chunks(paper_id);
 CREATE INDEX IF NOT EXISTS idx_chunks_page ON chunks(paper_id, page_start);
 
+CREATE TABLE IF NOT EXISTS ingest_files (
+    path            TEXT PRIMARY KEY,
+    size            INTEGER NOT NULL,
+    mtime_ns        INTEGER NOT NULL,
+    content_hash    TEXT NOT NULL,
+    status          TEXT NOT NULL,
+    paper_id        TEXT,
+    error           TEXT,
+    updated_at      REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_ingest_files_hash ON ingest_files(content_hash);
+
+CREATE TABLE IF NOT EXISTS query_embeddings (
+    query_norm      TEXT NOT NULL,
+    model           TEXT NOT NULL,
+    embedding       BLOB NOT NULL,
+    created_at      REAL NOT NULL,
+    PRIMARY KEY (query_norm, model)
+);
+CREATE INDEX IF NOT EXISTS idx_query_embeddings_created ON query_embeddings(created_at);
+
+CREATE TABLE IF NOT EXISTS schema_flags (
+    name            TEXT PRIMARY KEY
+);
+
+CREATE TABLE IF NOT EXISTS rerank_scores (
+    query_norm      TEXT NOT NULL,
+    chunk_id        TEXT NOT NULL,
+    content_hash    TEXT NOT NULL,
+    model           TEXT NOT NULL,
+    score           REAL NOT NULL,
+    created_at      REAL NOT NULL,
+    PRIMARY KEY (query_norm, model, chunk_id, content_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_rerank_scores_created ON rerank_scores(created_at);
+
 """
 
 _VEC_SCHEMA_SQL = """
 CREATE VIRTUAL TABLE IF NOT EXISTS vec_chunks USING vec0(
-    embedding float[768],
+    embedding float[768] distance_metric={metric},
     +paper_id TEXT,
     +chunk_id TEXT
 );
 """
 
+# vec0 distance metric declared for each VEC_METRIC. vec0 has no inner
+# product, so "ip-rescored" runs a cosine KNN and rescores by dot product (see
+# dense_index.retrieve_dense).
+VEC_TABLE_METRICS = {"ip-rescored": "cosine", "cosine": "cosine", "l2": "l2"}
+
+# Re-declare vec_chunks with another distance metric, keeping rows and rowids.
+_VEC_REBUILD_SQL = """
+BEGIN;
+CREATE TEMP TABLE _vec_rebuild AS
+    SELECT rowid AS vec_rowid, embedding, paper_id, chunk_id FROM vec_chunks;
+DROP TABLE vec_chunks;
+{schema}
+INSERT INTO vec_chunks(rowid, embedding, paper_id, chunk_id)
+    SELECT vec_rowid, embedding, paper_id, chunk_id FROM _vec_rebuild;
+DROP TABLE _vec_rebuild;
+COMMIT;
+"""
+
+# chunks gained an explicit INTEGER PRIMARY KEY (chunk_key): vec_chunks rowids
+# mirror it, and an implicit rowid may be renumbered by VACUUM. The rebuild
+# keeps each chunk's current rowid as its chunk_key.
+_CHUNK_KEY_SQL = """
+BEGIN;
+CREATE TABLE chunks_keyed (
+    chunk_key       INTEGER PRIMARY KEY,
+    chunk_id        TEXT NOT NULL UNIQUE,
+    paper_id        TEXT NOT NULL REFERENCES papers(paper_id) ON DELETE CASCADE,
+    chunk_type      TEXT NOT NULL,
+    section_path    TEXT NOT NULL DEFAULT '[]',
+    page_start      INTEGER NOT NULL DEFAULT 1,
+    page_end        INTEGER NOT NULL DEFAULT 1,
+    text            TEXT NOT NULL,
+    bm25_fields     TEXT NOT NULL DEFAULT '[]'
+);
+INSERT INTO chunks_keyed
+    SELECT rowid, chunk_id, paper_id, chunk_type, section_path,
+           page_start, page_end, text, bm25_fields
+    FROM chunks;
+DROP TABLE chunks;
+ALTER TABLE chunks_keyed RENAME TO chunks;
+CREATE INDEX IF NOT EXISTS idx_chunks_paper_id ON chunks(paper_id);
+CREATE INDEX IF NOT EXISTS idx_chunks_page ON chunks(paper_id, page_start);
+COMMIT;
+"""
+
+# vec_chunks rowids mirror chunks.chunk_key so a chunk's vector is a point
+# lookup. Re-key rows written before that (and drop vectors of deleted
+# chunks) once, and again after the chunk_key rebuild in case a VACUUM had
+# already renumbered the implicit rowids.
+_VEC_ALIGN_SQL = """
+CREATE TEMP TABLE _vec_realign AS
+    SELECT c.chunk_key AS new_rowid, v.embedding, v.paper_id, v.chunk_id
+    FROM vec_chunks v JOIN chunks c ON c.chunk_id = v.chunk_id
+    WHERE v.rowid != c.chunk_key;
+DELETE FROM vec_chunks WHERE rowid IN (
+    SELECT v.rowid FROM vec_chunks v LEFT JOIN chunks c ON c.chunk_id = v.chunk_id
+    WHERE c.chunk_key IS NULL OR c.chunk_key != v.rowid
+);
+INSERT INTO vec_chunks(rowid, embedding, paper_id, chunk_id)
+    SELECT new_rowid, embedding, paper_id, chunk_id FROM _vec_realign
+    WHERE new_rowid NOT IN (SELECT rowid FROM vec_chunks)
+    GROUP BY new_rowid;
+DROP TABLE _vec_realign;
+INSERT OR IGNORE INTO schema_flags(name) VALUES ('vec_rowids_aligned');
+"""
+
 
 _DEDUP_SQL = """
 DELETE FROM papers WHERE rowid NOT IN (
@@ -68,11 +174,74 @@ DELETE FROM papers WHERE title LIKE '%PDF-%'
 """
 
 
-def apply_migrations(conn: sqlite3.Connection) -> None:
-    """Apply schema (idempotent — all statements use IF NOT EXISTS)."""
+def _vec_table_metric(conn: sqlite3.Connection) -> str:
+    """Distance metric vec_chunks was declared with (vec0 defaults to l2)."""
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type='table' AND name='vec_chunks'"
+    ).fetchone()
+    match = re.search(r"distance_metric\s*=\s*(\w+)", row[0] if row else "", re.IGNORECASE)
+    return match.group(1).lower() if match else "l2"
+
+
+def _table_metric(vec_metric: str) -> str:
+    try:
+        return VEC_TABLE_METRICS[vec_metric]
+    except KeyError:
+        raise ValueError(
+            f"Unknown vec metric {vec_metric!r}; expected one of {sorted(VEC_TABLE_METRICS)}"
+        ) from None
+
+
+def migrate_vec_metric(conn: sqlite3.Connection, vec_metric: str = VEC_METRIC) -> str | None:
+    """Re-declare vec_chunks with the distance metric vec_metric needs.
+
+    Copies every row (keeping rowids) into a new table, so it takes the write
+    lock for the whole copy; run it explicitly (`atheria migrate-vec`) with
+    the API stopped, never on startup. Returns the previous table metric, or
+    None if no rebuild was needed.
+    """
+    table_metric = _table_metric(vec_metric)
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='vec_chunks'"
+    ).fetchone()
+    if exists is None:
+        raise RuntimeError("vec_chunks does not exist (is sqlite-vec available?)")
+    current = _vec_table_metric(conn)
+    if current == table_metric:
+        return None
+    logger.info("Rebuilding vec_chunks: distance metric %s -> %s", current, table_metric)
+    conn.executescript(_VEC_REBUILD_SQL.format(schema=_VEC_SCHEMA_SQL.format(metric=table_metric)))
+    return current
+
+
+def apply_migrations(conn: sqlite3.Connection, vec_metric: str = VEC_METRIC) -> None:
+    """Apply schema (idempotent — all statements use IF NOT EXISTS).
+
+    A new vec_chunks is declared with the distance metric vec_metric (one of
+    VEC_TABLE_METRICS) needs. An existing table declared with another metric is
+    left alone with a warning; see migrate_vec_metric.
+    """
+    table_metric = _table_metric(vec_metric)
     conn.executescript(SCHEMA_SQL)
+    chunk_columns = {row[1] for row in conn.execute("PRAGMA table_info(chunks)")}
+    rekeyed = "chunk_key" not in chunk_columns
+    if rekeyed:
+        logger.info("Rebuilding chunks with an explicit chunk_key primary key.")
+        conn.executescript(_CHUNK_KEY_SQL)
     if has_vec0_module(conn):
-        conn.executescript(_VEC_SCHEMA_SQL)
+        conn.executescript(_VEC_SCHEMA_SQL.format(metric=table_metric))
+        aligned = conn.execute(
+            "SELECT 1 FROM schema_flags WHERE name = 'vec_rowids_aligned'"
+        ).fetchone()
+        if aligned is None or rekeyed:
+            conn.executescript(_VEC_ALIGN_SQL)
+        current = _vec_table_metric(conn)
+        if current != table_metric:
+            logger.warning(
+                "vec_chunks is declared with distance metric %s but vec metric %r needs %s; "
+                "dense hits are scored as %s until 'atheria migrate-vec' rebuilds it.",
+                current, vec_metric, table_metric, current,
+            )
     else:
         logger.warning("sqlite-vec unavailable: skipping vec_chunks virtual table migration.")
     conn.executescript(_BAD_PDF_CLEANUP_SQL)
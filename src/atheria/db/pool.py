@@ -0,0 +1,191 @@
+"""SQLite connection pool: read-only query connections and one writer.
+
+Opening a connection per request re-loads sqlite-vec and re-issues the
+PRAGMAs every time. The API instead leases connections from a
+ConnectionPool:
+
+- reader(): up to DB_POOL_SIZE read-only connections (mode=ro, with
+  mmap_size / cache_size set for query traffic), opened lazily and reused;
+  callers wait up to DB_POOL_TIMEOUT_SECONDS for a free one.
+- writer(): a single read-write connection shared by ingest jobs, one
+  holder at a time, so writes never contend on SQLite's write lock.
+
+Connections keep sqlite3's per-connection statement cache
+(DB_CACHED_STATEMENTS), so repeated queries skip re-preparing. Lease
+counts and wait times are reported by stats() for /api/health.
+"""
+
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator
+
+from atheria.config import DB_POOL_SIZE, DB_POOL_TIMEOUT_SECONDS
+from atheria.db.connection import get_connection
+
+
+class PoolTimeout(TimeoutError):
+    """Raised when no read-only connection frees up within the pool timeout."""
+
+
+class _WaitStats:
+    """Lease count and wait-time totals for one kind of connection."""
+
+    def __init__(self) -> None:
+        self.leases = 0
+        self.waited = 0  # leases that found nothing free and had to block
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, seconds: float, blocked: bool) -> None:
+        self.leases += 1
+        self.waited += blocked
+        self.wait_seconds += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "leases": self.leases,
+            "waited": self.waited,
+            "mean_wait_ms": self.wait_seconds / self.leases * 1000.0 if self.leases else None,
+            "max_wait_ms": self.max_wait_seconds * 1000.0,
+        }
+
+
+class ConnectionPool:
+    """Thread-safe pool of read-only connections plus one shared writer."""
+
+    def __init__(
+        self,
+        size: int = DB_POOL_SIZE,
+        db_path: str | Path | None = None,
+        timeout: float = DB_POOL_TIMEOUT_SECONDS,
+    ) -> None:
+        self.size = size
+        self.timeout = timeout
+        self._db_path = db_path
+        self._cond = threading.Condition()
+        self._idle: list[sqlite3.Connection] = []
+        self._open = 0
+        self._waiting = 0
+        self._timeouts = 0
+        self._closed = False
+        self._reads = _WaitStats()
+        self._writer: sqlite3.Connection | None = None
+        self._writer_lock = threading.Lock()
+        self._writes = _WaitStats()
+
+    @contextmanager
+    def reader(self, timeout: float | None = None) -> Iterator[sqlite3.Connection]:
+        """Lease a read-only connection; raises PoolTimeout if none frees up."""
+        conn = self._acquire(self.timeout if timeout is None else timeout)
+        try:
+            yield conn
+        finally:
+            self._release(conn)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Connection]:
+        """Lease the writer connection, waiting for the current holder.
+
+        Work the holder left uncommitted (e.g. after an exception) is rolled
+        back on release.
+        """
+        start = time.perf_counter()
+        blocked = not self._writer_lock.acquire(blocking=False)
+        if blocked:
+            self._writer_lock.acquire()
+        try:
+            with self._cond:
+                self._writes.record(time.perf_counter() - start, blocked)
+            if self._writer is None:
+                self._writer = get_connection(self._db_path)
+            yield self._writer
+        finally:
+            if self._writer is not None and self._writer.in_transaction:
+                self._writer.rollback()
+            self._writer_lock.release()
+
+    def _acquire(self, timeout: float) -> sqlite3.Connection:
+        start = time.perf_counter()
+        deadline = start + timeout
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            blocked = not self._idle and self._open >= self.size
+            self._waiting += 1
+            try:
+                while not self._idle and self._open >= self.size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeout(
+                            f"No SQLite reader free after {timeout:.1f}s "
+                            f"({self.size} connections in use)"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._reads.record(time.perf_counter() - start, blocked)
+            if self._idle:
+                return self._idle.pop()
+            self._open += 1
+        try:
+            return get_connection(self._db_path, read_only=True)
+        except BaseException:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        with self._cond:
+            if self._closed:
+                self._open -= 1
+                conn.close()
+                return
+            # LIFO: the most recently used connection has the warmest page cache
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def close(self) -> None:
+        """Close idle readers and the writer; leased readers close on release."""
+        with self._cond:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+            self._open -= len(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def stats(self) -> dict[str, Any]:
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "waiting": self._waiting,
+                "timeouts": self._timeouts,
+                **self._reads.stats(),
+                "writer": {
+                    "open": self._writer is not None,
+                    "busy": self._writer_lock.locked(),
+                    **self._writes.stats(),
+                },
+            }
+
+
+@lru_cache(maxsize=1)
+def get_connection_pool() -> ConnectionPool:
+    """Return the process-wide SQLite connection pool."""
+    return ConnectionPool()
@@ -0,0 +1,75 @@
+"""Reader pool: SQLite reads for the async API on a dedicated thread pool.
+
+Async request handlers must not block the event loop on sqlite3, so reads
+are submitted to a fixed pool of threads, each leasing a read-only
+connection from the ConnectionPool for the duration of the call. Work is
+passed in as fn(conn, *args) and awaited with ReaderPool.run().
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, TypeVar
+
+from atheria.config import DB_READ_WORKERS
+from atheria.db.pool import ConnectionPool, get_connection_pool
+
+T = TypeVar("T")
+
+
+class ReaderPool:
+    """Fixed set of reader threads running calls on pooled read-only connections."""
+
+    def __init__(self, size: int = DB_READ_WORKERS, pool: ConnectionPool | None = None) -> None:
+        self.size = size
+        self._pool = pool or get_connection_pool()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="sqlite-reader")
+        self._pending = 0
+        self._calls = 0
+        self._queue_seconds = 0.0
+        self._busy_seconds = 0.0
+
+    def _call(self, submitted: float, fn: Callable[..., T], args: tuple) -> T:
+        start = time.perf_counter()
+        try:
+            with self._pool.reader() as conn:
+                return fn(conn, *args)
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self._pending -= 1
+                self._calls += 1
+                self._queue_seconds += start - submitted
+                self._busy_seconds += end - start
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Await fn(conn, *args) on a reader thread."""
+        with self._lock:
+            self._pending += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._call, time.perf_counter(), fn, args
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            calls = self._calls
+            return {
+                "size": self.size,
+                "pending": self._pending,
+                "calls": calls,
+                "mean_queue_ms": self._queue_seconds / calls * 1000.0 if calls else None,
+                "mean_busy_ms": self._busy_seconds / calls * 1000.0 if calls else None,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_reader_pool() -> ReaderPool:
+    """Return the process-wide reader pool."""
+    return ReaderPool()
@@ -7,27 +7,37 @@ from types import SimpleNamespace
 from atheria.models.chunk import Chunk
 
 
+_INSERT_SQL = """INSERT OR REPLACE INTO chunks
+               (chunk_id, paper_id, chunk_type, section_path,
+                page_start, page_end, text, bm25_fields)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
+
+
+def _chunk_row(chunk: Chunk) -> tuple:
+    return (
+        chunk.chunk_id,
+        chunk.paper_id,
+        chunk.chunk_type.value,
+        json.dumps(chunk.section_path),
+        chunk.page_start,
+        chunk.page_end,
+        chunk.text,
+        json.dumps(chunk.bm25_fields),
+    )
+
+
 class ChunkRepository:
     def __init__(self, conn: sqlite3.Connection) -> None:
         self.conn = conn
 
     def insert(self, chunk: Chunk) -> None:
-        self.conn.execute(
-            """INSERT OR REPLACE INTO chunks
-               (chunk_id, paper_id, chunk_type, section_path,
-                page_start, page_end, text, bm25_fields)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-            [
-                chunk.chunk_id,
-                chunk.paper_id,
-                chunk.chunk_type.value,
-                json.dumps(chunk.section_path),
-                chunk.page_start,
-                chunk.page_end,
-                chunk.text,
-                json.dumps(chunk.bm25_fields),
-            ],
-        )
+        self.conn.execute(_INSERT_SQL, _chunk_row(chunk))
+
+    def insert_many(self, chunks: list[Chunk]) -> int:
+        """Bulk insert with one executemany over pre-serialized rows."""
+        rows = [_chunk_row(c) for c in chunks]
+        self.conn.executemany(_INSERT_SQL, rows)
+        return len(rows)
 
     def get_by_id(self, chunk_id: str) -> Chunk | None:
         row = self.conn.execute(
@@ -42,6 +52,14 @@ class ChunkRepository:
         ).fetchall()
         return [Chunk.from_row(r) for r in rows]
 
+    def delete_by_paper(self, paper_id: str) -> list[str]:
+        """Delete a paper's chunks and return their ids."""
+        rows = self.conn.execute(
+            "SELECT chunk_id FROM chunks WHERE paper_id = ?", [paper_id]
+        ).fetchall()
+        self.conn.execute("DELETE FROM chunks WHERE paper_id = ?", [paper_id])
+        return [r["chunk_id"] for r in rows]
+
     def get_chunks_by_ids(self, chunk_ids: list[str]) -> dict[str, Chunk]:
         if not chunk_ids:
             return {}
@@ -120,3 +138,14 @@ class ChunkRepository:
 
     def count(self) -> int:
         return self.conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def state_key(self) -> str:
+        """Cheap fingerprint of the chunks table, used to validate BM25 snapshots.
+
+        Scans only the rowid b-tree; any insert, delete or INSERT OR REPLACE
+        changes the count, max rowid or rowid sum.
+        """
+        row = self.conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(rowid), 0), COALESCE(SUM(rowid), 0) FROM chunks"
+        ).fetchone()
+        return f"{row[0]}:{row[1]}:{row[2]}"
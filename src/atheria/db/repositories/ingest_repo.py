@@ -0,0 +1,93 @@
+"""Repository for the ingest_files ledger.
+
+One row per input file, keyed on its resolved path, with the size, mtime and
+content hash it had when last ingested and the furthest stage it reached:
+
+    parsed    -> parsed and chunked; its window has not been committed yet
+    chunked   -> paper and chunks committed, vectors not yet written
+    embedded  -> vectors committed; the file is fully indexed
+    duplicate, unparseable, failed -> terminal outcomes without a paper
+"""
+
+import sqlite3
+import time
+from dataclasses import dataclass
+
+# Stages after which an unchanged file is not parsed again
+DONE_STATUSES = ("chunked", "embedded", "duplicate", "unparseable")
+
+_UPSERT_SQL = """INSERT INTO ingest_files
+               (path, size, mtime_ns, content_hash, status, paper_id, error, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(path) DO UPDATE SET
+                   size = excluded.size,
+                   mtime_ns = excluded.mtime_ns,
+                   content_hash = excluded.content_hash,
+                   status = excluded.status,
+                   paper_id = excluded.paper_id,
+                   error = excluded.error,
+                   updated_at = excluded.updated_at"""
+
+
+@dataclass
+class IngestFile:
+    path: str
+    size: int
+    mtime_ns: int
+    content_hash: str
+    status: str
+    paper_id: str | None = None
+    error: str | None = None
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "IngestFile":
+        return cls(
+            path=row["path"],
+            size=row["size"],
+            mtime_ns=row["mtime_ns"],
+            content_hash=row["content_hash"],
+            status=row["status"],
+            paper_id=row["paper_id"],
+            error=row["error"],
+        )
+
+
+class IngestFileRepository:
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+
+    def upsert_many(self, entries: list[IngestFile]) -> int:
+        now = time.time()
+        rows = [
+            (e.path, e.size, e.mtime_ns, e.content_hash, e.status, e.paper_id, e.error, now)
+            for e in entries
+        ]
+        self.conn.executemany(_UPSERT_SQL, rows)
+        return len(rows)
+
+    def delete(self, path: str) -> None:
+        self.conn.execute("DELETE FROM ingest_files WHERE path = ?", [path])
+
+    def get_many(self, paths: list[str]) -> dict[str, IngestFile]:
+        if not paths:
+            return {}
+        result: dict[str, IngestFile] = {}
+        # Stay well under SQLITE_MAX_VARIABLE_NUMBER for large directories
+        for i in range(0, len(paths), 500):
+            batch = paths[i : i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT * FROM ingest_files WHERE path IN ({placeholders})", batch
+            ).fetchall()
+            result.update((r["path"], IngestFile.from_row(r)) for r in rows)
+        return result
+
+    def get_indexed_by_hash(self, content_hash: str) -> IngestFile | None:
+        """Any file with these exact bytes whose paper is already in the index."""
+        row = self.conn.execute(
+            """SELECT * FROM ingest_files
+               WHERE content_hash = ? AND status IN ('chunked', 'embedded')
+               LIMIT 1""",
+            [content_hash],
+        ).fetchone()
+        return IngestFile.from_row(row) if row else None
@@ -7,26 +7,35 @@ from typing import Any
 from atheria.models.paper import Paper
 
 
+_INSERT_SQL = """INSERT OR REPLACE INTO papers
+               (paper_id, title, pmid, doi, source_url, pdf_path, metadata)
+               VALUES (?, ?, ?, ?, ?, ?, ?)"""
+
+
+def _paper_row(paper: Paper) -> tuple:
+    return (
+        str(paper.paper_id),
+        paper.title,
+        paper.pmid,
+        paper.metadata.get("doi"),
+        paper.source_url,
+        paper.pdf_path,
+        json.dumps(paper.metadata),
+    )
+
+
 class PaperRepository:
     def __init__(self, conn: sqlite3.Connection) -> None:
         self.conn = conn
 
     def insert(self, paper: Paper) -> None:
-        doi = paper.metadata.get("doi")
-        self.conn.execute(
-            """INSERT OR REPLACE INTO papers
-               (paper_id, title, pmid, doi, source_url, pdf_path, metadata)
-               VALUES (?, ?, ?, ?, ?, ?, ?)""",
-            [
-                str(paper.paper_id),
-                paper.title,
-                paper.pmid,
-                doi,
-                paper.source_url,
-                paper.pdf_path,
-                json.dumps(paper.metadata),
-            ],
-        )
+        self.conn.execute(_INSERT_SQL, _paper_row(paper))
+
+    def insert_many(self, papers: list[Paper]) -> int:
+        """Bulk insert with one executemany over pre-serialized rows."""
+        rows = [_paper_row(p) for p in papers]
+        self.conn.executemany(_INSERT_SQL, rows)
+        return len(rows)
 
     def get_by_id(self, paper_id: str) -> Paper | None:
         row = self.conn.execute(
@@ -41,6 +50,15 @@ class PaperRepository:
     def get_all_as_dict(self) -> dict[str, Paper]:
         return {str(p.paper_id): p for p in self.get_all()}
 
+    def get_by_ids(self, paper_ids: list[str]) -> dict[str, Paper]:
+        if not paper_ids:
+            return {}
+        placeholders = ",".join("?" * len(paper_ids))
+        rows = self.conn.execute(
+            f"SELECT * FROM papers WHERE paper_id IN ({placeholders})", paper_ids
+        ).fetchall()
+        return {r["paper_id"]: Paper.from_row(r) for r in rows}
+
     def get_all_with_chunk_counts(self) -> list[dict[str, Any]]:
         rows = self.conn.execute(
             """SELECT p.*, COUNT(c.chunk_id) as chunk_count
@@ -73,5 +91,8 @@ class PaperRepository:
         ).fetchone()
         return Paper.from_row(row) if row else None
 
+    def delete(self, paper_id: str) -> None:
+        self.conn.execute("DELETE FROM papers WHERE paper_id = ?", [paper_id])
+
     def count(self) -> int:
         return self.conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
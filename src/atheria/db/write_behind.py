@@ -0,0 +1,146 @@
+"""Background writes for the cache side tables.
+
+The query embedding and rerank score caches persist to SQLite side tables
+(query_embeddings, rerank_scores). Writing on the request thread would put
+an INSERT, an occasional prune DELETE and a commit on the query path, behind
+whatever ingest is doing with the pool's writer. Instead, caches put rows on
+a WriteBehind queue; one daemon thread drains it in batches of up to
+CACHE_WRITE_BATCH rows and flushes each batch in a short transaction on the
+leased pool writer.
+
+Failures are classified with is_schema_error(): a missing table or column
+means the side table is unusable, so the cache turns persistence off. Any
+other error (database is locked or busy, a closed pool) drops that batch
+only; the rows are still in the in-memory LRU.
+"""
+
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+from typing import Any, Callable
+
+from atheria.config import CACHE_WRITE_BATCH, CACHE_WRITE_QUEUE_MAX
+from atheria.db.pool import ConnectionPool, get_connection_pool
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA_ERRORS = ("no such table", "no such column", "has no column named")
+
+
+def is_schema_error(exc: BaseException) -> bool:
+    """True if exc means a side table is missing or has the wrong columns."""
+    return isinstance(exc, sqlite3.OperationalError) and any(
+        marker in str(exc).lower() for marker in _SCHEMA_ERRORS
+    )
+
+
+class WriteBehind:
+    """Queue of rows flushed to SQLite by a single background thread.
+
+    flush(conn, rows) runs on the leased pool writer and is committed after
+    it returns. on_schema_error() is called once if a flush fails with a
+    schema error; the queue then stops accepting rows.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush: Callable[[sqlite3.Connection, list[Any]], None],
+        on_schema_error: Callable[[], None],
+        pool: ConnectionPool | None = None,
+        max_pending: int = CACHE_WRITE_QUEUE_MAX,
+        batch_size: int = CACHE_WRITE_BATCH,
+    ) -> None:
+        self.name = name
+        self.batch_size = batch_size
+        self._flush = flush
+        self._on_schema_error = on_schema_error
+        self._pool = pool
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max_pending)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._written = 0
+        self._dropped = 0
+        self._failed_flushes = 0
+
+    def put(self, rows: list[Any]) -> None:
+        """Queue rows for the next flush; rows that do not fit are dropped."""
+        with self._lock:
+            if self._closed:
+                return
+            self._start_locked()
+        for i, row in enumerate(rows):
+            try:
+                self._queue.put_nowait(row)
+            except queue.Full:
+                with self._lock:
+                    self._dropped += len(rows) - i
+                return
+
+    def _start_locked(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-writer", daemon=True)
+        self._thread.start()
+        # Flush what is queued when a CLI or eval process exits
+        atexit.register(self.close)
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            rows = [self._queue.get()]
+            while len(rows) < self.batch_size:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if None in rows:
+                stop = True
+                rows = [row for row in rows if row is not None]
+            if rows and not self._write(rows):
+                return
+
+    def _write(self, rows: list[Any]) -> bool:
+        """Flush one batch; returns False once persistence is off."""
+        pool = self._pool or get_connection_pool()
+        try:
+            with pool.writer() as conn:
+                self._flush(conn, rows)
+                conn.commit()
+        except Exception as exc:
+            if is_schema_error(exc):
+                with self._lock:
+                    self._closed = True
+                self._on_schema_error()
+                return False
+            logger.debug("%s: dropped %d row(s): %s", self.name, len(rows), exc)
+            with self._lock:
+                self._dropped += len(rows)
+                self._failed_flushes += 1
+            return True
+        with self._lock:
+            self._written += len(rows)
+        return True
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Flush queued rows and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "written": self._written,
+                "dropped": self._dropped,
+                "failed_flushes": self._failed_flushes,
+            }
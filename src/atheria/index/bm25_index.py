@@ -1,8 +1,56 @@
-"""BM25 sparse index with heading boost."""
+"""BM25 sparse index with heading boost.
 
+Okapi BM25 over term-major CSR postings (numpy only). A query touches only
+the posting lists of its own terms: their IDF comes from the stored document
+frequencies and the length norms of their postings from the current avgdl,
+so scoring is a sparse matrix-vector product, and top-k uses partial
+selection instead of a full sort. Parameters and the negative-IDF floor
+match rank_bm25.BM25Okapi, to float32 precision (eval/bm25_parity.py checks
+this). Unlike BM25Okapi, only documents sharing a query term are returned:
+top-k is never padded with zero-score documents.
+
+Postings live in immutable segments. Adding documents builds one new segment
+from the new documents only and updates the document frequencies of the
+terms they contain; nothing is recomputed over the whole vocabulary or
+document set. Deletions are tombstones. Small tail segments are
+merged geometrically so the segment count stays logarithmic. updated()
+returns a new index that shares every untouched segment, which lets the API
+swap indexes atomically while queries keep reading the old one.
+
+An index can be saved as a versioned snapshot directory whose arrays are
+memory-mapped back in by load(), so API startup skips retokenizing the corpus.
+Saves (from any process) are serialized by a lock file, and a generation is
+only collected once two newer ones exist, so a reader that has just resolved
+CURRENT keeps its files.
+"""
+
+import copy
+import json
+import os
+import shutil
+import time
+from collections import Counter
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Iterator
+from uuid import uuid4
 
-from rank_bm25 import BM25Okapi
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None  # type: ignore[assignment]
+    import msvcrt
+
+SNAPSHOT_VERSION = 3
+_CURRENT_FILE = "CURRENT"
+_LOCK_FILE = "LOCK"
+_DOC_ARRAYS = ("doc_len", "alive")
+_TERM_ARRAYS = ("df",)
+_SEGMENT_ARRAYS = ("indptr", "indices", "data")
+# Merge the two newest segments while the older is at most this many times larger
+_MERGE_RATIO = 1.0
 
 
 def _tokenize(text: str) -> list[str]:
@@ -10,34 +58,393 @@ def _tokenize(text: str) -> list[str]:
     return text.lower().split()
 
 
+@contextmanager
+def _snapshot_lock(directory: Path) -> Iterator[None]:
+    """Exclusive cross-process lock on a snapshot directory (blocks until free)."""
+    with open(directory / _LOCK_FILE, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after ~10s; keep waiting
+                    continue
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _generation_ns(path: Path) -> int:
+    try:
+        return int(path.name.removeprefix("gen-"))
+    except ValueError:
+        return -1
+
+
+class _Segment:
+    """Immutable CSR postings: row = term id, columns = global doc ids, values = tf."""
+
+    __slots__ = ("name", "indptr", "indices", "data")
+
+    def __init__(self, name: str, indptr: np.ndarray, indices: np.ndarray, data: np.ndarray) -> None:
+        self.name = name
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+
+    @property
+    def n_terms(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def n_postings(self) -> int:
+        return len(self.indices)
+
+    def term_ids(self) -> np.ndarray:
+        """Term id of every posting (expands indptr)."""
+        return np.repeat(np.arange(self.n_terms, dtype=np.int64), np.diff(self.indptr))
+
+    @classmethod
+    def from_triples(
+        cls, terms: np.ndarray, docs: np.ndarray, tfs: np.ndarray, n_terms: int
+    ) -> "_Segment":
+        # Stable sort keeps doc ids ascending inside each posting list
+        order = np.argsort(terms, kind="stable")
+        indptr = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=n_terms), out=indptr[1:])
+        return cls(uuid4().hex, indptr, docs[order], tfs[order])
+
+    def merged(self, newer: "_Segment", alive: np.ndarray) -> "_Segment":
+        """Merge with a newer segment, dropping postings of deleted documents."""
+        terms = np.concatenate([self.term_ids(), newer.term_ids()])
+        docs = np.concatenate([self.indices, newer.indices])
+        tfs = np.concatenate([self.data, newer.data])
+        keep = alive[docs]
+        return _Segment.from_triples(terms[keep], docs[keep], tfs[keep], newer.n_terms)
+
+
 class BM25Index:
     """BM25 index with chunk_id mapping."""
 
-    def __init__(self) -> None:
-        self._bm25: BM25Okapi | None = None
-        self._tokenized_corpus: list[list[str]] = []
+    def __init__(self, k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25) -> None:
+        self.k1 = k1
+        self.b = b
+        self.epsilon = epsilon
+        self._vocab: dict[str, int] = {}
         self._chunk_ids: list[str] = []
+        self._doc_by_chunk: dict[str, int] | None = None
+        self._segments: list[_Segment] = []
+        self._doc_len = np.zeros(0, dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._df = np.zeros(0, dtype=np.int64)
+        self._n_alive = 0
+        self._total_len = 0.0
+        # Mean IDF over present terms, for the negative-IDF floor; computed on
+        # first need after each update (see _average_idf)
+        self._avg_idf: float | None = None
+
+    def __len__(self) -> int:
+        return self._n_alive
 
     def add_chunks(self, chunks: list) -> None:
-        """Add chunks; each chunk must have chunk_id and bm25_fields."""
-        for chunk in chunks:
-            # Combine all bm25_fields into one document for BM25
-            fields = getattr(chunk, "bm25_fields", None)
-            combined = " ".join(fields) if fields else getattr(chunk, "text", "")
-            tokens = _tokenize(combined)
-            self._tokenized_corpus.append(tokens)
-            self._chunk_ids.append(chunk.chunk_id)
-        if self._tokenized_corpus:
-            self._bm25 = BM25Okapi(self._tokenized_corpus)
+        """Add chunks in place; each chunk must have chunk_id and bm25_fields."""
+        self._apply(chunks, ())
+
+    def remove_chunks(self, chunk_ids: list[str]) -> None:
+        """Delete chunks in place by chunk_id (unknown ids are ignored)."""
+        self._apply((), chunk_ids)
+
+    def updated(self, added: list = (), removed_ids: list[str] = ()) -> "BM25Index":
+        """Return a new index with the changes applied; self is left untouched.
+
+        Segments are immutable and shared; per-document and per-term arrays are
+        replaced rather than mutated, so readers of self are never affected.
+        """
+        new = copy.copy(self)
+        new._vocab = dict(self._vocab)
+        new._chunk_ids = list(self._chunk_ids)
+        new._doc_by_chunk = dict(self._doc_by_chunk) if self._doc_by_chunk is not None else None
+        new._segments = list(self._segments)
+        new._apply(added, removed_ids)
+        return new
+
+    def _doc_ids_for(self, chunk_ids) -> list[int]:
+        if self._doc_by_chunk is None:
+            self._doc_by_chunk = {cid: i for i, cid in enumerate(self._chunk_ids)}
+        return [d for d in (self._doc_by_chunk.get(c) for c in chunk_ids) if d is not None]
+
+    def _apply(self, added, removed_ids) -> None:
+        """Tombstone removed/replaced docs, append one segment for added docs, refresh stats."""
+        added = list(added)
+        replaced = [c.chunk_id for c in added]
+        dead = [d for d in self._doc_ids_for(list(removed_ids) + replaced) if self._alive[d]]
+        df = np.array(self._df, dtype=np.int64)
+        alive = np.array(self._alive, dtype=bool)
+
+        if dead:
+            dead_arr = np.unique(np.asarray(dead, dtype=np.int64))
+            dead_mask = np.zeros(len(alive), dtype=bool)
+            dead_mask[dead_arr] = True
+            for seg in self._segments:
+                (hit,) = np.nonzero(dead_mask[seg.indices])
+                if len(hit):
+                    # Term id of each dead posting, without expanding the whole segment
+                    terms = np.searchsorted(seg.indptr, hit, side="right") - 1
+                    np.subtract.at(df, terms, 1)
+            alive[dead_arr] = False
+            self._n_alive -= len(dead_arr)
+            self._total_len -= float(self._doc_len[dead_arr].sum())
+
+        if added:
+            terms: list[int] = []
+            docs: list[int] = []
+            tfs: list[int] = []
+            lengths: list[int] = []
+            doc_id = len(self._chunk_ids)
+            for chunk in added:
+                # Combine all bm25_fields into one document for BM25
+                fields = getattr(chunk, "bm25_fields", None)
+                combined = " ".join(fields) if fields else getattr(chunk, "text", "")
+                tokens = _tokenize(combined)
+                for term, tf in Counter(tokens).items():
+                    tid = self._vocab.setdefault(term, len(self._vocab))
+                    terms.append(tid)
+                    docs.append(doc_id)
+                    tfs.append(tf)
+                lengths.append(len(tokens))
+                self._chunk_ids.append(chunk.chunk_id)
+                if self._doc_by_chunk is not None:
+                    self._doc_by_chunk[chunk.chunk_id] = doc_id
+                doc_id += 1
+            n_terms = len(self._vocab)
+            term_arr = np.asarray(terms, dtype=np.int64)
+            df = np.concatenate([df, np.zeros(n_terms - len(df), dtype=np.int64)])
+            touched, counts = np.unique(term_arr, return_counts=True)
+            df[touched] += counts
+            alive = np.concatenate([alive, np.ones(len(added), dtype=bool)])
+            self._doc_len = np.concatenate([self._doc_len, np.asarray(lengths, dtype=np.float32)])
+            self._n_alive += len(added)
+            self._total_len += float(sum(lengths))
+            self._segments.append(
+                _Segment.from_triples(
+                    term_arr,
+                    np.asarray(docs, dtype=np.int32),
+                    np.asarray(tfs, dtype=np.float32),
+                    n_terms,
+                )
+            )
+            while (
+                len(self._segments) >= 2
+                and self._segments[-2].n_postings <= _MERGE_RATIO * self._segments[-1].n_postings
+            ):
+                newer = self._segments.pop()
+                self._segments[-1] = self._segments[-1].merged(newer, alive)
+
+        self._df = df
+        self._alive = alive
+        self._avg_idf = None
+
+    def _idf(self, tids: np.ndarray) -> np.ndarray:
+        """IDF of the given term ids under the current document count."""
+        df = self._df[tids]
+        idf = np.log(self._n_alive - df + 0.5) - np.log(df + 0.5)
+        negative = idf < 0
+        if negative.any():
+            # rank_bm25 floors negative IDF (terms in over half the documents)
+            idf[negative] = self.epsilon * self._average_idf()
+        return idf
+
+    def _average_idf(self) -> float:
+        """Mean IDF over present terms. O(vocabulary), so it is only computed
+        when a query hits a negative-IDF term, and then cached until the next
+        update."""
+        avg = self._avg_idf
+        if avg is None:
+            df = self._df[self._df > 0]
+            idf = np.log(self._n_alive - df + 0.5) - np.log(df + 0.5)
+            avg = self._avg_idf = float(idf.mean()) if len(idf) else 0.0
+        return avg
 
     def retrieve(self, query: str, k: int = 50) -> list[tuple[str, float]]:
-        """Return top-k (chunk_id, score) pairs."""
-        if not self._bm25:
+        """Return top-k (chunk_id, score) pairs; only docs sharing a query term score."""
+        if not self._n_alive or k <= 0:
+            return []
+        query_tf = Counter(
+            tid for tid in (self._vocab.get(t) for t in _tokenize(query)) if tid is not None
+        )
+        if not query_tf:
+            return []
+
+        tids = np.fromiter(query_tf, dtype=np.int64, count=len(query_tf))
+        idf_by_term = dict(zip(query_tf, self._idf(tids)))
+        # Length norm k1 * (1 - b + b * dl / avgdl), evaluated only for the
+        # postings a query reads, so an update never touches every document
+        avgdl = self._total_len / self._n_alive
+        norm_base = self.k1 * (1.0 - self.b)
+        norm_scale = self.k1 * self.b / avgdl if avgdl > 0 else 0.0
+
+        has_dead = self._n_alive < len(self._chunk_ids)
+        doc_parts: list[np.ndarray] = []
+        score_parts: list[np.ndarray] = []
+        for tid, qtf in query_tf.items():
+            weight = idf_by_term[tid] * qtf * (self.k1 + 1.0)
+            for seg in self._segments:
+                if tid >= seg.n_terms:
+                    continue
+                lo, hi = seg.indptr[tid], seg.indptr[tid + 1]
+                if lo == hi:
+                    continue
+                docs = seg.indices[lo:hi]
+                tf = seg.data[lo:hi]
+                if has_dead:
+                    keep = self._alive[docs]
+                    docs, tf = docs[keep], tf[keep]
+                doc_parts.append(docs)
+                norm = norm_base + norm_scale * self._doc_len[docs]
+                score_parts.append(weight * tf / (tf + norm))
+
+        if not doc_parts:
             return []
-        tokenized_query = _tokenize(query)
-        scores = self._bm25.get_scores(tokenized_query)
-        # Sort by score descending
-        indexed = list(zip(self._chunk_ids, scores.tolist()))
-        indexed.sort(key=lambda x: x[1], reverse=True)
-        return indexed[:k]
+        if len(doc_parts) == 1:
+            doc_ids, scores = doc_parts[0], score_parts[0]
+        else:
+            doc_ids, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+
+        if k < len(doc_ids):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(doc_ids))
+        # Score descending, ties broken by insertion order
+        top = top[np.lexsort((doc_ids[top], -scores[top]))]
+        return [(self._chunk_ids[doc_ids[i]], float(scores[i])) for i in top]
+
+    # ------------------------------------------------------------------
+    # Snapshots
+    # ------------------------------------------------------------------
+
+    def save(self, directory: str | Path, db_key: str) -> Path:
+        """Write a snapshot generation under `directory` and point CURRENT at it.
+
+        Segment files already present in the previous generation are
+        hard-linked rather than rewritten. db_key identifies the chunks-table
+        state the index was built from; load() refuses snapshots whose key no
+        longer matches. Concurrent savers (another API worker, a CLI ingest)
+        take turns on the directory's lock file.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        with _snapshot_lock(directory):
+            return self._save_locked(directory, db_key)
+
+    def _save_locked(self, directory: Path, db_key: str) -> Path:
+        try:
+            prev_dir: Path | None = directory / (directory / _CURRENT_FILE).read_text().strip()
+        except OSError:
+            prev_dir = None
+        gen_dir = directory / f"gen-{time.time_ns()}"
+        gen_dir.mkdir()
+
+        for name in _DOC_ARRAYS + _TERM_ARRAYS:
+            np.save(gen_dir / f"{name}.npy", getattr(self, f"_{name}"))
+        for seg in self._segments:
+            for name in _SEGMENT_ARRAYS:
+                fname = f"seg-{seg.name}-{name}.npy"
+                prev = prev_dir / fname if prev_dir is not None else None
+                try:
+                    if prev is None:
+                        raise OSError
+                    os.link(prev, gen_dir / fname)
+                except OSError:
+                    np.save(gen_dir / fname, getattr(seg, name))
+        vocab = sorted(self._vocab, key=self._vocab.__getitem__)
+        (gen_dir / "vocab.json").write_text(json.dumps(vocab))
+        (gen_dir / "chunk_ids.json").write_text(json.dumps(self._chunk_ids))
+        manifest = {
+            "version": SNAPSHOT_VERSION,
+            "db_key": db_key,
+            "k1": self.k1,
+            "b": self.b,
+            "epsilon": self.epsilon,
+            "n_docs": len(self._chunk_ids),
+            "n_terms": len(vocab),
+            "segments": [seg.name for seg in self._segments],
+        }
+        (gen_dir / "manifest.json").write_text(json.dumps(manifest))
+
+        # Atomically repoint CURRENT, then drop generations older than the
+        # previous one: a reader may still be opening the previous generation
+        tmp = directory / f"{_CURRENT_FILE}.tmp"
+        tmp.write_text(gen_dir.name)
+        os.replace(tmp, directory / _CURRENT_FILE)
+        keep_from = _generation_ns(prev_dir) if prev_dir is not None else _generation_ns(gen_dir)
+        for old in directory.glob("gen-*"):
+            if old not in (gen_dir, prev_dir) and _generation_ns(old) < keep_from:
+                shutil.rmtree(old, ignore_errors=True)
+        return gen_dir
+
+    @classmethod
+    def load(
+        cls,
+        directory: str | Path,
+        db_key: str | None = None,
+        mmap: bool = True,
+    ) -> "BM25Index | None":
+        """Map a snapshot back in; returns None if missing, stale or incompatible.
+
+        If the generation CURRENT named is collected while it is being read
+        (a newer snapshot was saved meanwhile), CURRENT is re-read once; the
+        caller rebuilds from SQLite when None comes back.
+        """
+        directory = Path(directory)
+        for _ in range(2):
+            try:
+                gen_dir = directory / (directory / _CURRENT_FILE).read_text().strip()
+            except OSError:
+                return None
+            index = cls._load_generation(gen_dir, db_key, "r" if mmap else None)
+            if index is not None or gen_dir.exists():
+                return index
+        return None
+
+    @classmethod
+    def _load_generation(
+        cls, gen_dir: Path, db_key: str | None, mmap_mode: str | None
+    ) -> "BM25Index | None":
+        try:
+            manifest = json.loads((gen_dir / "manifest.json").read_text())
+        except (OSError, ValueError):
+            return None
+        if manifest.get("version") != SNAPSHOT_VERSION:
+            return None
+        if db_key is not None and manifest.get("db_key") != db_key:
+            return None
 
+        index = cls(k1=manifest["k1"], b=manifest["b"], epsilon=manifest["epsilon"])
+        try:
+            for name in _DOC_ARRAYS + _TERM_ARRAYS:
+                setattr(index, f"_{name}", np.load(gen_dir / f"{name}.npy", mmap_mode=mmap_mode))
+            for seg_name in manifest["segments"]:
+                arrays = [
+                    np.load(gen_dir / f"seg-{seg_name}-{name}.npy", mmap_mode=mmap_mode)
+                    for name in _SEGMENT_ARRAYS
+                ]
+                index._segments.append(_Segment(seg_name, *arrays))
+            vocab = json.loads((gen_dir / "vocab.json").read_text())
+            index._chunk_ids = json.loads((gen_dir / "chunk_ids.json").read_text())
+        except (OSError, ValueError, KeyError):
+            return None
+        index._vocab = {term: i for i, term in enumerate(vocab)}
+        if len(index._chunk_ids) != manifest["n_docs"] or len(vocab) != manifest["n_terms"]:
+            return None
+        index._n_alive = int(np.count_nonzero(index._alive))
+        index._total_len = float(index._doc_len[index._alive].sum(dtype=np.float64))
+        return index
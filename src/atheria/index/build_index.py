@@ -1,24 +1,44 @@
 """Build BM25 + dense index from papers, persisting everything to SQLite."""
 
+import time
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
+from typing import Callable, Iterator
 
-from atheria.config import RAW_DIR
-from atheria.db.connection import get_connection
+from atheria.config import BM25_SNAPSHOT_DIR, INGEST_WINDOW, RAW_DIR
+from atheria.db.connection import bulk_load, get_connection
 from atheria.db.migrations import apply_migrations
 from atheria.db.repositories.chunk_repo import ChunkRepository
+from atheria.db.repositories.ingest_repo import DONE_STATUSES, IngestFile, IngestFileRepository
 from atheria.db.repositories.paper_repo import PaperRepository
 from atheria.index.bm25_index import BM25Index
 from atheria.index.dense_index import (
+    delete_embeddings,
     encode_articles,
     store_embeddings,
-    clear_embeddings,
 )
-from atheria.ingest.chunker import chunk_document
-from atheria.ingest.pmc_parser import parse_pdf, parse_pmc, parse_raw_text
+from atheria.ingest.pipeline import ParsedFile, file_sha256, iter_parsed_files
 from atheria.models.chunk import Chunk
 from atheria.models.paper import Paper
 
 
+@dataclass
+class IngestProgress:
+    """Live counters for one ingest run; safe to read from another thread."""
+
+    # planning, parsing, waiting_for_encoder, encoding, waiting_for_writer, writing, done
+    stage: str = "planning"
+    total_files: int = 0
+    skipped_files: int = 0
+    processed_files: int = 0
+    papers_indexed: int = 0
+    chunks_indexed: int = 0
+    encode_seconds: float = 0.0
+    errors: list[str] = field(default_factory=list)
+
+
 def _is_duplicate(paper_repo: PaperRepository, paper: "Paper", source_url: str) -> bool:
     """Return True if a paper matching pmid, source_url, or normalized title exists."""
     if paper.pmid and paper_repo.get_by_pmid(paper.pmid):
@@ -30,20 +50,44 @@ def _is_duplicate(paper_repo: PaperRepository, paper: "Paper", source_url: str)
     return False
 
 
-def build_index(
-    input_path: str | Path,
-    append: bool = False,
-) -> tuple[list[Paper], list[Chunk]]:
-    """Parse paper(s), chunk, and build BM25 + dense index in SQLite.
+def load_bm25(conn) -> BM25Index:
+    """Map in the persisted BM25 snapshot, rebuilding it only when stale."""
+    chunk_repo = ChunkRepository(conn)
+    db_key = chunk_repo.state_key()
+    bm25 = BM25Index.load(BM25_SNAPSHOT_DIR, db_key)
+    if bm25 is not None:
+        return bm25
+    bm25 = BM25Index()
+    bm25.add_chunks(chunk_repo.load_all_for_bm25())
+    bm25.save(BM25_SNAPSHOT_DIR, db_key)
+    return bm25
 
-    Input can be:
-    - Path to a PMC XML/HTML file
-    - Path to a directory of PMC files
-    - Path to a raw .txt fallback file
+
+def _save_bm25_snapshot(conn, bm25: BM25Index | None, db_key: str) -> None:
+    """Persist the incrementally extended BM25 index under db_key, the chunks
+    state it reflects.
+
+    bm25 is None when that state is unknown (no snapshot matched the pre-ingest
+    DB state, or another writer changed chunks mid-run); the index is then
+    rebuilt from SQLite, reading the rows and their state key in one snapshot.
     """
-    input_path = Path(input_path)
+    if bm25 is None:
+        chunk_repo = ChunkRepository(conn)
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN")
+        try:
+            db_key = chunk_repo.state_key()
+            bm25 = BM25Index()
+            bm25.add_chunks(chunk_repo.load_all_for_bm25())
+        finally:
+            conn.commit()
+    bm25.save(BM25_SNAPSHOT_DIR, db_key)
 
-    # Collect files to process
+
+def _collect_files(input_path: Path) -> list[Path]:
+    """The input file itself, or the PMC XML/HTML and PDF files in a directory
+    (falling back to .txt files when there are none)."""
     files: list[Path] = []
     if input_path.is_file():
         files = [input_path]
@@ -57,82 +101,387 @@ def build_index(
         )
         if not files:
             files = list(input_path.glob("*.txt"))
+    return files
+
 
-    papers: list[Paper] = []
-    all_chunks: list[Chunk] = []
+def _write_window(
+    writer: Callable[[], AbstractContextManager],
+    bm25: BM25Index | None,
+    bm25_key: str,
+    papers: list[Paper],
+    chunks: list[Chunk],
+    entries: list[IngestFile],
+    outcomes: list[IngestFile],
+    encode: bool,
+    progress: IngestProgress,
+    encode_slot: AbstractContextManager,
+) -> tuple[BM25Index | None, str]:
+    """Commit one window in two stages: papers + chunks, then their vectors.
 
-    conn = get_connection()
-    apply_migrations(conn)
+    The ledger entries move to "chunked" with the first commit and to
+    "embedded" with the second, so an interrupted encode is resumed on the
+    next run without re-parsing. Each stage leases the writer only for its
+    own transaction; encoding runs in between without it.
+
+    Returns bm25 extended with the window's chunks and the chunks state key it
+    now reflects; bm25 becomes None if another writer changed chunks since
+    bm25_key (the snapshot is then rebuilt at the end of the run).
+    """
+    progress.stage = "waiting_for_writer"
+    with writer() as conn:
+        progress.stage = "writing"
+        chunk_repo = ChunkRepository(conn)
+        if bm25 is not None and chunk_repo.state_key() != bm25_key:
+            bm25 = None
+        ledger = IngestFileRepository(conn)
+        with bulk_load(conn):
+            ledger.upsert_many(outcomes)
+            PaperRepository(conn).insert_many(papers)
+            chunk_repo.insert_many(chunks)
+            for entry in entries:
+                entry.status = "chunked"
+            ledger.upsert_many(entries)
+        bm25_key = chunk_repo.state_key()
+    if bm25 is not None:
+        bm25.add_chunks(chunks)
+    if encode:
+        _embed_and_store(writer, chunks, entries, progress, encode_slot)
+    return bm25, bm25_key
+
+
+def _embed_and_store(
+    writer: Callable[[], AbstractContextManager],
+    chunks: list[Chunk],
+    entries: list[IngestFile],
+    progress: IngestProgress,
+    encode_slot: AbstractContextManager,
+) -> None:
+    embeddings = []
+    if chunks:
+        articles = [[" → ".join(c.section_path) or "Section", c.text] for c in chunks]
+        progress.stage = "waiting_for_encoder"
+        with encode_slot:
+            progress.stage = "encoding"
+            print(f"Encoding {len(chunks)} chunks with MedCPT Article Encoder...")
+            start = time.perf_counter()
+            embeddings = encode_articles(articles)
+            progress.encode_seconds += time.perf_counter() - start
+    progress.stage = "waiting_for_writer"
+    with writer() as conn:
+        progress.stage = "writing"
+        with bulk_load(conn):
+            if chunks:
+                store_embeddings(conn, chunks, embeddings)
+            for entry in entries:
+                entry.status = "embedded"
+            IngestFileRepository(conn).upsert_many(entries)
+
+
+def _fingerprint_files(conn, files: list[Path]) -> dict[Path, tuple[int, int, str | None]]:
+    """(size, mtime_ns, content hash) for each file, before the writer is leased.
+
+    Files whose size + mtime match their ledger row are not hashed (None), so
+    only new or touched files are read; _plan_files trusts the ledger for the
+    rest. Runs on a read connection, outside any write transaction.
+    """
+    paths = {f: str(f.resolve()) for f in files}
+    known = IngestFileRepository(conn).get_many(list(paths.values()))
+    fingerprints: dict[Path, tuple[int, int, str | None]] = {}
+    for f, key in paths.items():
+        st = f.stat()
+        prev = known.get(key)
+        trusted = prev is not None and (prev.size, prev.mtime_ns) == (st.st_size, st.st_mtime_ns)
+        fingerprints[f] = (st.st_size, st.st_mtime_ns, None if trusted else file_sha256(f))
+    return fingerprints
+
+
+def _plan_files(
+    conn, files: list[Path], fingerprints: dict[Path, tuple[int, int, str | None]]
+) -> tuple[dict[Path, IngestFile], list[IngestFile], list[IngestFile]]:
+    """Check each file against the ingest ledger before any parsing.
+
+    Returns (to_parse, to_resume, replaced): ledger entries for files that
+    must be parsed, entries stuck at "chunked" whose vectors still need
+    encoding, and the previous entries of files whose bytes changed (their
+    old papers must be removed). Size + mtime matching the ledger is trusted;
+    otherwise the content hash decides, so a touched but unchanged file is
+    not re-indexed. Unchanged-file and duplicate-content outcomes are
+    recorded in the ledger here (committed with the next transaction).
+
+    Hashes come from fingerprints (see _fingerprint_files); a file is hashed
+    here only if another run changed its ledger row in between.
+    """
+    ledger = IngestFileRepository(conn)
     paper_repo = PaperRepository(conn)
-    chunk_repo = ChunkRepository(conn)
+    paths = {f: str(f.resolve()) for f in files}
+    known = ledger.get_many(list(paths.values()))
+    # A ledger row whose paper has since been deleted (e.g. by a cleanup
+    # migration) no longer counts as indexed; drop its orphaned vectors.
+    live = paper_repo.get_by_ids(sorted({e.paper_id for e in known.values() if e.paper_id}))
+    for key, entry in list(known.items()):
+        if entry.paper_id and entry.paper_id not in live:
+            delete_embeddings(conn, entry.paper_id)
+            del known[key]
 
-    for f in files:
-        if f.suffix.lower() == ".pdf":
-            doc = parse_pdf(f)
+    to_parse: dict[Path, IngestFile] = {}
+    to_resume: list[IngestFile] = []
+    replaced: list[IngestFile] = []
+    updates: list[IngestFile] = []
+    for f, key in paths.items():
+        size, mtime_ns, digest = fingerprints[f]
+        prev = known.get(key)
+        if prev is not None and (prev.size, prev.mtime_ns) == (size, mtime_ns):
+            content_hash = prev.content_hash
         else:
-            doc = parse_pmc(f)
-        if doc is None:
-            doc = parse_raw_text(f)
-        if doc is None:
-            continue
+            content_hash = digest or file_sha256(f)
+        entry = IngestFile(key, size, mtime_ns, content_hash, "parsed")
 
-        metadata = doc.metadata or {}
-        source_url = metadata.get("source_url") or str(f.resolve())
-        paper = Paper.create(
-            title=doc.title,
-            pmid=metadata.get("pmid"),
-            source_url=source_url,
-            metadata=metadata,
-        )
+        if prev is not None and prev.content_hash == content_hash:
+            if (prev.size, prev.mtime_ns) != (size, mtime_ns):
+                prev.size, prev.mtime_ns = size, mtime_ns
+                updates.append(prev)
+            if prev.status == "chunked":
+                to_resume.append(prev)
+                continue
+            if prev.status in DONE_STATUSES:
+                continue
+        elif prev is not None and prev.paper_id:
+            replaced.append(prev)
+        elif prev is None:
+            # Indexed before the ledger existed
+            paper = paper_repo.get_by_source_url(key)
+            if paper is not None:
+                entry.status, entry.paper_id = "embedded", str(paper.paper_id)
+                updates.append(entry)
+                continue
 
-        if _is_duplicate(paper_repo, paper, source_url):
-            print(f"Skipping duplicate: {paper.title}")
+        twin = ledger.get_indexed_by_hash(content_hash)
+        if twin is not None and twin.path != key:
+            entry.status, entry.error = "duplicate", f"same content as {twin.path}"
+            updates.append(entry)
             continue
+        to_parse[f] = entry
+
+    ledger.upsert_many(updates)
+    return to_parse, to_resume, replaced
 
-        papers.append(paper)
-        chunks = chunk_document(doc, paper)
-        all_chunks.extend(chunks)
-
-    if not all_chunks:
-        conn.close()
-        return papers, all_chunks
-
-    # Write papers and chunks to DB
-    for paper in papers:
-        paper_repo.insert(paper)
-    for chunk in all_chunks:
-        chunk_repo.insert(chunk)
-
-    vec_table_exists = (
-        conn.execute(
-            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='vec_chunks' LIMIT 1"
-        ).fetchone()
-        is not None
-    )
-    if vec_table_exists:
-        # Build and encode embeddings only when sqlite-vec is available.
-        articles = [[" → ".join(c.section_path) or "Section", c.text] for c in all_chunks]
-        print(f"Encoding {len(all_chunks)} chunks with MedCPT Article Encoder...")
-        embeddings = encode_articles(articles, batch_size=32)
-
-        # Store in sqlite-vec (clear existing unless appending to an existing index)
-        if not append:
-            clear_embeddings(conn)
-        store_embeddings(conn, all_chunks, embeddings)
-    else:
-        print("sqlite-vec unavailable on this Python build; skipping dense embedding index.")
-
-    conn.commit()
-    conn.close()
-
-    print(f"Indexed {len(papers)} paper(s), {len(all_chunks)} chunk(s).")
-    return papers, all_chunks
+
+def _remove_replaced(conn, replaced: list[IngestFile]) -> list[str]:
+    """Delete the papers of changed files (chunks, vectors, ledger row) in one transaction."""
+    removed_ids: list[str] = []
+    with bulk_load(conn):
+        chunk_repo = ChunkRepository(conn)
+        paper_repo = PaperRepository(conn)
+        ledger = IngestFileRepository(conn)
+        for entry in replaced:
+            delete_embeddings(conn, entry.paper_id)
+            removed_ids.extend(chunk_repo.delete_by_paper(entry.paper_id))
+            paper_repo.delete(entry.paper_id)
+            ledger.delete(entry.path)
+    return removed_ids
+
+
+def iter_index_windows(
+    input_path: str | Path,
+    workers: int = 1,
+    window: int = INGEST_WINDOW,
+    on_file: Callable[[ParsedFile], None] | None = None,
+    progress: IngestProgress | None = None,
+    encode_slot: AbstractContextManager | None = None,
+    conn=None,
+    writer: Callable[[], AbstractContextManager] | None = None,
+) -> Iterator[tuple[list[Paper], list[Chunk], list[str]]]:
+    """Streaming ingest: parse, chunk, encode, write and commit `window` papers at a time.
+
+    Only the current window's papers, chunks and embeddings are held in
+    memory, so peak memory stays flat regardless of corpus size. Each window
+    is committed before the next is written, so a crash mid-run leaves the
+    committed papers queryable (a stale BM25 snapshot is rebuilt from SQLite
+    on next load).
+
+    Files are checked against the ingest_files ledger first: unchanged files
+    are skipped without parsing, an interrupted embedding stage is resumed,
+    and files whose bytes changed replace their previous paper.
+
+    progress, if given, is updated as the run advances. encode_slot (e.g. a
+    semaphore shared by concurrent runs) is held around each encode pass.
+
+    writer, if given, returns a context manager leasing the write connection
+    (e.g. ConnectionPool.writer). It is entered only around each write
+    transaction (migrations, planning, each window's two commits), never
+    while hashing, parsing or encoding, so concurrent runs interleave their
+    windows. Reads go to
+    conn, which is left open if given; otherwise a connection is opened and
+    closed here (read-only when writer is given). Without writer, conn also
+    takes the writes.
+
+    Yields (papers, chunks, removed_chunk_ids) after each committed window.
+    """
+    progress = progress if progress is not None else IngestProgress()
+    encode_slot = encode_slot if encode_slot is not None else nullcontext()
+    files = _collect_files(Path(input_path))
+    progress.total_files = len(files)
+
+    owns_conn = conn is None
+    if owns_conn and writer is None:
+        conn = get_connection()
+    if writer is None:
+        writer = partial(nullcontext, conn)
+    try:
+        progress.stage = "waiting_for_writer"
+        with writer() as wconn:
+            apply_migrations(wconn)
+        if conn is None:
+            conn = get_connection(read_only=True)
+        progress.stage = "planning"
+        # Hash new or touched files before leasing the writer for the plan
+        fingerprints = _fingerprint_files(conn, files)
+        progress.stage = "waiting_for_writer"
+        with writer() as wconn:
+            progress.stage = "planning"
+            chunk_repo = ChunkRepository(wconn)
+            bm25 = BM25Index.load(BM25_SNAPSHOT_DIR, chunk_repo.state_key())
+            vec_table_exists = (
+                wconn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type='table' AND name='vec_chunks' LIMIT 1"
+                ).fetchone()
+                is not None
+            )
+            to_parse, to_resume, replaced = _plan_files(wconn, files, fingerprints)
+            removed_ids: list[str] = []
+            if replaced:
+                removed_ids = _remove_replaced(wconn, replaced)
+                if bm25 is not None:
+                    bm25.remove_chunks(removed_ids)
+            wconn.commit()
+            bm25_key = chunk_repo.state_key()
+        paper_repo = PaperRepository(conn)
+
+        if not vec_table_exists:
+            print("sqlite-vec unavailable on this Python build; skipping dense embedding index.")
+        skipped = len(files) - len(to_parse) - len(to_resume)
+        progress.skipped_files = skipped
+        if skipped:
+            print(f"Skipping {skipped} unchanged or duplicate file(s).")
+        if replaced:
+            print(f"Re-indexing {len(replaced)} changed file(s).")
+        wrote_any = bool(replaced)
+
+        if to_resume and vec_table_exists:
+            print(f"Resuming embedding for {len(to_resume)} file(s).")
+            chunk_repo = ChunkRepository(conn)
+            for i in range(0, len(to_resume), window):
+                entries = to_resume[i : i + window]
+                chunks = [c for e in entries for c in chunk_repo.get_by_paper(e.paper_id)]
+                _embed_and_store(writer, chunks, entries, progress, encode_slot)
+                progress.processed_files += len(entries)
+
+        failed: list[ParsedFile] = []
+        papers: list[Paper] = []
+        chunks: list[Chunk] = []
+        entries: list[IngestFile] = []
+        outcomes: list[IngestFile] = []
+        progress.stage = "parsing"
+        for result in iter_parsed_files(list(to_parse), workers=workers):
+            entry = to_parse[result.path]
+            progress.processed_files += 1
+            paper = result.paper
+            if paper is not None:
+                if _is_duplicate(paper_repo, paper, paper.source_url):
+                    print(f"Skipping duplicate: {paper.title}")
+                    result.status = "duplicate"
+                else:
+                    result.status = "indexed"
+                    entry.paper_id = str(paper.paper_id)
+                    papers.append(paper)
+                    chunks.extend(result.chunks)
+                    entries.append(entry)
+            elif result.status == "failed":
+                failed.append(result)
+                progress.errors.append(f"{result.path}: {result.error}")
+            if result.status != "indexed":
+                entry.status, entry.error = result.status, result.error
+            outcomes.append(entry)
+            if on_file is not None:
+                on_file(result)
+
+            if len(papers) >= window:
+                bm25, bm25_key = _write_window(
+                    writer, bm25, bm25_key, papers, chunks, entries, outcomes,
+                    vec_table_exists, progress, encode_slot,
+                )
+                wrote_any = True
+                progress.papers_indexed += len(papers)
+                progress.chunks_indexed += len(chunks)
+                progress.stage = "parsing"
+                yield papers, chunks, removed_ids
+                papers, chunks, entries, outcomes, removed_ids = [], [], [], [], []
+
+        if papers:
+            bm25, bm25_key = _write_window(
+                writer, bm25, bm25_key, papers, chunks, entries, outcomes,
+                vec_table_exists, progress, encode_slot,
+            )
+            wrote_any = True
+            progress.papers_indexed += len(papers)
+            progress.chunks_indexed += len(chunks)
+        elif outcomes:
+            with writer() as wconn:
+                IngestFileRepository(wconn).upsert_many(outcomes)
+                wconn.commit()
+        if papers or removed_ids:
+            yield papers, chunks, removed_ids
+
+        if failed:
+            print(f"Failed to parse {len(failed)} file(s):")
+            for result in failed:
+                print(f"  {result.path}: {result.error}")
+
+        if wrote_any:
+            progress.stage = "writing"
+            _save_bm25_snapshot(conn, bm25, bm25_key)
+        progress.stage = "done"
+    finally:
+        if owns_conn and conn is not None:
+            conn.close()
+
+
+def build_index(
+    input_path: str | Path,
+    workers: int = 1,
+    on_file: Callable[[ParsedFile], None] | None = None,
+    window: int = INGEST_WINDOW,
+) -> tuple[int, int]:
+    """Parse paper(s), chunk, and build BM25 + dense index in SQLite.
+
+    Returns (papers indexed, chunks indexed).
+
+    Input can be:
+    - Path to a PMC XML/HTML file
+    - Path to a directory of PMC files
+    - Path to a raw .txt fallback file
+
+    workers > 1 parses and chunks files in a process pool; this process stays
+    the single writer. on_file is called once per input file with its timing
+    and final status (indexed, duplicate, unparseable, failed); files the
+    ingest ledger marks as unchanged are skipped without a callback.
+
+    Writes are committed per window (see iter_index_windows); only counts
+    are kept across windows, so memory stays flat for any corpus size.
+    """
+    n_papers = n_chunks = 0
+    for window_papers, window_chunks, _ in iter_index_windows(
+        input_path, workers=workers, window=window, on_file=on_file
+    ):
+        n_papers += len(window_papers)
+        n_chunks += len(window_chunks)
+    return n_papers, n_chunks
 
 
 def load_state(
     conn=None,
 ) -> tuple[dict[str, Paper], dict[str, Chunk], BM25Index]:
-    """Load papers, chunks, and rebuild the in-memory BM25 index from SQLite.
+    """Load papers, chunks, and the BM25 index (snapshot or rebuild) from SQLite.
 
     Returns (paper_by_id, chunk_by_id, bm25).
     Dense retrieval is now a DB query — use SqliteVecAdapter from dense_index.
@@ -141,16 +490,13 @@ def load_state(
         conn = get_connection()
 
     paper_repo = PaperRepository(conn)
-    chunk_repo = ChunkRepository(conn)
 
     papers = paper_repo.get_all_as_dict()
-    all_chunks = chunk_repo.load_all_for_bm25()
 
     # Rebuild full Chunk objects for retrieval hydration
     chunk_rows = conn.execute("SELECT * FROM chunks").fetchall()
     chunks = {r["chunk_id"]: Chunk.from_row(r) for r in chunk_rows}
 
-    bm25 = BM25Index()
-    bm25.add_chunks(all_chunks)
+    bm25 = load_bm25(conn)
 
     return papers, chunks, bm25
@@ -1,20 +1,40 @@
 """Dense retrieval using MedCPT embeddings stored in SQLite via sqlite-vec."""
 
+import logging
 import sqlite3
+import threading
+from functools import lru_cache
 from typing import Any
 
-import torch
-from transformers import AutoModel, AutoTokenizer
+import numpy as np
+from transformers import AutoTokenizer
 
 import sqlite_vec
 
-from atheria.config import MEDCPT_ARTICLE_ENCODER, MEDCPT_QUERY_ENCODER
+from atheria.config import (
+    ARTICLE_MAX_BATCH,
+    ARTICLE_TOKEN_BUDGET,
+    MEDCPT_ARTICLE_ENCODER,
+    MEDCPT_QUERY_ENCODER,
+    QUERY_ENCODE_BATCH,
+    VEC_IP_OVERFETCH,
+    VEC_METRIC,
+)
+from atheria.db.migrations import VEC_TABLE_METRICS, _vec_table_metric
+from atheria.index.query_cache import get_query_embedding_cache
+from atheria.inference.backend import InferenceModel, load_model
 
-# Module-level lazy model state
+logger = logging.getLogger(__name__)
+
+# Module-level lazy model state (backend chosen by INFERENCE_BACKEND)
 _article_tokenizer: AutoTokenizer | None = None
-_article_model: AutoModel | None = None
+_article_model: InferenceModel | None = None
 _query_tokenizer: AutoTokenizer | None = None
-_query_model: AutoModel | None = None
+_query_model: InferenceModel | None = None
+# Warm-up, ingest jobs and inference threads may all ask for a model first;
+# the locks make them wait for one load instead of each loading a copy.
+_article_load_lock = threading.Lock()
+_query_load_lock = threading.Lock()
 
 
 def _has_vec_table(conn: sqlite3.Connection) -> bool:
@@ -26,53 +46,158 @@ def _has_vec_table(conn: sqlite3.Connection) -> bool:
 
 def _ensure_article_model() -> None:
     global _article_tokenizer, _article_model
-    if _article_model is None:
-        _article_tokenizer = AutoTokenizer.from_pretrained(MEDCPT_ARTICLE_ENCODER)
-        _article_model = AutoModel.from_pretrained(MEDCPT_ARTICLE_ENCODER)
-        _article_model.eval()
+    if _article_model is not None:
+        return
+    with _article_load_lock:
+        if _article_model is None:
+            _article_tokenizer = AutoTokenizer.from_pretrained(MEDCPT_ARTICLE_ENCODER)
+            _article_model = load_model(MEDCPT_ARTICLE_ENCODER, "cls")
 
 
 def _ensure_query_model() -> None:
     global _query_tokenizer, _query_model
-    if _query_model is None:
-        _query_tokenizer = AutoTokenizer.from_pretrained(MEDCPT_QUERY_ENCODER)
-        _query_model = AutoModel.from_pretrained(MEDCPT_QUERY_ENCODER)
-        _query_model.eval()
+    if _query_model is not None:
+        return
+    with _query_load_lock:
+        if _query_model is None:
+            _query_tokenizer = AutoTokenizer.from_pretrained(MEDCPT_QUERY_ENCODER)
+            _query_model = load_model(MEDCPT_QUERY_ENCODER, "cls")
+
 
+def _length_bucketed_batches(
+    lengths: list[int], token_budget: int, max_batch: int
+) -> list[list[int]]:
+    """Group indices sorted by token length so each padded batch fits the budget.
+
+    A batch is padded to its longest member, so its cost is
+    len(batch) * max_len; sorting keeps members of similar length together.
+    """
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    batches: list[list[int]] = []
+    batch: list[int] = []
+    for i in order:
+        # lengths ascend, so lengths[i] is the padded length if i joins the batch
+        if batch and (len(batch) >= max_batch or (len(batch) + 1) * lengths[i] > token_budget):
+            batches.append(batch)
+            batch = []
+        batch.append(i)
+    if batch:
+        batches.append(batch)
+    return batches
 
-def encode_articles(articles: list[list[str]], batch_size: int = 32) -> list[list[float]]:
-    """Encode [[section, text], ...] pairs. Returns list of 768-dim vectors."""
+
+def encode_articles(
+    articles: list[list[str]],
+    batch_size: int = ARTICLE_MAX_BATCH,
+    token_budget: int | None = ARTICLE_TOKEN_BUDGET,
+) -> list[list[float]]:
+    """Encode [[section, text], ...] pairs. Returns list of 768-dim vectors.
+
+    Inputs are pre-tokenized, sorted by token length and batched by a padded
+    token budget (at most batch_size per batch); output order matches input.
+    token_budget=None uses fixed batches of batch_size in input order.
+    """
     _ensure_article_model()
+    if token_budget is None:
+        return _encode_articles_fixed(articles, batch_size)
+    if not articles:
+        return []
+
+    encoded = _article_tokenizer(articles, truncation=True, max_length=512)
+    lengths = [len(ids) for ids in encoded["input_ids"]]
+    keys = list(encoded.keys())
+    all_embeds: list[list[float] | None] = [None] * len(articles)
+    for batch in _length_bucketed_batches(lengths, token_budget, batch_size):
+        features = [{k: encoded[k][i] for k in keys} for i in batch]
+        padded = _article_tokenizer.pad(features, return_tensors="np")
+        embeds = _article_model(padded).tolist()
+        for i, embed in zip(batch, embeds):
+            all_embeds[i] = embed
+    return all_embeds
+
+
+def _encode_articles_fixed(articles: list[list[str]], batch_size: int) -> list[list[float]]:
+    """Fixed-size batches in input order, each padded to its longest member."""
     all_embeds: list[list[float]] = []
     for i in range(0, len(articles), batch_size):
         batch = articles[i : i + batch_size]
-        with torch.no_grad():
-            encoded = _article_tokenizer(
-                batch,
-                truncation=True,
-                padding=True,
-                return_tensors="pt",
-                max_length=512,
-            )
-            outputs = _article_model(**encoded)
-            embeds = outputs.last_hidden_state[:, 0, :].cpu().tolist()
-        all_embeds.extend(embeds)
+        encoded = _article_tokenizer(
+            batch,
+            truncation=True,
+            padding=True,
+            return_tensors="np",
+            max_length=512,
+        )
+        all_embeds.extend(_article_model(encoded).tolist())
     return all_embeds
 
 
 def encode_query(query: str) -> list[float]:
-    """Encode a single query string to a 768-dim vector."""
+    """Encode a single query string to a 768-dim vector (cached on normalized text)."""
+    return get_query_embedding_cache().get_or_encode(query, _encode_query_uncached)
+
+
+def cached_query_embedding(query: str, conn: sqlite3.Connection | None = None) -> list[float] | None:
+    """The cached vector for query, or None; conn serves the side-table read."""
+    return get_query_embedding_cache().get(query, conn)
+
+
+def encode_and_cache_query(query: str) -> list[float]:
+    """Encode query with the model (no cache lookup) and cache the vector."""
+    vec = _encode_query_uncached(query)
+    get_query_embedding_cache().put(query, vec)
+    return vec
+
+
+def _encode_query_uncached(query: str) -> list[float]:
     _ensure_query_model()
-    with torch.no_grad():
+    encoded = _query_tokenizer(
+        [query],
+        truncation=True,
+        padding=True,
+        return_tensors="np",
+        max_length=64,
+    )
+    return _query_model(encoded).tolist()[0]
+
+
+def encode_queries(queries: list[str], batch_size: int = QUERY_ENCODE_BATCH) -> list[list[float]]:
+    """Encode many queries; cache misses share padded query-encoder batches."""
+    return get_query_embedding_cache().get_or_encode_many(
+        queries, lambda todo: _encode_queries_uncached(todo, batch_size)
+    )
+
+
+def _encode_queries_uncached(queries: list[str], batch_size: int) -> list[list[float]]:
+    _ensure_query_model()
+    embeds: list[list[float]] = []
+    for i in range(0, len(queries), batch_size):
         encoded = _query_tokenizer(
-            [query],
+            queries[i : i + batch_size],
             truncation=True,
             padding=True,
-            return_tensors="pt",
+            return_tensors="np",
             max_length=64,
         )
-        outputs = _query_model(**encoded)
-        return outputs.last_hidden_state[:, 0, :].cpu().tolist()[0]
+        embeds.extend(_query_model(encoded).tolist())
+    return embeds
+
+
+def warm_up_query_encoder(rounds: int = 2) -> None:
+    """Load the query encoder and run dummy passes (bypassing the cache).
+
+    Short and max-length inputs, so first-call setup for both shapes is paid
+    before real traffic arrives.
+    """
+    for _ in range(rounds):
+        _encode_query_uncached("warm up")
+        _encode_query_uncached("warm up " * 40)
+
+
+def warm_up_article_encoder(rounds: int = 2) -> None:
+    """Load the article encoder and run dummy passes at short and max length."""
+    for _ in range(rounds):
+        encode_articles([["Section", "warm up"], ["Section", "warm up " * 300]])
 
 
 def store_embeddings(
@@ -84,16 +209,69 @@ def store_embeddings(
 
     Each row in vec_chunks stores: embedding, +paper_id, +chunk_id.
     The +paper_id and +chunk_id are auxiliary (non-indexed) columns used
-    to map KNN results back to chunks.
+    to map KNN results back to chunks. The vec rowid is the chunk's chunk_key
+    (its INTEGER PRIMARY KEY, which VACUUM never renumbers; chunks must be
+    inserted first), so a chunk's vector is a point lookup; see get_embeddings().
     """
     if not _has_vec_table(conn):
         return
-    for chunk, embedding in zip(chunks, embeddings):
-        blob = sqlite_vec.serialize_float32(embedding)
-        conn.execute(
-            "INSERT INTO vec_chunks(embedding, paper_id, chunk_id) VALUES (?, ?, ?)",
-            [blob, str(chunk.paper_id), chunk.chunk_id],
+    rowid_by_chunk = _chunk_rowids(conn, [chunk.chunk_id for chunk in chunks])
+    rows = [
+        (
+            rowid_by_chunk.get(chunk.chunk_id),
+            sqlite_vec.serialize_float32(embedding),
+            str(chunk.paper_id),
+            chunk.chunk_id,
         )
+        for chunk, embedding in zip(chunks, embeddings)
+    ]
+    # A deleted chunk's rowid can be reused; drop any vector still holding it
+    conn.executemany(
+        "DELETE FROM vec_chunks WHERE rowid = ?",
+        [(r[0],) for r in rows if r[0] is not None],
+    )
+    conn.executemany(
+        "INSERT INTO vec_chunks(rowid, embedding, paper_id, chunk_id) VALUES (?, ?, ?, ?)",
+        rows,
+    )
+
+
+def _chunk_rowids(conn: sqlite3.Connection, chunk_ids: list[str]) -> dict[str, int]:
+    rowids: dict[str, int] = {}
+    for i in range(0, len(chunk_ids), 500):
+        batch = chunk_ids[i : i + 500]
+        placeholders = ",".join("?" * len(batch))
+        rowids.update(
+            conn.execute(
+                f"SELECT chunk_id, chunk_key FROM chunks WHERE chunk_id IN ({placeholders})", batch
+            ).fetchall()
+        )
+    return rowids
+
+
+def get_embeddings(conn: sqlite3.Connection, chunk_ids: list[str]) -> dict[str, np.ndarray]:
+    """Stored article vectors for chunk_ids, as float32 arrays (missing ids omitted)."""
+    if not chunk_ids or not _has_vec_table(conn):
+        return {}
+    chunk_by_rowid = {rowid: cid for cid, rowid in _chunk_rowids(conn, chunk_ids).items()}
+    rowids = list(chunk_by_rowid)
+    found: dict[str, np.ndarray] = {}
+    for i in range(0, len(rowids), 500):
+        batch = rowids[i : i + 500]
+        placeholders = ",".join("?" * len(batch))
+        for row in conn.execute(
+            f"SELECT rowid, chunk_id, embedding FROM vec_chunks WHERE rowid IN ({placeholders})",
+            batch,
+        ):
+            if chunk_by_rowid.get(row["rowid"]) == row["chunk_id"]:
+                found[row["chunk_id"]] = np.frombuffer(row["embedding"], dtype=np.float32)
+    if len(found) < len(chunk_by_rowid):
+        # Chunks without a vector (or one keyed to another chunk) score -inf in the cascade
+        logger.warning(
+            "get_embeddings: %d of %d chunk(s) have no aligned vector in vec_chunks",
+            len(chunk_by_rowid) - len(found), len(chunk_by_rowid),
+        )
+    return found
 
 
 def clear_embeddings(conn: sqlite3.Connection) -> None:
@@ -101,6 +279,13 @@ def clear_embeddings(conn: sqlite3.Connection) -> None:
     if not _has_vec_table(conn):
         return
     conn.execute("DELETE FROM vec_chunks")
+
+
+def delete_embeddings(conn: sqlite3.Connection, paper_id: str) -> None:
+    """Remove one paper's rows from the vec_chunks table."""
+    if not _has_vec_table(conn):
+        return
+    conn.execute("DELETE FROM vec_chunks WHERE paper_id = ?", [paper_id])
 
 
 def retrieve_dense(
@@ -108,32 +293,82 @@ def retrieve_dense(
     query_embedding: list[float],
     k: int = 50,
     paper_id: str | None = None,
+    metric: str = VEC_METRIC,
 ) -> list[tuple[str, float]]:
-    """Return top-k (chunk_id, similarity) using sqlite-vec KNN.
+    """Return top-k (chunk_id, similarity) using sqlite-vec KNN, best first.
+
+    metric (vec_chunks must be declared to match; see migrate_vec_metric):
+    - "ip-rescored": vec0 has no dot-product KNN, so a cosine KNN fetches
+      k * VEC_IP_OVERFETCH hits, rescored by exact dot product with their
+      stored vectors. Only those hits are rescored, so this approximates
+      inner-product KNN rather than computing it.
+    - "cosine": cosine similarity, 1 - cosine distance.
+    - "l2": legacy 1 / (1 + L2 distance).
 
-    Uses L2 distance; similarity = 1 / (1 + distance) to produce a
-    descending score comparable to cosine similarity rankings.
+    If vec_chunks is declared with a different distance metric (not yet
+    rebuilt by 'atheria migrate-vec'), hits are scored with the declared one.
     """
+    if metric not in VEC_TABLE_METRICS:
+        raise ValueError(
+            f"Unknown vec metric {metric!r}; expected one of {sorted(VEC_TABLE_METRICS)}"
+        )
     if not _has_vec_table(conn):
         return []
+    metric = _scoring_metric(conn, metric)
     blob = sqlite_vec.serialize_float32(query_embedding)
+    rescore = metric == "ip-rescored"
+    columns = "chunk_id, distance, embedding" if rescore else "chunk_id, distance"
+    fetch = k * VEC_IP_OVERFETCH if rescore else k
 
     if paper_id:
-        sql = """
-            SELECT chunk_id, distance
+        sql = f"""
+            SELECT {columns}
             FROM vec_chunks
             WHERE embedding MATCH ? AND k = ? AND paper_id = ?
         """
-        rows = conn.execute(sql, [blob, k, paper_id]).fetchall()
+        rows = conn.execute(sql, [blob, fetch, paper_id]).fetchall()
     else:
-        sql = """
-            SELECT chunk_id, distance
+        sql = f"""
+            SELECT {columns}
             FROM vec_chunks
             WHERE embedding MATCH ? AND k = ?
         """
-        rows = conn.execute(sql, [blob, k]).fetchall()
+        rows = conn.execute(sql, [blob, fetch]).fetchall()
+
+    if metric == "cosine":
+        return [(row["chunk_id"], 1.0 - row["distance"]) for row in rows]
+    if metric == "l2":
+        return [(row["chunk_id"], 1.0 / (1.0 + row["distance"])) for row in rows]
+    if not rows:
+        return []
+    vectors = np.frombuffer(b"".join(row["embedding"] for row in rows), dtype=np.float32)
+    scores = vectors.reshape(len(rows), -1) @ np.asarray(query_embedding, dtype=np.float32)
+    order = np.argsort(-scores, kind="stable")[:k]
+    return [(rows[i]["chunk_id"], float(scores[i])) for i in order]
 
-    return [(row["chunk_id"], 1.0 / (1.0 + row["distance"])) for row in rows]
+
+def _scoring_metric(conn: sqlite3.Connection, metric: str) -> str:
+    """metric, or the metric vec_chunks is actually declared with if they differ."""
+    declared = _vec_table_metric(conn)
+    if VEC_TABLE_METRICS[metric] == declared:
+        return metric
+    if declared not in VEC_TABLE_METRICS:
+        raise RuntimeError(
+            f"vec_chunks is declared with unsupported distance metric {declared!r}; "
+            "run 'atheria migrate-vec' to rebuild it"
+        )
+    _warn_metric_mismatch(metric, declared)
+    return declared
+
+
+@lru_cache(maxsize=None)
+def _warn_metric_mismatch(metric: str, declared: str) -> None:
+    # lru_cache: warn once per pair, not on every query
+    logger.warning(
+        "vec metric %r needs a %s vec_chunks but it is declared %s; scoring dense hits "
+        "as %s until 'atheria migrate-vec' rebuilds it.",
+        metric, VEC_TABLE_METRICS[metric], declared, declared,
+    )
 
 
 def count_embeddings(conn: sqlite3.Connection) -> int:
@@ -151,11 +386,26 @@ class SqliteVecAdapter:
     """Wraps sqlite-vec retrieve_dense() behind the DenseIndex-style interface
     expected by hybrid_retrieve() so that hybrid.py needs zero changes."""
 
-    def __init__(self, conn: sqlite3.Connection) -> None:
+    def __init__(self, conn: sqlite3.Connection, metric: str = VEC_METRIC) -> None:
         self._conn = conn
+        self.metric = metric
+
+    @property
+    def available(self) -> bool:
+        return _has_vec_table(self._conn)
 
-    def retrieve(self, query: str, k: int = 50, paper_id: str | None = None) -> list[tuple[str, float]]:
+    def retrieve(
+        self,
+        query: str,
+        k: int = 50,
+        paper_id: str | None = None,
+        query_embedding: list[float] | None = None,
+    ) -> list[tuple[str, float]]:
+        """KNN over vec_chunks; encodes `query` only when no embedding is given."""
         if not _has_vec_table(self._conn):
             return []
-        vec = encode_query(query)
-        return retrieve_dense(self._conn, vec, k, paper_id)
+        vec = query_embedding if query_embedding is not None else encode_query(query)
+        return retrieve_dense(self._conn, vec, k, paper_id, self.metric)
+
+    def get_embeddings(self, chunk_ids: list[str]) -> dict[str, np.ndarray]:
+        return get_embeddings(self._conn, chunk_ids)
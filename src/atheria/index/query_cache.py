@@ -0,0 +1,253 @@
+"""LRU cache of MedCPT query embeddings keyed on normalized query text.
+
+Popular queries are re-issued constantly by the frontend, so encode_query
+(and encode_queries, for batches) consults this cache before running the
+query encoder. Vectors are kept as
+768-d float32 arrays in an in-process LRU and, optionally, persisted to the
+query_embeddings side table so they survive restarts. Side-table lookups lease
+a pooled reader; new vectors are written by a background WriteBehind thread.
+
+Async callers use get() with a reader-pool connection and, on a miss, put()
+after encoding on the inference executor, so the lookup never waits on the
+encoder's thread and the encoder never waits on SQLite.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Any, Callable
+
+import numpy as np
+
+from atheria.config import (
+    CACHE_READ_TIMEOUT_SECONDS,
+    INFERENCE_BACKEND,
+    MEDCPT_QUERY_ENCODER,
+    QUERY_EMBEDDING_CACHE_PERSIST,
+    QUERY_EMBEDDING_CACHE_PERSIST_MAX,
+    QUERY_EMBEDDING_CACHE_SIZE,
+)
+from atheria.db.pool import ConnectionPool, PoolTimeout, get_connection_pool
+from atheria.db.write_behind import WriteBehind, is_schema_error
+from atheria.inference.backend import model_key
+
+logger = logging.getLogger(__name__)
+
+
+# Part of every persisted cache key; bump it whenever normalize_query changes
+# so side-table rows written under the old normalization are never read back.
+NORMALIZATION_VERSION = 2
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase and collapse whitespace.
+
+    Both are folds the uncased MedCPT tokenizers apply themselves, so two
+    queries share a key only if the models see the same text. No Unicode
+    compatibility folding: NFKC maps "Ca²⁺" to "ca2+" and "µM" to "μm",
+    which the tokenizer's normalizer keeps distinct.
+    """
+    return " ".join(query.lower().split())
+
+
+def cache_model_tag(model: str) -> str:
+    """Model column value for side-table rows: the model key plus the
+    normalization version."""
+    return f"{model}#n{NORMALIZATION_VERSION}"
+
+
+class QueryEmbeddingCache:
+    """Thread-safe LRU of query vectors with an optional SQLite side table."""
+
+    def __init__(
+        self,
+        max_entries: int = QUERY_EMBEDDING_CACHE_SIZE,
+        model_name: str = model_key(MEDCPT_QUERY_ENCODER, INFERENCE_BACKEND),
+        pool: ConnectionPool | None = None,
+        persist: bool = QUERY_EMBEDDING_CACHE_PERSIST,
+        persist_max: int = QUERY_EMBEDDING_CACHE_PERSIST_MAX,
+    ) -> None:
+        self.max_entries = max_entries
+        self.model_name = model_name
+        self._model_tag = cache_model_tag(model_name)
+        self.persist_max = persist_max
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = pool
+        self._persist = persist
+        self._writer = WriteBehind(
+            "query-embedding-cache", self._flush, self._disable_persistence, pool=pool
+        )
+        self._writes_since_prune = 0
+        self._skipped_loads = 0
+        self._hits = 0
+        self._persisted_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_or_encode(self, query: str, encode: Callable[[str], list[float]]) -> list[float]:
+        """Return the cached vector for query, calling encode(query) on a miss."""
+        vec = self.get(query)
+        if vec is None:
+            vec = encode(query)
+            self.put(query, vec)
+        return vec
+
+    def get(self, query: str, conn: sqlite3.Connection | None = None) -> list[float] | None:
+        """Cached vector for query, or None on a miss.
+
+        conn, if given, serves the side-table read instead of a leased
+        pooled reader.
+        """
+        key = normalize_query(query)
+        with self._lock:
+            vec = self._entries.get(key)
+            if vec is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return vec.tolist()
+
+        vec = self._load(key, conn)
+        if vec is None:
+            return None
+        with self._lock:
+            self._persisted_hits += 1
+        self._put(key, vec)
+        return vec.tolist()
+
+    def put(self, query: str, vec: list[float]) -> None:
+        """Cache a freshly encoded vector for query (counted as a miss)."""
+        key = normalize_query(query)
+        arr = np.asarray(vec, dtype=np.float32)
+        with self._lock:
+            self._misses += 1
+        self._store([(key, arr)])
+        self._put(key, arr)
+
+    def get_or_encode_many(
+        self,
+        queries: list[str],
+        encode_many: Callable[[list[str]], list[list[float]]],
+    ) -> list[list[float]]:
+        """Vectors for every query; all misses go to one encode_many call."""
+        keys = [normalize_query(q) for q in queries]
+        found: dict[str, np.ndarray] = {}
+        with self._lock:
+            for key in keys:
+                vec = self._entries.get(key)
+                if vec is not None:
+                    self._entries.move_to_end(key)
+                    found[key] = vec
+            self._hits += sum(key in found for key in keys)
+
+        text_for = {}
+        for key, query in zip(keys, queries):
+            if key not in found:
+                text_for.setdefault(key, query)
+        for key in text_for:
+            vec = self._load(key)
+            if vec is not None:
+                found[key] = vec
+        todo = [key for key in text_for if key not in found]
+        if todo:
+            fresh = encode_many([text_for[key] for key in todo])
+            new = [(key, np.asarray(v, dtype=np.float32)) for key, v in zip(todo, fresh)]
+            found.update(new)
+            self._store(new)
+        with self._lock:
+            self._persisted_hits += len(text_for) - len(todo)
+            self._misses += len(todo)
+        for key in text_for:
+            self._put(key, found[key])
+        return [found[key].tolist() for key in keys]
+
+    def _put(self, key: str, vec: np.ndarray) -> None:
+        with self._lock:
+            self._entries[key] = vec
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    # -- persistence -------------------------------------------------------
+
+    def _load(self, key: str, conn: sqlite3.Connection | None = None) -> np.ndarray | None:
+        """Vector from the side table; None when absent or the lookup is skipped."""
+        if not self._persist:
+            return None
+        lease = (
+            nullcontext(conn)
+            if conn is not None
+            else (self._pool or get_connection_pool()).reader(CACHE_READ_TIMEOUT_SECONDS)
+        )
+        try:
+            with lease as conn:
+                row = conn.execute(
+                    "SELECT embedding FROM query_embeddings WHERE query_norm = ? AND model = ?",
+                    [key, self._model_tag],
+                ).fetchone()
+        except (sqlite3.Error, PoolTimeout, RuntimeError) as exc:
+            if is_schema_error(exc):
+                self._disable_persistence()
+            else:
+                # Locked, busy or no reader free: skip the persisted lookup only
+                with self._lock:
+                    self._skipped_loads += 1
+            return None
+        return np.frombuffer(row[0], dtype=np.float32).copy() if row else None
+
+    def _store(self, items: list[tuple[str, np.ndarray]]) -> None:
+        if self._persist:
+            now = time.time()
+            self._writer.put([(key, self._model_tag, vec.tobytes(), now) for key, vec in items])
+
+    def _flush(self, conn: sqlite3.Connection, rows: list[tuple]) -> None:
+        """Write one batch on the pool writer (WriteBehind thread only)."""
+        conn.executemany(
+            """INSERT OR REPLACE INTO query_embeddings
+               (query_norm, model, embedding, created_at) VALUES (?, ?, ?, ?)""",
+            rows,
+        )
+        self._writes_since_prune += len(rows)
+        if self._writes_since_prune >= 1024:
+            self._writes_since_prune = 0
+            conn.execute(
+                """DELETE FROM query_embeddings WHERE rowid IN (
+                       SELECT rowid FROM query_embeddings ORDER BY created_at DESC
+                       LIMIT -1 OFFSET ?)""",
+                [self.persist_max],
+            )
+
+    def _disable_persistence(self) -> None:
+        logger.warning("Query embedding cache: SQLite side table unavailable; using memory only.")
+        self._persist = False
+
+    def close(self) -> None:
+        """Flush queued side-table writes."""
+        self._writer.close()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._persisted_hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "persisted": self._persist,
+                "skipped_loads": self._skipped_loads,
+                "writes": self._writer.stats(),
+                "hits": self._hits,
+                "persisted_hits": self._persisted_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": (self._hits + self._persisted_hits) / lookups if lookups else None,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_query_embedding_cache() -> QueryEmbeddingCache:
+    """Return the process-wide query embedding cache."""
+    return QueryEmbeddingCache()
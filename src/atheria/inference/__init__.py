@@ -0,0 +1,23 @@
+"""Inference backends for the MedCPT models (eager PyTorch or ONNX Runtime)."""
+
+from atheria.inference.backend import (
+    BACKENDS,
+    configure_threads,
+    load_model,
+    model_key,
+    onnx_model_path,
+)
+from atheria.inference.executor import InferenceExecutor, get_inference_executor
+from atheria.inference.export import export_all, export_model
+
+__all__ = [
+    "BACKENDS",
+    "configure_threads",
+    "load_model",
+    "model_key",
+    "onnx_model_path",
+    "InferenceExecutor",
+    "get_inference_executor",
+    "export_all",
+    "export_model",
+]
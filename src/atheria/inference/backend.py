@@ -0,0 +1,149 @@
+"""Pluggable CPU inference backends for the three MedCPT models.
+
+Every model is driven the same way: tokenize to numpy arrays, run one
+forward pass, keep one head output -- the [CLS] vector for the query and
+article encoders, the relevance logit for the cross-encoder. The backend is
+chosen by INFERENCE_BACKEND:
+
+- "torch": eager fp32 PyTorch, loaded from the HuggingFace model name.
+- "onnx": ONNX Runtime on the fp32 graph written by `atheria export-onnx`.
+- "onnx-int8": ONNX Runtime on the dynamically int8-quantized graph.
+
+ONNX Runtime is an optional dependency (pip install atheria[onnx]).
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Any, Mapping
+
+import numpy as np
+import torch
+from transformers import AutoModel, AutoModelForSequenceClassification
+
+from atheria.config import (
+    API_WORKERS,
+    INFERENCE_BACKEND,
+    INFERENCE_INTER_OP_THREADS,
+    INFERENCE_INTRA_OP_THREADS,
+    ONNX_DIR,
+)
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+HEADS = ("cls", "logit")
+
+# Set by configure_threads(); ONNX sessions created afterwards use the same sizes
+_intra_op_threads = 0
+_inter_op_threads = 0
+
+
+def configure_threads(
+    api_workers: int = API_WORKERS,
+    intra_op: int = INFERENCE_INTRA_OP_THREADS,
+    inter_op: int = INFERENCE_INTER_OP_THREADS,
+) -> dict[str, int]:
+    """Size torch (and ONNX Runtime) thread pools for this process.
+
+    By default each of the api_workers processes on the host gets
+    cpu_count // api_workers intra-op threads, so worker processes do not
+    oversubscribe the cores. Call before the first forward pass: torch only
+    accepts an inter-op size before inter-op work has started.
+    """
+    global _intra_op_threads, _inter_op_threads
+    cpus = os.cpu_count() or 1
+    _intra_op_threads = intra_op or max(1, cpus // max(1, api_workers))
+    _inter_op_threads = inter_op or 1
+    torch.set_num_threads(_intra_op_threads)
+    try:
+        torch.set_num_interop_threads(_inter_op_threads)
+    except RuntimeError:
+        logger.warning("torch inter-op threads already fixed at %d", torch.get_num_interop_threads())
+    return {
+        "cpus": cpus,
+        "api_workers": api_workers,
+        "intra_op_threads": torch.get_num_threads(),
+        "inter_op_threads": torch.get_num_interop_threads(),
+    }
+
+
+def onnx_model_path(model_name: str, quantized: bool, onnx_dir: str | Path = ONNX_DIR) -> Path:
+    """Where export_model writes (and OnnxModel reads) the graph for model_name."""
+    filename = "model.int8.onnx" if quantized else "model.onnx"
+    return Path(onnx_dir) / model_name.replace("/", "__") / filename
+
+
+def model_key(model_name: str, backend: str = INFERENCE_BACKEND) -> str:
+    """Cache key for outputs of model_name under backend.
+
+    Quantized outputs differ slightly from eager ones, so cached embeddings
+    and scores are keyed per backend; torch keeps the bare model name.
+    """
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
+
+
+class TorchModel:
+    """Eager PyTorch model returning the head output as a numpy array."""
+
+    def __init__(self, model_name: str, head: str) -> None:
+        auto = AutoModel if head == "cls" else AutoModelForSequenceClassification
+        self.model_name = model_name
+        self.head = head
+        self._model = auto.from_pretrained(model_name)
+        self._model.eval()
+
+    def __call__(self, features: Mapping[str, Any]) -> np.ndarray:
+        inputs = {k: torch.as_tensor(np.asarray(v)) for k, v in features.items()}
+        with torch.no_grad():
+            out = self._model(**inputs)
+        if self.head == "cls":
+            return out.last_hidden_state[:, 0, :].numpy()
+        return out.logits[:, 0].numpy()
+
+
+class OnnxModel:
+    """ONNX Runtime session over an exported graph whose single output is the head."""
+
+    def __init__(self, path: str | Path, head: str) -> None:
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError(
+                "ONNX inference backend requires onnxruntime: pip install atheria[onnx]"
+            ) from None
+        self.path = Path(path)
+        self.head = head
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = _intra_op_threads  # 0 lets ONNX Runtime decide
+        options.inter_op_num_threads = _inter_op_threads
+        self._session = ort.InferenceSession(
+            str(path), options, providers=["CPUExecutionProvider"]
+        )
+        self._inputs = [i.name for i in self._session.get_inputs()]
+
+    def __call__(self, features: Mapping[str, Any]) -> np.ndarray:
+        feeds = {name: np.asarray(features[name], dtype=np.int64) for name in self._inputs}
+        return self._session.run(None, feeds)[0]
+
+
+InferenceModel = TorchModel | OnnxModel
+
+
+def load_model(
+    model_name: str,
+    head: str,
+    backend: str = INFERENCE_BACKEND,
+    onnx_dir: str | Path = ONNX_DIR,
+) -> InferenceModel:
+    """Load model_name for the given backend; head is "cls" or "logit"."""
+    if head not in HEADS:
+        raise ValueError(f"Unknown model head {head!r}; expected one of {HEADS}")
+    if backend == "torch":
+        return TorchModel(model_name, head)
+    if backend in ("onnx", "onnx-int8"):
+        path = onnx_model_path(model_name, quantized=backend == "onnx-int8", onnx_dir=onnx_dir)
+        if not path.exists():
+            raise FileNotFoundError(f"{path} not found; run 'atheria export-onnx' first")
+        return OnnxModel(path, head)
+    raise ValueError(f"Unknown inference backend {backend!r}; expected one of {BACKENDS}")
@@ -0,0 +1,72 @@
+"""Inference executor: model work for the async API on a dedicated, sized pool.
+
+Query encoding and reranking are CPU-bound torch / ONNX Runtime calls. Async
+handlers submit them here instead of Starlette's shared 40-thread pool, so
+at most INFERENCE_WORKERS model calls are in flight per process (each using
+the intra-op threads sized by configure_threads) and the rest queue.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, TypeVar
+
+from atheria.config import INFERENCE_WORKERS
+
+T = TypeVar("T")
+
+
+class InferenceExecutor:
+    """Bounded thread pool for model calls, with queue-wait metrics."""
+
+    def __init__(self, workers: int = INFERENCE_WORKERS) -> None:
+        self.workers = workers
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._calls = 0
+        self._queue_seconds = 0.0
+        self._busy_seconds = 0.0
+
+    def _call(self, submitted: float, fn: Callable[..., T], args: tuple) -> T:
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self._pending -= 1
+                self._calls += 1
+                self._queue_seconds += start - submitted
+                self._busy_seconds += end - start
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Await fn(*args) on an inference thread."""
+        with self._lock:
+            self._pending += 1
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self._call, time.perf_counter(), fn, args
+        )
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            calls = self._calls
+            return {
+                "workers": self.workers,
+                "pending": self._pending,
+                "calls": calls,
+                "mean_queue_ms": self._queue_seconds / calls * 1000.0 if calls else None,
+                "mean_busy_ms": self._busy_seconds / calls * 1000.0 if calls else None,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_inference_executor() -> InferenceExecutor:
+    """Return the process-wide inference executor."""
+    return InferenceExecutor()
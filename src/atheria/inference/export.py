@@ -0,0 +1,106 @@
+"""Export the MedCPT models to ONNX, optionally with dynamic int8 quantization.
+
+Each graph takes input_ids / attention_mask / token_type_ids with dynamic
+batch and sequence axes and has a single output: the head the pipeline
+uses, so ONNX Runtime never materializes unused hidden states at the
+boundary. Quantization is dynamic (int8 weights, activations quantized at
+run time), which needs no calibration data and suits CPU serving.
+"""
+
+from pathlib import Path
+
+import torch
+from transformers import AutoModel, AutoModelForSequenceClassification, AutoTokenizer
+
+from atheria.config import (
+    MEDCPT_ARTICLE_ENCODER,
+    MEDCPT_CROSS_ENCODER,
+    MEDCPT_QUERY_ENCODER,
+    ONNX_DIR,
+    ONNX_OPSET,
+)
+from atheria.inference.backend import onnx_model_path
+
+# (model name, head) for every model the pipeline runs
+MEDCPT_MODELS = (
+    (MEDCPT_QUERY_ENCODER, "cls"),
+    (MEDCPT_ARTICLE_ENCODER, "cls"),
+    (MEDCPT_CROSS_ENCODER, "logit"),
+)
+
+_INPUT_NAMES = ["input_ids", "attention_mask", "token_type_ids"]
+
+
+class _HeadOnly(torch.nn.Module):
+    def __init__(self, model: torch.nn.Module, head: str) -> None:
+        super().__init__()
+        self.model = model
+        self.head = head
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        out = self.model(
+            input_ids=input_ids, attention_mask=attention_mask, token_type_ids=token_type_ids
+        )
+        if self.head == "cls":
+            return out.last_hidden_state[:, 0, :]
+        return out.logits[:, 0]
+
+
+def export_model(
+    model_name: str,
+    head: str,
+    onnx_dir: str | Path = ONNX_DIR,
+    quantize: bool = True,
+    opset: int = ONNX_OPSET,
+) -> list[Path]:
+    """Write the fp32 graph (and its int8 twin if quantize) for one model."""
+    auto = AutoModel if head == "cls" else AutoModelForSequenceClassification
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = auto.from_pretrained(model_name)
+    model.eval()
+
+    path = onnx_model_path(model_name, quantized=False, onnx_dir=onnx_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    sample = tokenizer(
+        [["atheria export", "sample passage"]] * 2, return_tensors="pt", padding=True
+    )
+    with torch.no_grad():
+        torch.onnx.export(
+            _HeadOnly(model, head),
+            tuple(sample[name] for name in _INPUT_NAMES),
+            str(path),
+            input_names=_INPUT_NAMES,
+            output_names=["output"],
+            dynamic_axes={
+                **{name: {0: "batch", 1: "sequence"} for name in _INPUT_NAMES},
+                "output": {0: "batch"},
+            },
+            opset_version=opset,
+            dynamo=False,
+        )
+    written = [path]
+
+    if quantize:
+        try:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+        except ImportError:
+            raise ImportError(
+                "int8 quantization requires onnxruntime: pip install atheria[onnx]"
+            ) from None
+        qpath = onnx_model_path(model_name, quantized=True, onnx_dir=onnx_dir)
+        quantize_dynamic(path, qpath, weight_type=QuantType.QInt8)
+        written.append(qpath)
+    return written
+
+
+def export_all(
+    onnx_dir: str | Path = ONNX_DIR,
+    quantize: bool = True,
+    opset: int = ONNX_OPSET,
+) -> list[Path]:
+    """Export the query encoder, article encoder and cross-encoder."""
+    written: list[Path] = []
+    for model_name, head in MEDCPT_MODELS:
+        print(f"Exporting {model_name} ...")
+        written.extend(export_model(model_name, head, onnx_dir, quantize, opset))
+    return written
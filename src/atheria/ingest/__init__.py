@@ -2,5 +2,6 @@
 
 from atheria.ingest.pmc_parser import parse_pmc, ParsedDocument
 from atheria.ingest.chunker import chunk_document
+from atheria.ingest.pipeline import ParsedFile, iter_parsed_files
 
-__all__ = ["parse_pmc", "ParsedDocument", "chunk_document"]
+__all__ = ["parse_pmc", "ParsedDocument", "chunk_document", "ParsedFile", "iter_parsed_files"]
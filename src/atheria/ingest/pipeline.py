@@ -0,0 +1,96 @@
+"""Parse + chunk stage of the ingest pipeline, optionally across processes.
+
+Parsing (PyMuPDF, lxml) and chunking are CPU-bound and independent per file,
+so they run in a process pool; results stream back in input order to a single
+writer that owns the SQLite connection. At most a few tasks per worker are in
+flight, so a slow writer never lets parsed results pile up in memory. This
+module deliberately avoids
+importing torch so spawned workers start quickly.
+"""
+
+import hashlib
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from atheria.ingest.chunker import chunk_document
+from atheria.ingest.pmc_parser import parse_pdf, parse_pmc, parse_raw_text
+from atheria.models.chunk import Chunk
+from atheria.models.paper import Paper
+
+
+@dataclass
+class ParsedFile:
+    """Outcome of parsing and chunking one input file."""
+
+    path: Path
+    paper: Paper | None = None
+    chunks: list[Chunk] = field(default_factory=list)
+    seconds: float = 0.0
+    status: str = "parsed"  # parsed, unparseable, failed; writer sets indexed/duplicate
+    error: str | None = None
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    """Hex SHA-256 of a file's bytes, read in 1 MiB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while block := fh.read(block_size):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_file(path: Path) -> ParsedFile:
+    """Parse one PMC XML/HTML, PDF or raw text file into a Paper and its chunks."""
+    start = time.perf_counter()
+    try:
+        if path.suffix.lower() == ".pdf":
+            doc = parse_pdf(path)
+        else:
+            doc = parse_pmc(path)
+        if doc is None:
+            doc = parse_raw_text(path)
+        if doc is None:
+            return ParsedFile(path, seconds=time.perf_counter() - start, status="unparseable")
+
+        metadata = doc.metadata or {}
+        paper = Paper.create(
+            title=doc.title,
+            pmid=metadata.get("pmid"),
+            source_url=metadata.get("source_url") or str(path.resolve()),
+            metadata=metadata,
+        )
+        chunks = chunk_document(doc, paper)
+    except Exception as exc:
+        return ParsedFile(
+            path,
+            seconds=time.perf_counter() - start,
+            status="failed",
+            error=f"{type(exc).__name__}: {exc}",
+        )
+    return ParsedFile(path, paper=paper, chunks=chunks, seconds=time.perf_counter() - start)
+
+
+def iter_parsed_files(files: list[Path], workers: int = 1) -> Iterator[ParsedFile]:
+    """Yield ParsedFile results in input order, parsing with `workers` processes."""
+    if workers <= 1 or len(files) <= 1:
+        for f in files:
+            yield parse_file(f)
+        return
+
+    # spawn, not fork: the API process is multi-threaded and holds torch state
+    ctx = multiprocessing.get_context("spawn")
+    n_workers = min(workers, len(files))
+    max_in_flight = n_workers * 4
+    pending: deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as pool:
+        for f in files:
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+            pending.append(pool.submit(parse_file, f))
+        while pending:
+            yield pending.popleft().result()
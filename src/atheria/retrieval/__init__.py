@@ -1,6 +1,24 @@
 """Retrieval pipeline."""
 
-from atheria.retrieval.hybrid import hybrid_retrieve
+from atheria.retrieval.hybrid import (
+    cascade_prune,
+    generate_candidates,
+    hybrid_retrieve,
+    rerank_adaptive,
+    rerank_candidates,
+    rerank_pooled,
+)
 from atheria.retrieval.formatter import format_results
+from atheria.retrieval.fusion import FUSION_METHODS, fuse
 
-__all__ = ["hybrid_retrieve", "format_results"]
+__all__ = [
+    "generate_candidates",
+    "hybrid_retrieve",
+    "rerank_candidates",
+    "rerank_adaptive",
+    "cascade_prune",
+    "rerank_pooled",
+    "format_results",
+    "FUSION_METHODS",
+    "fuse",
+]
@@ -0,0 +1,269 @@
+"""Dynamic micro-batching for concurrent cross-encoder reranking.
+
+Requests served on different threadpool workers submit their (query, text)
+pairs to a shared queue. A single scheduler thread waits up to
+RERANK_MAX_WAIT_MS after the first arrival, packs queued requests into one
+batch of at most RERANK_MAX_BATCH pairs, scores it with one padded forward
+pass, and fans the scores back to each waiting request.
+
+Threaded callers block in score_pairs; async callers await score_pairs_async,
+so no thread is parked while their request waits for a batch. Callers wait at
+most RERANK_RESULT_TIMEOUT_SECONDS for their scores. Once
+stopped, the batcher fails every request still queued with RerankBatcherStopped
+and rejects new ones; it is not restarted.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from functools import lru_cache
+from typing import Any
+
+from atheria.config import RERANK_MAX_BATCH, RERANK_MAX_WAIT_MS, RERANK_RESULT_TIMEOUT_SECONDS
+from atheria.retrieval.reranker import CrossEncoderReranker, get_reranker
+
+logger = logging.getLogger(__name__)
+
+
+class RerankBatcherStopped(RuntimeError):
+    """Raised for rerank requests submitted to, or still queued in, a stopped batcher."""
+
+
+class _Pending:
+    __slots__ = ("pairs", "future", "enqueued_at")
+
+    def __init__(self, pairs: list[list[str]]) -> None:
+        self.pairs = pairs
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class RerankBatcher:
+    """Coalesces rerank calls from concurrent requests into shared batches.
+
+    Exposes the same .score(query, texts) interface as CrossEncoderReranker,
+    so it can be passed wherever a reranker is expected.
+    """
+
+    def __init__(
+        self,
+        reranker: CrossEncoderReranker,
+        max_wait_ms: float = RERANK_MAX_WAIT_MS,
+        max_batch: int = RERANK_MAX_BATCH,
+        result_timeout: float = RERANK_RESULT_TIMEOUT_SECONDS,
+    ) -> None:
+        self._reranker = reranker
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch = max_batch
+        self.result_timeout = result_timeout
+        self._queue: queue.Queue[_Pending | None] = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._stopped = False
+        self._stats_lock = threading.Lock()
+        self._queued_pairs = 0
+        self._max_queue_depth = 0
+        self._batches = 0
+        self._batched_requests = 0
+        self._batched_pairs = 0
+        self._wait_seconds = 0.0
+        self._timeouts = 0
+
+    @property
+    def model_name(self) -> str:
+        return self._reranker.model_name
+
+    @property
+    def model_key(self) -> str:
+        return self._reranker.model_key
+
+    def start(self) -> None:
+        with self._start_lock:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        if self._stopped:
+            raise RerankBatcherStopped("Rerank batcher is stopped")
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="rerank-batcher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        """Stop the scheduler and fail every request it has not started scoring.
+
+        The batch in flight finishes; anything still queued (including requests
+        left behind if the scheduler does not exit within timeout) gets
+        RerankBatcherStopped. Later score calls raise it immediately.
+        """
+        with self._start_lock:
+            if self._stopped:
+                return
+            self._stopped = True
+            thread = self._thread
+            self._thread = None
+            # Under the lock, so no request can be queued behind the sentinel
+            self._queue.put(None)
+        if thread is not None:
+            thread.join(timeout)
+        self._fail_queued()
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        """Queue the pairs and block until the scheduler returns their scores."""
+        return self.score_pairs([[query, t] for t in texts])
+
+    def score_pairs(self, pairs: list[list[str]]) -> list[float]:
+        """Score [[query, text], ...] pairs as one queued request.
+
+        A request larger than max_batch gets a batch of its own, split into
+        max_batch-sized forward passes.
+        """
+        if not pairs:
+            return []
+        item = self._submit(pairs)
+        try:
+            return item.future.result(self.result_timeout)
+        except FutureTimeout:
+            self._timed_out(item)
+            raise TimeoutError(
+                f"Rerank scores not ready after {self.result_timeout:.1f}s "
+                f"({self._queue.qsize()} request(s) queued)"
+            ) from None
+
+    async def score_pairs_async(self, pairs: list[list[str]]) -> list[float]:
+        """Async score_pairs: awaits the request's future on the event loop.
+
+        If the wait is cancelled or times out before the scheduler picks the
+        request up, it is dropped from its batch.
+        """
+        if not pairs:
+            return []
+        item = self._submit(pairs)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(item.future), self.result_timeout)
+        except asyncio.TimeoutError:
+            self._timed_out(item)
+            raise TimeoutError(
+                f"Rerank scores not ready after {self.result_timeout:.1f}s "
+                f"({self._queue.qsize()} request(s) queued)"
+            ) from None
+
+    def _submit(self, pairs: list[list[str]]) -> _Pending:
+        item = _Pending(pairs)
+        with self._start_lock:
+            self._start_locked()
+            with self._stats_lock:
+                self._queued_pairs += len(item.pairs)
+                self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize() + 1)
+            self._queue.put(item)
+        return item
+
+    def _timed_out(self, item: _Pending) -> None:
+        # A request the scheduler has not picked up yet is dropped from its batch
+        item.future.cancel()
+        with self._stats_lock:
+            self._timeouts += 1
+
+    def _fail_queued(self, carry: _Pending | None = None) -> None:
+        """Fail the carried-over request and everything left in the queue."""
+        items = [carry] if carry is not None else []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                items.append(item)
+        for item in items:
+            with self._stats_lock:
+                self._queued_pairs -= len(item.pairs)
+            if item.future.set_running_or_notify_cancel():
+                item.future.set_exception(RerankBatcherStopped("Rerank batcher stopped"))
+
+    def _collect(self, first: _Pending) -> tuple[list[_Pending], _Pending | None, bool]:
+        """Gather requests until the wait window closes or the batch is full.
+
+        Returns (batch, carry_over, stop_requested). A request never straddles
+        two batches; one that would overflow the batch is carried to the next.
+        """
+        batch = [first]
+        n_pairs = len(first.pairs)
+        deadline = first.enqueued_at + self.max_wait
+        while n_pairs < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, None, True
+            if n_pairs + len(item.pairs) > self.max_batch:
+                return batch, item, False
+            batch.append(item)
+            n_pairs += len(item.pairs)
+        return batch, None, False
+
+    def _run(self) -> None:
+        carry: _Pending | None = None
+        stop = False
+        while not stop:
+            first = carry if carry is not None else self._queue.get()
+            if first is None:
+                break
+            batch, carry, stop = self._collect(first)
+            self._score_batch(batch)
+        self._fail_queued(carry)
+
+    def _score_batch(self, batch: list[_Pending]) -> None:
+        now = time.perf_counter()
+        with self._stats_lock:
+            self._queued_pairs -= sum(len(item.pairs) for item in batch)
+        # Requests whose caller timed out (and cancelled) are not scored
+        batch = [item for item in batch if item.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        pairs = [p for item in batch for p in item.pairs]
+        with self._stats_lock:
+            self._batches += 1
+            self._batched_requests += len(batch)
+            self._batched_pairs += len(pairs)
+            self._wait_seconds += sum(now - item.enqueued_at for item in batch)
+        try:
+            scores = self._reranker.score_pairs(pairs, batch_size=self.max_batch)
+        except Exception as exc:
+            logger.exception("Rerank batch of %d pair(s) failed", len(pairs))
+            for item in batch:
+                item.future.set_exception(exc)
+            return
+        offset = 0
+        for item in batch:
+            n = len(item.pairs)
+            item.future.set_result(scores[offset : offset + n])
+            offset += n
+
+    def stats(self) -> dict[str, Any]:
+        with self._stats_lock:
+            batches = self._batches
+            requests = self._batched_requests
+            return {
+                "max_wait_ms": self.max_wait * 1000.0,
+                "max_batch": self.max_batch,
+                "queue_depth": self._queue.qsize(),
+                "queued_pairs": self._queued_pairs,
+                "max_queue_depth": self._max_queue_depth,
+                "batches": batches,
+                "requests_per_batch": requests / batches if batches else None,
+                "pairs_per_batch": self._batched_pairs / batches if batches else None,
+                "mean_wait_ms": self._wait_seconds / requests * 1000.0 if requests else None,
+                "timeouts": self._timeouts,
+                "stopped": self._stopped,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_rerank_batcher() -> RerankBatcher:
+    """Return the process-wide batcher around the shared reranker."""
+    return RerankBatcher(get_reranker())
@@ -0,0 +1,79 @@
+"""Rank fusion for hybrid (BM25 + dense) candidate generation.
+
+BM25 scores and dense similarities live on incompatible scales, so the
+retrievers' ranked lists are fused into one ranking before the cross-encoder
+sees them. Each method takes a list of ranked [(chunk_id, score), ...] lists
+(best first) plus per-list weights, and returns [(chunk_id, fused_score)]
+sorted best first. Ties keep first-seen order, so earlier lists win.
+"""
+
+from typing import Callable
+
+from atheria.config import RRF_K
+
+RankedList = list[tuple[str, float]]
+
+
+def _sorted_by_score(scores: dict[str, float]) -> RankedList:
+    # dicts keep insertion order and sorted() is stable, so ties keep first-seen order
+    return sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+
+
+def rrf_fusion(
+    ranked_lists: list[RankedList],
+    weights: list[float],
+    k: int = RRF_K,
+) -> RankedList:
+    """Reciprocal rank fusion: sum of weight / (k + rank) over the lists."""
+    scores: dict[str, float] = {}
+    for hits, weight in zip(ranked_lists, weights):
+        for rank, (cid, _) in enumerate(hits, 1):
+            scores[cid] = scores.get(cid, 0.0) + weight / (k + rank)
+    return _sorted_by_score(scores)
+
+
+def weighted_score_fusion(
+    ranked_lists: list[RankedList],
+    weights: list[float],
+) -> RankedList:
+    """Weighted sum of min-max normalized scores (a missing hit contributes 0)."""
+    scores: dict[str, float] = {}
+    for hits, weight in zip(ranked_lists, weights):
+        if not hits:
+            continue
+        values = [s for _, s in hits]
+        lo, hi = min(values), max(values)
+        span = hi - lo
+        for cid, s in hits:
+            norm = (s - lo) / span if span > 0 else 1.0
+            scores[cid] = scores.get(cid, 0.0) + weight * norm
+    return _sorted_by_score(scores)
+
+
+def concat_fusion(
+    ranked_lists: list[RankedList],
+    weights: list[float],
+) -> RankedList:
+    """Legacy merge: lists concatenated in order, first occurrence kept."""
+    merged: dict[str, float] = {}
+    for hits in ranked_lists:
+        for cid, s in hits:
+            merged.setdefault(cid, s)
+    return list(merged.items())
+
+
+FUSION_METHODS: dict[str, Callable[[list[RankedList], list[float]], RankedList]] = {
+    "rrf": rrf_fusion,
+    "weighted": weighted_score_fusion,
+    "concat": concat_fusion,
+}
+
+
+def fuse(method: str, ranked_lists: list[RankedList], weights: list[float]) -> RankedList:
+    try:
+        fn = FUSION_METHODS[method]
+    except KeyError:
+        raise ValueError(
+            f"Unknown fusion method {method!r}; expected one of {sorted(FUSION_METHODS)}"
+        ) from None
+    return fn(ranked_lists, weights)
@@ -1,11 +1,29 @@
 """Hybrid retrieval: BM25 + Dense + MedCPT reranker."""
 
-from typing import Any
+from typing import Any, Awaitable, Callable, Generator
 
-from transformers import AutoModelForSequenceClassification, AutoTokenizer
-import torch
+import numpy as np
 
-from atheria.config import K_SPARSE, K_DENSE, K_MERGE, TOP_N, MEDCPT_CROSS_ENCODER
+from atheria.config import (
+    CASCADE,
+    CASCADE_KEEP_FUSED,
+    CASCADE_POOL,
+    CASCADE_WIDTH,
+    FUSION_METHOD,
+    FUSION_WEIGHTS,
+    K_DENSE,
+    K_MERGE,
+    K_SPARSE,
+    RERANK_ADAPTIVE,
+    RERANK_ADAPTIVE_MARGIN,
+    RERANK_ADAPTIVE_PATIENCE,
+    RERANK_ADAPTIVE_STEP,
+    RERANK_DEPTH,
+    TOP_N,
+)
+from atheria.index.dense_index import encode_query
+from atheria.retrieval.fusion import fuse
+from atheria.retrieval.reranker import get_reranker
 
 
 # Synonym dict for query expansion (biochem metrics)
@@ -34,71 +52,226 @@ def expand_query(query: str) -> str:
     return query
 
 
-def hybrid_retrieve(
+def generate_candidates(
     query: str,
     bm25_index: Any,
     dense_index: Any,
-    chunk_by_id: dict[str, Any],
-    paper_by_id: dict[str, Any],
     k_sparse: int = K_SPARSE,
     k_dense: int = K_DENSE,
-    top_n: int = TOP_N,
     paper_id: str | None = None,
     use_query_expansion: bool = True,
-) -> list[tuple[Any, float]]:
+    query_embedding: list[float] | None = None,
+    is_known: Callable[[str], bool] | None = None,
+    fusion: str = FUSION_METHOD,
+    k_merge: int = K_MERGE,
+) -> list[tuple[str, float]]:
     """
-    Run hybrid retrieval: BM25 + Dense merge, then MedCPT rerank.
+    Run BM25 + dense candidate generation once and fuse the two rankings.
 
-    Returns list of (chunk, reranker_score) for top_n chunks.
+    query_embedding: precomputed MedCPT query vector; passed to the dense
+    index so the query encoder runs at most once per request.
+    is_known: optional filter applied before the k_merge cap (e.g. membership
+    in an in-memory chunk table).
+    fusion: "rrf", "weighted" (normalized scores) or "concat" (legacy
+    BM25-then-dense order); see atheria.retrieval.fusion.
+
+    Returns up to k_merge unique (chunk_id, fused_score) pairs, best first.
     """
     q = expand_query(query) if use_query_expansion else query
 
-    # Candidate generation
+    # Up to k_sparse hits: BM25Index returns only chunks sharing a query term
+    # (rank_bm25 used to pad with zero-score chunks), so a rare-term query
+    # can contribute fewer than k_sparse BM25 candidates to the fusion.
     bm25_hits = bm25_index.retrieve(q, k=k_sparse)
-    dense_hits = dense_index.retrieve(query, k=k_dense, paper_id=paper_id)
-
-    # Merge and dedupe by chunk_id
-    seen: set[str] = set()
-    merged: list[tuple[str, float]] = []
-    for cid, score in bm25_hits + dense_hits:
-        if cid not in seen and cid in chunk_by_id:
-            seen.add(cid)
-            merged.append((cid, score))
-        if len(merged) >= K_MERGE:
-            break
-
-    if not merged:
+    dense_hits = dense_index.retrieve(
+        query, k=k_dense, paper_id=paper_id, query_embedding=query_embedding
+    )
+
+    fused = fuse(fusion, [bm25_hits, dense_hits], list(FUSION_WEIGHTS))
+    if is_known is not None:
+        fused = [(cid, s) for cid, s in fused if is_known(cid)]
+    return fused[:k_merge]
+
+
+def cascade_prune(
+    candidates: list[tuple[str, float]],
+    query_embedding: list[float],
+    embeddings: dict[str, Any],
+    width: int = CASCADE_WIDTH,
+    keep_fused: int = CASCADE_KEEP_FUSED,
+) -> list[tuple[str, float]]:
+    """
+    First cascade stage: score fused candidates by the dot product of the
+    query vector with their stored MedCPT article vectors (the similarity
+    MedCPT is trained for) and keep the best `width`, plus the top
+    `keep_fused` fused candidates so strong lexical matches always survive.
+
+    Returns survivors as (chunk_id, dot_product), best first; candidates
+    without a stored vector score -inf.
+    """
+    q = np.asarray(query_embedding, dtype=np.float32)
+    scored = [
+        (cid, float(embeddings[cid] @ q) if cid in embeddings else float("-inf"))
+        for cid, _ in candidates
+    ]
+    by_score = sorted(scored, key=lambda x: x[1], reverse=True)
+    keep = {cid for cid, _ in by_score[:width]} | {cid for cid, _ in candidates[:keep_fused]}
+    return [(cid, s) for cid, s in by_score if cid in keep]
+
+
+def rerank_candidates(
+    query: str,
+    chunks: list[Any],
+    top_n: int = TOP_N,
+    reranker: Any = None,
+    score_cache: Any = None,
+) -> list[tuple[Any, float]]:
+    """
+    Score hydrated candidate chunks with the cross-encoder and keep the top_n.
+
+    reranker: object with .score(query, texts); defaults to the process-wide
+    cross-encoder from get_reranker().
+    score_cache: optional PairScoreCache; only pairs it has not seen are
+    sent to the reranker.
+    """
+    if not chunks:
         return []
 
-    # Get chunk texts for reranker
-    chunk_ids = [cid for cid, _ in merged]
-    chunks = [chunk_by_id[cid] for cid in chunk_ids if cid in chunk_by_id]
+    reranker = reranker or get_reranker()
+    all_scores = _score(query, chunks, reranker, score_cache)
+    return _top_unique(list(zip(chunks, all_scores)), top_n)
+
+
+def rerank_adaptive(
+    query: str,
+    chunks: list[Any],
+    top_n: int = TOP_N,
+    reranker: Any = None,
+    score_cache: Any = None,
+    step: int = RERANK_ADAPTIVE_STEP,
+    patience: int = RERANK_ADAPTIVE_PATIENCE,
+    margin: float = RERANK_ADAPTIVE_MARGIN,
+) -> tuple[list[tuple[Any, float]], int]:
+    """
+    Rerank candidates in the order given and stop early.
+
+    Candidates arrive in first-stage order: cascade dot product when the
+    cascade is on, fused rank otherwise. The first top_n + step candidates
+    are scored together; after that, step candidates at a time. A step is
+    stale when its best score falls more than margin below the current top_n
+    cutoff, i.e. it neither entered the top_n nor came close; scoring stops
+    after patience consecutive stale steps. The caller bounds the depth by
+    how many chunks it passes (the request's rerank budget).
+
+    Returns (top_n (chunk, score) pairs, number of pairs scored).
+    """
+    if not chunks:
+        return [], 0
+
+    reranker = reranker or get_reranker()
+    steps = _adaptive_steps(chunks, top_n, step, patience, margin)
+    try:
+        batch = next(steps)
+        while True:
+            batch = steps.send(_score(query, batch, reranker, score_cache))
+    except StopIteration as done:
+        scored = done.value
+    return _top_unique(scored, top_n), len(scored)
+
+
+async def rerank_candidates_async(
+    query: str,
+    chunks: list[Any],
+    score: Callable[[str, list[Any]], Awaitable[list[float]]],
+    top_n: int = TOP_N,
+) -> list[tuple[Any, float]]:
+    """rerank_candidates for async callers; score(query, chunks) is awaited."""
     if not chunks:
         return []
+    return _top_unique(list(zip(chunks, await score(query, chunks))), top_n)
+
+
+async def rerank_adaptive_async(
+    query: str,
+    chunks: list[Any],
+    score: Callable[[str, list[Any]], Awaitable[list[float]]],
+    top_n: int = TOP_N,
+    step: int = RERANK_ADAPTIVE_STEP,
+    patience: int = RERANK_ADAPTIVE_PATIENCE,
+    margin: float = RERANK_ADAPTIVE_MARGIN,
+) -> tuple[list[tuple[Any, float]], int]:
+    """rerank_adaptive for async callers; score(query, chunks) is awaited."""
+    if not chunks:
+        return [], 0
+
+    steps = _adaptive_steps(chunks, top_n, step, patience, margin)
+    try:
+        batch = next(steps)
+        while True:
+            batch = steps.send(await score(query, batch))
+    except StopIteration as done:
+        scored = done.value
+    return _top_unique(scored, top_n), len(scored)
+
+
+def _adaptive_steps(
+    chunks: list[Any], top_n: int, step: int, patience: int, margin: float
+) -> Generator[list[Any], list[float], list[tuple[Any, float]]]:
+    """The adaptive cutoff: yields each batch to score, is sent its scores,
+    and returns every (chunk, score) pair scored."""
+    scored: list[tuple[Any, float]] = []
+    stale = 0
+    end = min(len(chunks), top_n + step)
+    while True:
+        batch = chunks[len(scored) : end]
+        scores = yield batch
+        if len(scored) >= top_n and scores:
+            kth = sorted((s for _, s in scored), reverse=True)[top_n - 1]
+            stale = stale + 1 if max(scores) < kth - margin else 0
+        scored.extend(zip(batch, scores))
+        if stale >= patience or end >= len(chunks):
+            return scored
+        end = min(len(chunks), end + step)
 
-    # Rerank with MedCPT Cross-Encoder
-    pairs = [[query, c.text] for c in chunks]
-    tokenizer = AutoTokenizer.from_pretrained(MEDCPT_CROSS_ENCODER)
-    model = AutoModelForSequenceClassification.from_pretrained(MEDCPT_CROSS_ENCODER)
-    model.eval()
-
-    all_scores: list[float] = []
-    batch_size = 32
-    for i in range(0, len(pairs), batch_size):
-        batch = pairs[i : i + batch_size]
-        with torch.no_grad():
-            encoded = tokenizer(
-                batch,
-                truncation=True,
-                padding=True,
-                return_tensors="pt",
-                max_length=512,
-            )
-            logits = model(**encoded).logits.squeeze(dim=1)
-            all_scores.extend(logits.cpu().tolist())
-
-    scored = list(zip(chunks, all_scores))
-    scored.sort(key=lambda x: x[1], reverse=True)
+
+def rerank_pooled(
+    queries: list[str],
+    chunk_lists: list[list[Any]],
+    top_ns: list[int],
+    reranker: Any = None,
+    score_cache: Any = None,
+) -> list[list[tuple[Any, float]]]:
+    """
+    Rerank several queries' candidates at once, keeping each query's top_n.
+
+    Every (query, chunk) pair is pooled into one reranker.score_pairs call,
+    so the cross-encoder runs large batches instead of one per query.
+    """
+    reranker = reranker or get_reranker()
+    if score_cache is not None:
+        score_lists = score_cache.score_many(reranker, list(zip(queries, chunk_lists)))
+    else:
+        flat = reranker.score_pairs(
+            [[q, c.text] for q, chunks in zip(queries, chunk_lists) for c in chunks]
+        )
+        score_lists, offset = [], 0
+        for chunks in chunk_lists:
+            score_lists.append(flat[offset : offset + len(chunks)])
+            offset += len(chunks)
+    return [
+        _top_unique(list(zip(chunks, scores)), top_n)
+        for chunks, scores, top_n in zip(chunk_lists, score_lists, top_ns)
+    ]
+
+
+def _score(query: str, chunks: list[Any], reranker: Any, score_cache: Any) -> list[float]:
+    if score_cache is not None:
+        return score_cache.score(reranker, query, chunks)
+    return reranker.score(query, [c.text for c in chunks])
+
+
+def _top_unique(scored: list[tuple[Any, float]], top_n: int) -> list[tuple[Any, float]]:
+    scored = sorted(scored, key=lambda x: x[1], reverse=True)
     # Dedupe by chunk_id (keep first occurrence) so we never return the same chunk twice
     seen_ids: set[str] = set()
     unique: list[tuple[Any, float]] = []
@@ -108,3 +281,57 @@ def hybrid_retrieve(
             seen_ids.add(cid)
             unique.append((c, s))
     return unique[:top_n]
+
+
+def hybrid_retrieve(
+    query: str,
+    bm25_index: Any,
+    dense_index: Any,
+    chunk_by_id: dict[str, Any],
+    paper_by_id: dict[str, Any],
+    k_sparse: int = K_SPARSE,
+    k_dense: int = K_DENSE,
+    top_n: int = TOP_N,
+    paper_id: str | None = None,
+    use_query_expansion: bool = True,
+    reranker: Any = None,
+    query_embedding: list[float] | None = None,
+    fusion: str = FUSION_METHOD,
+    rerank_depth: int = RERANK_DEPTH,
+    adaptive: bool = RERANK_ADAPTIVE,
+    cascade: bool = CASCADE,
+    cascade_width: int = CASCADE_WIDTH,
+) -> list[tuple[Any, float]]:
+    """
+    Run hybrid retrieval: fused BM25 + Dense ranking, an optional cheap
+    cascade stage (see cascade_prune), then MedCPT rerank of (up to, when
+    adaptive) the top rerank_depth remaining candidates.
+
+    Convenience wrapper over generate_candidates + rerank_candidates for
+    callers that already hold every chunk in memory (CLI, eval).
+
+    Returns list of (chunk, reranker_score) for top_n chunks.
+    """
+    dense_available = getattr(dense_index, "available", False)
+    if query_embedding is None and dense_available:
+        query_embedding = encode_query(query)
+    merged = generate_candidates(
+        query,
+        bm25_index,
+        dense_index,
+        k_sparse=k_sparse,
+        k_dense=k_dense,
+        paper_id=paper_id,
+        use_query_expansion=use_query_expansion,
+        query_embedding=query_embedding,
+        is_known=chunk_by_id.__contains__,
+        fusion=fusion,
+    )
+    if cascade and dense_available:
+        pool = merged[:CASCADE_POOL]
+        embeddings = dense_index.get_embeddings([cid for cid, _ in pool])
+        merged = cascade_prune(pool, query_embedding, embeddings, width=cascade_width)
+    chunks = [chunk_by_id[cid] for cid, _ in merged[:rerank_depth]]
+    if adaptive:
+        return rerank_adaptive(query, chunks, top_n=top_n, reranker=reranker)[0]
+    return rerank_candidates(query, chunks, top_n=top_n, reranker=reranker)
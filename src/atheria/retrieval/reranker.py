@@ -0,0 +1,164 @@
+"""Process-wide MedCPT cross-encoder reranker.
+
+The cross-encoder is loaded once per process (warmed from the API lifespan)
+and shared by every request thread. Tokenization goes through a lock because
+HuggingFace fast tokenizers are not safe to call concurrently; forward passes
+(eager PyTorch or ONNX Runtime, per INFERENCE_BACKEND) may overlap.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Any
+
+from transformers import AutoTokenizer
+
+from atheria.config import (
+    INFERENCE_BACKEND,
+    MEDCPT_CROSS_ENCODER,
+    RERANK_BATCH_SIZE,
+    RERANK_LATENCY_WINDOW,
+)
+from atheria.inference.backend import load_model, model_key
+
+logger = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """Scores (query, text) pairs with the MedCPT cross-encoder."""
+
+    def __init__(
+        self,
+        model_name: str = MEDCPT_CROSS_ENCODER,
+        batch_size: int = RERANK_BATCH_SIZE,
+        max_length: int = 512,
+        backend: str = INFERENCE_BACKEND,
+    ) -> None:
+        self.model_name = model_name
+        self.backend = backend
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._tokenizer: Any = None
+        self._model: Any = None
+        self._load_lock = threading.Lock()
+        self._tokenizer_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._load_seconds: float | None = None
+        self._batches = 0
+        self._pairs = 0
+        self._busy_seconds = 0.0
+        self._batch_latencies: deque[float] = deque(maxlen=RERANK_LATENCY_WINDOW)
+
+    @property
+    def model_key(self) -> str:
+        """Identifies this model and backend in cached scores."""
+        return model_key(self.model_name, self.backend)
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self) -> None:
+        """Load tokenizer and model once; concurrent callers wait for the first."""
+        if self._model is not None:
+            return
+        with self._load_lock:
+            if self._model is not None:
+                return
+            start = time.perf_counter()
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            model = load_model(self.model_name, "logit", self.backend)
+            self._tokenizer = tokenizer
+            self._model = model
+            self._load_seconds = time.perf_counter() - start
+            logger.info(
+                "Loaded cross-encoder %s (%s) in %.2fs",
+                self.model_name, self.backend, self._load_seconds,
+            )
+
+    def warm_up(self, rounds: int = 2) -> None:
+        """Load the model and run dummy batches (not counted in stats)."""
+        self.load()
+        pairs = [["warm up", "warm up"], ["warm up", "warm up " * 300]]
+        for _ in range(rounds):
+            with self._tokenizer_lock:
+                encoded = self._tokenizer(
+                    pairs,
+                    truncation=True,
+                    padding=True,
+                    return_tensors="np",
+                    max_length=self.max_length,
+                )
+            self._model(encoded)
+
+    def score(self, query: str, texts: list[str]) -> list[float]:
+        """Return one relevance score per text for the given query."""
+        return self.score_pairs([[query, t] for t in texts])
+
+    def score_pairs(
+        self,
+        pairs: list[list[str]],
+        batch_size: int | None = None,
+    ) -> list[float]:
+        """Score [[query, text], ...] pairs in batches, preserving input order."""
+        if not pairs:
+            return []
+        self.load()
+        batch_size = batch_size or self.batch_size
+        scores: list[float] = []
+        for i in range(0, len(pairs), batch_size):
+            scores.extend(self._score_batch(pairs[i : i + batch_size]))
+        return scores
+
+    def _score_batch(self, batch: list[list[str]]) -> list[float]:
+        start = time.perf_counter()
+        with self._tokenizer_lock:
+            encoded = self._tokenizer(
+                batch,
+                truncation=True,
+                padding=True,
+                return_tensors="np",
+                max_length=self.max_length,
+            )
+        scores = self._model(encoded).tolist()
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self._batches += 1
+            self._pairs += len(batch)
+            self._busy_seconds += elapsed
+            self._batch_latencies.append(elapsed)
+        return scores
+
+    def stats(self) -> dict[str, Any]:
+        """Snapshot of load time, batch latency percentiles and throughput."""
+        with self._stats_lock:
+            latencies = sorted(self._batch_latencies)
+            batches = self._batches
+            pairs = self._pairs
+            busy = self._busy_seconds
+
+        def pct(p: float) -> float | None:
+            if not latencies:
+                return None
+            idx = min(len(latencies) - 1, int(round(p * (len(latencies) - 1))))
+            return latencies[idx] * 1000.0
+
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "loaded": self.loaded,
+            "load_seconds": self._load_seconds,
+            "batches": batches,
+            "pairs": pairs,
+            "pairs_per_second": pairs / busy if busy > 0 else None,
+            "batch_latency_ms_p50": pct(0.50),
+            "batch_latency_ms_p99": pct(0.99),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_reranker() -> CrossEncoderReranker:
+    """Return the process-wide reranker (the model itself loads on first use)."""
+    return CrossEncoderReranker()
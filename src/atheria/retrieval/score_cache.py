@@ -0,0 +1,277 @@
+"""Persistent cache of cross-encoder scores for (query, chunk) pairs.
+
+Distinct queries share most of their candidates, and top_n-varying requests
+for the same query rescore the same pairs. Scores are keyed on
+(normalized query, chunk_id, chunk content hash, model key), so an edited
+chunk or a different reranker model or inference backend never reuses a
+stale score. Queries are normalized as for the query embedding cache, and
+the model key carries its normalization version. Lookups go
+to an in-process LRU first, then the rerank_scores side table (on a pooled
+reader); only the remaining pairs are sent to the cross-encoder. New scores
+are written by a background WriteBehind thread.
+
+score()/score_many() call the reranker themselves. Async callers split the
+same steps: lookup() (on a reader thread), score lookup.pairs however they
+like, then complete().
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from functools import lru_cache
+from typing import Any
+
+from atheria.config import (
+    CACHE_READ_TIMEOUT_SECONDS,
+    RERANK_SCORE_CACHE_PERSIST,
+    RERANK_SCORE_CACHE_PERSIST_MAX,
+    RERANK_SCORE_CACHE_SIZE,
+)
+from atheria.db.pool import ConnectionPool, PoolTimeout, get_connection_pool
+from atheria.db.write_behind import WriteBehind, is_schema_error
+from atheria.index.query_cache import cache_model_tag, normalize_query
+
+logger = logging.getLogger(__name__)
+
+
+_Key = tuple[str, str, str, str]  # (normalized query, chunk_id, content hash, model)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def reranker_key(reranker: Any) -> str:
+    """Model key scores from this reranker are cached under."""
+    return cache_model_tag(getattr(reranker, "model_key", type(reranker).__name__))
+
+
+class PairLookup:
+    """Cached scores for some (query, chunks) items and the pairs still to score."""
+
+    __slots__ = ("sizes", "keys", "scores", "missing", "todo", "pairs")
+
+    def __init__(self, sizes: list[int], keys: list[_Key], scores: list[float | None]) -> None:
+        self.sizes = sizes
+        self.keys = keys
+        self.scores = scores
+        # Indices the in-memory LRU did not have
+        self.missing = [i for i, s in enumerate(scores) if s is None]
+        # First index of each pair still unscored after the side table; filled by lookup()
+        self.todo: dict[_Key, int] = {}
+        self.pairs: list[list[str]] = []
+
+
+class PairScoreCache:
+    """Thread-safe LRU of pair scores with an optional SQLite side table."""
+
+    def __init__(
+        self,
+        max_entries: int = RERANK_SCORE_CACHE_SIZE,
+        pool: ConnectionPool | None = None,
+        persist: bool = RERANK_SCORE_CACHE_PERSIST,
+        persist_max: int = RERANK_SCORE_CACHE_PERSIST_MAX,
+    ) -> None:
+        self.max_entries = max_entries
+        self.persist_max = persist_max
+        self._entries: OrderedDict[_Key, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = pool
+        self._persist = persist
+        self._writer = WriteBehind(
+            "rerank-score-cache", self._flush, self._disable_persistence, pool=pool
+        )
+        self._writes_since_prune = 0
+        self._skipped_loads = 0
+        self._hits = 0
+        self._persisted_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def score(self, reranker: Any, query: str, chunks: list[Any]) -> list[float]:
+        """Scores for every chunk, sending only uncached pairs to the reranker."""
+        return self.score_many(reranker, [(query, chunks)])[0]
+
+    def score_many(
+        self, reranker: Any, items: list[tuple[str, list[Any]]]
+    ) -> list[list[float]]:
+        """Scores for several (query, chunks) items.
+
+        Uncached pairs from every item go to reranker.score_pairs in one call,
+        so they share cross-encoder batches.
+        """
+        lookup = self.lookup(reranker_key(reranker), items)
+        fresh = reranker.score_pairs(lookup.pairs) if lookup.pairs else []
+        return self.complete(lookup, fresh)
+
+    def lookup(
+        self,
+        model: str,
+        items: list[tuple[str, list[Any]]],
+        conn: sqlite3.Connection | None = None,
+    ) -> PairLookup:
+        """Scores the LRU or the side table already has for items.
+
+        conn, if given, serves the side-table reads (e.g. a reader-pool
+        thread's connection) instead of a leased pooled reader. The pairs
+        left to score are in the returned lookup's .pairs, each pair once.
+        """
+        keys: list[_Key] = []
+        pairs: list[list[str]] = []
+        for query, chunks in items:
+            qnorm = normalize_query(query)
+            for c in chunks:
+                keys.append((qnorm, c.chunk_id, content_hash(c.text), model))
+                pairs.append([query, c.text])
+
+        scores: list[float | None] = [None] * len(keys)
+        with self._lock:
+            for i, key in enumerate(keys):
+                s = self._entries.get(key)
+                if s is not None:
+                    self._entries.move_to_end(key)
+                    scores[i] = s
+            self._hits += sum(s is not None for s in scores)
+        lookup = PairLookup([len(chunks) for _, chunks in items], keys, scores)
+
+        by_query: dict[str, list[_Key]] = {}
+        for i in lookup.missing:
+            by_query.setdefault(keys[i][0], []).append(keys[i])
+        stored: dict[_Key, float] = {}
+        for qnorm, query_keys in by_query.items():
+            stored.update(self._load(qnorm, model, query_keys, conn))
+        for i in lookup.missing:
+            if keys[i] in stored:
+                scores[i] = stored[keys[i]]
+
+        # A pair repeated across items (the same query twice in a batch) is scored once
+        for i, s in enumerate(scores):
+            if s is None:
+                lookup.todo.setdefault(keys[i], i)
+        lookup.pairs = [pairs[i] for i in lookup.todo.values()]
+        return lookup
+
+    def complete(self, lookup: PairLookup, fresh: list[float]) -> list[list[float]]:
+        """Fill in fresh scores for lookup.pairs, cache them, and return
+        each item's scores."""
+        new = dict(zip(lookup.todo, fresh))
+        scores = lookup.scores
+        n_todo = 0
+        for i, s in enumerate(scores):
+            if s is None:
+                scores[i] = new[lookup.keys[i]]
+                n_todo += 1
+        self._store(new)
+
+        with self._lock:
+            self._persisted_hits += len(lookup.missing) - n_todo
+            self._misses += len(new)
+            for i in lookup.missing:
+                self._entries[lookup.keys[i]] = scores[i]
+                self._entries.move_to_end(lookup.keys[i])
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+        out: list[list[float]] = []
+        offset = 0
+        for size in lookup.sizes:
+            out.append(scores[offset : offset + size])  # type: ignore[arg-type]
+            offset += size
+        return out
+
+    # -- persistence -------------------------------------------------------
+
+    def _load(
+        self,
+        qnorm: str,
+        model: str,
+        keys: list[_Key],
+        conn: sqlite3.Connection | None = None,
+    ) -> dict[_Key, float]:
+        """Stored scores for keys; empty when none are stored or the lookup is skipped."""
+        if not self._persist:
+            return {}
+        wanted = set(keys)
+        placeholders = ",".join("?" * len(keys))
+        lease = (
+            nullcontext(conn)
+            if conn is not None
+            else (self._pool or get_connection_pool()).reader(CACHE_READ_TIMEOUT_SECONDS)
+        )
+        try:
+            with lease as conn:
+                rows = conn.execute(
+                    f"""SELECT chunk_id, content_hash, score FROM rerank_scores
+                        WHERE query_norm = ? AND model = ? AND chunk_id IN ({placeholders})""",
+                    [qnorm, model, *[k[1] for k in keys]],
+                ).fetchall()
+        except (sqlite3.Error, PoolTimeout, RuntimeError) as exc:
+            if is_schema_error(exc):
+                self._disable_persistence()
+            else:
+                # Locked, busy or no reader free: skip the persisted lookup only
+                with self._lock:
+                    self._skipped_loads += 1
+            return {}
+        found = {(qnorm, r[0], r[1], model): r[2] for r in rows}
+        return {k: s for k, s in found.items() if k in wanted}
+
+    def _store(self, new: dict[_Key, float]) -> None:
+        if new and self._persist:
+            now = time.time()
+            self._writer.put([(*key, score, now) for key, score in new.items()])
+
+    def _flush(self, conn: sqlite3.Connection, rows: list[tuple]) -> None:
+        """Write one batch on the pool writer (WriteBehind thread only)."""
+        conn.executemany(
+            """INSERT OR REPLACE INTO rerank_scores
+               (query_norm, chunk_id, content_hash, model, score, created_at)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
+        self._writes_since_prune += len(rows)
+        if self._writes_since_prune >= 10_000:
+            self._writes_since_prune = 0
+            conn.execute(
+                """DELETE FROM rerank_scores WHERE rowid IN (
+                       SELECT rowid FROM rerank_scores ORDER BY created_at DESC
+                       LIMIT -1 OFFSET ?)""",
+                [self.persist_max],
+            )
+
+    def _disable_persistence(self) -> None:
+        logger.warning("Rerank score cache: SQLite side table unavailable; using memory only.")
+        self._persist = False
+
+    def close(self) -> None:
+        """Flush queued side-table writes."""
+        self._writer.close()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            saved = self._hits + self._persisted_hits
+            lookups = saved + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "persisted": self._persist,
+                "skipped_loads": self._skipped_loads,
+                "writes": self._writer.stats(),
+                "hits": self._hits,
+                "persisted_hits": self._persisted_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": saved / lookups if lookups else None,
+                "pairs_saved": saved,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_pair_score_cache() -> PairScoreCache:
+    """Return the process-wide rerank score cache."""
+    return PairScoreCache()
@@ -11,3 +11,20 @@ class IngestResponse(BaseModel):
     papers_indexed: int
     chunks_indexed: int
     paper_ids: list[str]
+
+
+class IngestJobOut(BaseModel):
+    job_id: str
+    input_path: str
+    status: str  # queued, running, done, failed
+    stage: str  # status, or the running stage (planning, parsing, encoding, ...)
+    total_files: int
+    processed_files: int  # includes skipped (unchanged) files
+    skipped_files: int
+    papers_indexed: int
+    chunks_indexed: int
+    chunks_per_second: float | None = None
+    encode_seconds: float
+    elapsed_seconds: float
+    errors: list[str] = []
+    paper_ids: list[str] = []
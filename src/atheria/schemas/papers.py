@@ -1,5 +1,7 @@
 """Pydantic schemas for papers and chunks endpoints."""
 
+from typing import Any
+
 from pydantic import BaseModel
 
 
@@ -30,6 +32,8 @@ class ChunkContextOut(BaseModel):
 
 class HealthOut(BaseModel):
     status: str
+    ready: bool = True  # models loaded and warmed; False responds 503
     paper_count: int
     chunk_count: int
     vec_count: int
+    metrics: dict[str, dict[str, Any]] = {}
@@ -4,12 +4,18 @@ from typing import Literal
 
 from pydantic import BaseModel, Field
 
+from atheria.config import QUERY_BATCH_MAX
+
 
 class QueryRequest(BaseModel):
     query: str = Field(..., min_length=1, max_length=1000)
     paper_id: str | None = None
     top_n: int = Field(default=8, ge=1, le=20)
     use_query_expansion: bool = True
+    # Max (query, chunk) pairs sent to the cross-encoder; default RERANK_DEPTH, max K_MERGE.
+    # With CASCADE on, an explicit budget also sets the cascade width; metadata
+    # reports the budget capped at the candidates that survive.
+    rerank_budget: int | None = Field(default=None, ge=1, le=100)
 
 
 class SectionPointerOut(BaseModel):
@@ -26,7 +32,38 @@ class SectionPointerOut(BaseModel):
     reranker_score: float
 
 
+class QueryMetadata(BaseModel):
+    candidates: int  # fused candidates from BM25 + dense
+    cascade_survivors: int | None = None  # left after the first cascade stage, if enabled
+    rerank_budget: int
+    pairs_scored: int  # (query, chunk) pairs scored, including score-cache hits
+    early_stopped: bool
+
+
 class QueryResponse(BaseModel):
     results: list[SectionPointerOut]
     query_used: str
     total: int
+    metadata: QueryMetadata | None = None
+
+
+class QueryStreamEvent(BaseModel):
+    """One NDJSON line of /api/query/stream.
+
+    "candidates" carries first-stage hits (reranker_score holds the
+    first-stage score, confidence is "low"); "results" the reranked response.
+    """
+
+    event: Literal["candidates", "results"]
+    response: QueryResponse
+
+
+class QueryBatchRequest(BaseModel):
+    queries: list[QueryRequest] = Field(..., min_length=1, max_length=QUERY_BATCH_MAX)
+
+
+class QueryBatchItem(BaseModel):
+    """One NDJSON line of a batch response; index is the position in the request."""
+
+    index: int
+    response: QueryResponse
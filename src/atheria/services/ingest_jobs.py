@@ -0,0 +1,158 @@
+"""Background ingest jobs: bounded worker pool, progress tracking, encoder cap.
+
+POST /api/ingest enqueues a job and returns immediately; jobs run on a small
+thread pool so request workers are never tied up by parsing and MedCPT
+encoding. Article encoding is additionally gated by a semaphore shared by all
+jobs, so concurrent ingests cannot saturate the CPU that queries need.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from atheria.config import (
+    INGEST_JOB_HISTORY,
+    INGEST_JOB_WORKERS,
+    INGEST_MAX_ENCODE_JOBS,
+    INGEST_MAX_PENDING_JOBS,
+)
+from atheria.index.build_index import IngestProgress
+from atheria.models.chunk import Chunk
+from atheria.schemas.ingest import IngestJobOut, IngestResponse
+from atheria.services.ingest_service import IngestService
+
+logger = logging.getLogger(__name__)
+
+
+class IngestQueueFull(RuntimeError):
+    """Raised when too many ingest jobs are queued or running."""
+
+
+@dataclass
+class IngestJob:
+    job_id: str
+    input_path: str
+    status: str = "queued"  # queued, running, done, failed
+    progress: IngestProgress = field(default_factory=IngestProgress)
+    result: IngestResponse | None = None
+    error: str | None = None
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    def to_out(self) -> IngestJobOut:
+        p = self.progress
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        errors = list(p.errors) + ([self.error] if self.error else [])
+        return IngestJobOut(
+            job_id=self.job_id,
+            input_path=self.input_path,
+            status=self.status,
+            stage=p.stage if self.status == "running" else self.status,
+            total_files=p.total_files,
+            processed_files=p.processed_files + p.skipped_files,
+            skipped_files=p.skipped_files,
+            papers_indexed=p.papers_indexed,
+            chunks_indexed=p.chunks_indexed,
+            chunks_per_second=p.chunks_indexed / elapsed if elapsed > 0 else None,
+            encode_seconds=p.encode_seconds,
+            elapsed_seconds=elapsed,
+            errors=errors,
+            paper_ids=self.result.paper_ids if self.result else [],
+        )
+
+
+class IngestJobManager:
+    """Runs ingest jobs on a bounded thread pool and keeps their status."""
+
+    def __init__(
+        self,
+        on_chunks_indexed: Callable[[list[Chunk], list[str]], None] | None = None,
+        workers: int = INGEST_JOB_WORKERS,
+        max_encode_jobs: int = INGEST_MAX_ENCODE_JOBS,
+        max_pending: int = INGEST_MAX_PENDING_JOBS,
+        history: int = INGEST_JOB_HISTORY,
+    ) -> None:
+        self._on_chunks_indexed = on_chunks_indexed
+        self.workers = workers
+        self.max_pending = max_pending
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest-job")
+        self._encode_slots = threading.BoundedSemaphore(max_encode_jobs)
+        self.max_encode_jobs = max_encode_jobs
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[str, IngestJob] = OrderedDict()
+        self._pending = 0
+        self._completed = 0
+        self._failed = 0
+
+    def submit(self, input_path: str) -> IngestJob:
+        """Enqueue an ingest of input_path; raises IngestQueueFull at capacity."""
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise IngestQueueFull(
+                    f"{self._pending} ingest job(s) already queued or running"
+                )
+            job = IngestJob(job_id=uuid.uuid4().hex, input_path=input_path)
+            self._jobs[job.job_id] = job
+            self._pending += 1
+            self._trim_history()
+        self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> IngestJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: IngestJob) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            svc = IngestService(on_chunks_indexed=self._on_chunks_indexed)
+            job.result = svc.run(
+                job.input_path, progress=job.progress, encode_slot=self._encode_slots
+            )
+            job.status = "done"
+        except Exception as exc:
+            logger.exception("Ingest job %s failed", job.job_id)
+            job.error = f"{type(exc).__name__}: {exc}"
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._pending -= 1
+                if job.status == "done":
+                    self._completed += 1
+                else:
+                    self._failed += 1
+
+    def _trim_history(self) -> None:
+        """Forget the oldest finished jobs beyond the history bound (lock held)."""
+        excess = len(self._jobs) - self.history
+        if excess <= 0:
+            return
+        for job_id in [j.job_id for j in self._jobs.values() if j.finished_at][:excess]:
+            del self._jobs[job_id]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            running = sum(1 for j in self._jobs.values() if j.status == "running")
+            return {
+                "workers": self.workers,
+                "max_encode_jobs": self.max_encode_jobs,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "running": running,
+                "queued": self._pending - running,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
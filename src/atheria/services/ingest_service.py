@@ -1,16 +1,45 @@
 """Orchestrates the parse + chunk + index pipeline."""
 
+from contextlib import AbstractContextManager
 from pathlib import Path
+from typing import Callable
 
-from atheria.index.build_index import build_index
+from atheria.db.pool import ConnectionPool, get_connection_pool
+from atheria.index.build_index import IngestProgress, iter_index_windows
+from atheria.models.chunk import Chunk
 from atheria.schemas.ingest import IngestResponse
 
 
 class IngestService:
-    def run(self, input_path: str) -> IngestResponse:
-        papers, chunks = build_index(input_path)
+    def __init__(
+        self,
+        on_chunks_indexed: Callable[[list[Chunk], list[str]], None] | None = None,
+        pool: ConnectionPool | None = None,
+    ) -> None:
+        self._on_chunks_indexed = on_chunks_indexed
+        self._pool = pool or get_connection_pool()
+
+    def run(
+        self,
+        input_path: str,
+        progress: IngestProgress | None = None,
+        encode_slot: AbstractContextManager | None = None,
+    ) -> IngestResponse:
+        paper_ids: list[str] = []
+        n_chunks = 0
+        # Each window is committed before the next is parsed; publish its
+        # chunks right away so they are searchable while the rest ingests.
+        # The pool's single writer is leased per write transaction, so
+        # concurrent jobs parse and encode in parallel and only queue to commit.
+        for papers, chunks, removed_ids in iter_index_windows(
+            input_path, progress=progress, encode_slot=encode_slot, writer=self._pool.writer
+        ):
+            if self._on_chunks_indexed is not None and (chunks or removed_ids):
+                self._on_chunks_indexed(chunks, removed_ids)
+            paper_ids.extend(str(p.paper_id) for p in papers)
+            n_chunks += len(chunks)
         return IngestResponse(
-            papers_indexed=len(papers),
-            chunks_indexed=len(chunks),
-            paper_ids=[str(p.paper_id) for p in papers],
+            papers_indexed=len(paper_ids),
+            chunks_indexed=n_chunks,
+            paper_ids=paper_ids,
         )
@@ -1,14 +1,56 @@
 """Orchestrates the hybrid retrieval pipeline with injected DB and models."""
 
 import sqlite3
+from typing import AsyncIterator, Awaitable, Callable, Iterator, TypeVar
 
+from atheria.config import (
+    CASCADE,
+    CASCADE_KEEP_FUSED,
+    CASCADE_POOL,
+    CASCADE_WIDTH,
+    QUERY_BATCH_GROUP,
+    RERANK_ADAPTIVE,
+    RERANK_BATCHING,
+    RERANK_DEPTH,
+    RERANK_SCORE_CACHE,
+)
+from atheria.db.readers import ReaderPool, get_reader_pool
 from atheria.db.repositories.chunk_repo import ChunkRepository
 from atheria.db.repositories.paper_repo import PaperRepository
 from atheria.index.bm25_index import BM25Index
-from atheria.index.dense_index import SqliteVecAdapter
+from atheria.index.dense_index import (
+    SqliteVecAdapter,
+    cached_query_embedding,
+    encode_and_cache_query,
+    encode_queries,
+    encode_query,
+)
+from atheria.inference.executor import InferenceExecutor, get_inference_executor
+from atheria.models.chunk import Chunk
+from atheria.models.paper import Paper
+from atheria.retrieval.batching import get_rerank_batcher
 from atheria.retrieval.formatter import format_results
-from atheria.retrieval.hybrid import expand_query, hybrid_retrieve
-from atheria.schemas.query import QueryRequest, QueryResponse, SectionPointerOut
+from atheria.retrieval.hybrid import (
+    cascade_prune,
+    expand_query,
+    generate_candidates,
+    rerank_adaptive,
+    rerank_adaptive_async,
+    rerank_candidates,
+    rerank_candidates_async,
+    rerank_pooled,
+)
+from atheria.retrieval.reranker import get_reranker
+from atheria.retrieval.score_cache import get_pair_score_cache, reranker_key
+from atheria.schemas.query import (
+    QueryMetadata,
+    QueryRequest,
+    QueryResponse,
+    QueryStreamEvent,
+    SectionPointerOut,
+)
+
+T = TypeVar("T")
 
 
 class QueryService:
@@ -22,29 +64,183 @@ class QueryService:
         self._dense = SqliteVecAdapter(conn)
 
     def search(self, request: QueryRequest) -> QueryResponse:
-        paper_repo = PaperRepository(self._conn)
-        chunk_repo = ChunkRepository(self._conn)
+        # Encode the query once; the dense index reuses this vector.
+        query_embedding = encode_query(request.query) if self._dense.available else None
+        merged, survivors, budget, chunks = self._first_stage(request, query_embedding)
+        return self._rerank(request, merged, survivors, budget, chunks)
+
+    def _first_stage(
+        self,
+        request: QueryRequest,
+        query_embedding: list[float] | None,
+    ) -> tuple[list[tuple[str, float]], list[tuple[str, float]], int, list[Chunk]]:
+        """Candidates, cascade survivors, rerank budget and the hydrated head."""
+        merged, survivors, budget = self._candidates(request, query_embedding)
+        # Hydrate only the candidates we may rerank, then only the papers we return.
+        return merged, survivors, budget, self._hydrate([survivors[:budget]])[0]
 
-        paper_by_id = paper_repo.get_all_as_dict()
+    def _preview(
+        self,
+        request: QueryRequest,
+        merged: list[tuple[str, float]],
+        survivors: list[tuple[str, float]],
+        budget: int,
+        chunks: list[Chunk],
+    ) -> QueryResponse:
+        """The top_n first-stage hits as a provisional response."""
+        first_stage = dict(survivors[:budget])
+        preview = [(c, first_stage[c.chunk_id]) for c in chunks[: request.top_n]]
+        return self._response(
+            request, preview, self._papers([preview]),
+            self._metadata(merged, survivors, budget, pairs_scored=0),
+            confidence="low",
+        )
 
-        # BM25 + dense retrieval via hybrid_retrieve uses chunk_by_id for hydration.
-        # We load all chunks lazily; for large indexes consider loading only candidates.
-        chunk_by_id = chunk_repo.get_chunks_by_ids(
-            [cid for cid, _ in self._bm25.retrieve(request.query, k=200)]
-            + [cid for cid, _ in self._dense.retrieve(request.query, k=200, paper_id=request.paper_id)]
+    def _rerank(
+        self,
+        request: QueryRequest,
+        merged: list[tuple[str, float]],
+        survivors: list[tuple[str, float]],
+        budget: int,
+        chunks: list[Chunk],
+    ) -> QueryResponse:
+        """Cross-encoder pass over the hydrated head and the final response."""
+        scored, pairs_scored = self._score(request, chunks)
+        return self._response(
+            request, scored, self._papers([scored]),
+            self._metadata(
+                merged, survivors, budget, pairs_scored, early_stopped=pairs_scored < len(chunks)
+            ),
         )
 
-        scored = hybrid_retrieve(
+    @staticmethod
+    def _score(request: QueryRequest, chunks: list[Chunk]) -> tuple[list[tuple[Chunk, float]], int]:
+        """Rerank the hydrated head; returns (top_n scored chunks, pairs scored)."""
+        reranker = get_rerank_batcher() if RERANK_BATCHING else None
+        score_cache = get_pair_score_cache() if RERANK_SCORE_CACHE else None
+        if RERANK_ADAPTIVE:
+            return rerank_adaptive(
+                request.query, chunks, top_n=request.top_n, reranker=reranker, score_cache=score_cache
+            )
+        scored = rerank_candidates(
+            request.query, chunks, top_n=request.top_n, reranker=reranker, score_cache=score_cache
+        )
+        return scored, len(chunks)
+
+    def search_batch(
+        self,
+        requests: list[QueryRequest],
+        group_size: int = QUERY_BATCH_GROUP,
+    ) -> Iterator[QueryResponse]:
+        """Answer many requests, yielding responses in request order.
+
+        Each group of requests gets one batched query-encoder pass, BM25 + KNN
+        (and the cascade) per query, then one pooled cross-encoder call over
+        every query's candidates. The adaptive cutoff is not used: it scores
+        step by step per query, while pooling keeps the batches large.
+
+        Pooled pairs go straight to the cross-encoder, not the rerank batcher:
+        a group is already hundreds of pairs in full RERANK_BATCH_SIZE batches,
+        and as one batcher request it could exceed RERANK_RESULT_TIMEOUT_SECONDS
+        on CPU and fail the rest of the batch.
+        """
+        reranker = get_reranker()
+        score_cache = get_pair_score_cache() if RERANK_SCORE_CACHE else None
+        for start in range(0, len(requests), group_size):
+            group = requests[start : start + group_size]
+            if self._dense.available:
+                embeddings = encode_queries([r.query for r in group])
+            else:
+                embeddings = [None] * len(group)
+            plans = [self._candidates(r, e) for r, e in zip(group, embeddings)]
+            chunk_lists = self._hydrate([survivors[:budget] for _, survivors, budget in plans])
+            scored_lists = rerank_pooled(
+                [r.query for r in group],
+                chunk_lists,
+                [r.top_n for r in group],
+                reranker=reranker,
+                score_cache=score_cache,
+            )
+            paper_by_id = self._papers(scored_lists)
+            for request, (merged, survivors, budget), chunks, scored in zip(
+                group, plans, chunk_lists, scored_lists
+            ):
+                yield self._response(
+                    request, scored, paper_by_id,
+                    self._metadata(merged, survivors, budget, pairs_scored=len(chunks)),
+                )
+
+    def _candidates(
+        self,
+        request: QueryRequest,
+        query_embedding: list[float] | None,
+    ) -> tuple[list[tuple[str, float]], list[tuple[str, float]], int]:
+        """Fused candidates, cascade survivors and the rerank budget for one request."""
+        # Single pass of BM25 + dense candidate generation.
+        merged = generate_candidates(
             request.query,
             self._bm25,
             self._dense,
-            chunk_by_id,
-            paper_by_id,
-            top_n=request.top_n,
             paper_id=request.paper_id,
             use_query_expansion=request.use_query_expansion,
+            query_embedding=query_embedding,
+        )
+
+        # Cheap first stage over stored article vectors prunes the fused list.
+        # An explicit rerank budget widens (or narrows) the cascade to match, so
+        # it is not silently capped at CASCADE_WIDTH + CASCADE_KEEP_FUSED.
+        budget = request.rerank_budget or RERANK_DEPTH
+        survivors = merged
+        if CASCADE and query_embedding is not None:
+            pool = merged[:CASCADE_POOL]
+            embeddings = self._dense.get_embeddings([cid for cid, _ in pool])
+            width = (
+                max(0, request.rerank_budget - CASCADE_KEEP_FUSED)
+                if request.rerank_budget
+                else CASCADE_WIDTH
+            )
+            survivors = cascade_prune(pool, query_embedding, embeddings, width=width)
+        # Report the depth actually available to the cross-encoder
+        return merged, survivors, min(budget, len(survivors))
+
+    def _papers(self, scored_lists: list[list[tuple[Chunk, float]]]) -> dict[str, Paper]:
+        """Papers for every chunk in the scored lists, with one repository call."""
+        return PaperRepository(self._conn).get_by_ids(
+            sorted({str(c.paper_id) for scored in scored_lists for c, _ in scored})
         )
 
+    def _hydrate(self, heads: list[list[tuple[str, float]]]) -> list[list[Chunk]]:
+        """Load the chunks for each ranked head with one repository call."""
+        chunk_by_id = ChunkRepository(self._conn).get_chunks_by_ids(
+            sorted({cid for head in heads for cid, _ in head})
+        )
+        return [[chunk_by_id[cid] for cid, _ in head if cid in chunk_by_id] for head in heads]
+
+    @staticmethod
+    def _metadata(
+        merged: list[tuple[str, float]],
+        survivors: list[tuple[str, float]],
+        budget: int,
+        pairs_scored: int,
+        early_stopped: bool = False,
+    ) -> QueryMetadata:
+        return QueryMetadata(
+            candidates=len(merged),
+            cascade_survivors=len(survivors) if survivors is not merged else None,
+            rerank_budget=budget,
+            pairs_scored=pairs_scored,
+            early_stopped=early_stopped,
+        )
+
+    @staticmethod
+    def _response(
+        request: QueryRequest,
+        scored: list[tuple[Chunk, float]],
+        paper_by_id: dict[str, Paper],
+        metadata: QueryMetadata,
+        confidence: str | None = None,
+    ) -> QueryResponse:
+        """Build the response; confidence, if given, overrides the score-gap confidence."""
         formatted = format_results(scored, paper_by_id)
         query_used = expand_query(request.query) if request.use_query_expansion else request.query
 
@@ -59,7 +255,7 @@ class QueryService:
                     page_start=sp.page_start,
                     page_end=sp.page_end,
                     snippets=sp.snippets,
-                    confidence=sp.confidence,
+                    confidence=confidence or sp.confidence,
                     chunk_id=sp.chunk_id,
                     reranker_score=sp.reranker_score,
                 )
@@ -67,4 +263,107 @@ class QueryService:
             ],
             query_used=query_used,
             total=len(formatted),
+            metadata=metadata,
         )
+
+
+class AsyncQueryService:
+    """Runs QueryService's stages for async request handlers.
+
+    SQLite work (candidate generation, hydration, paper lookup, and the
+    query-embedding and rerank-score cache lookups) goes to the reader pool,
+    whose threads each own a connection; query encoding and unbatched
+    reranking go to the inference executor. With RERANK_BATCHING on, uncached
+    pairs are awaited on the rerank batcher directly, so no thread waits for
+    a batch to fill. The event loop only awaits.
+    """
+
+    def __init__(
+        self,
+        bm25: BM25Index,
+        readers: ReaderPool | None = None,
+        inference: InferenceExecutor | None = None,
+    ) -> None:
+        self._bm25 = bm25
+        self._readers = readers or get_reader_pool()
+        self._inference = inference or get_inference_executor()
+
+    def _db(self, fn: Callable[[QueryService], T]) -> Awaitable[T]:
+        return self._readers.run(lambda conn: fn(QueryService(conn, self._bm25)))
+
+    async def search(self, request: QueryRequest) -> QueryResponse:
+        merged, survivors, budget, chunks = await self._first_stage(request)
+        return await self._rerank(request, merged, survivors, budget, chunks)
+
+    async def search_stream(self, request: QueryRequest) -> AsyncIterator[QueryStreamEvent]:
+        """Yield a "candidates" event as soon as first-stage retrieval is done,
+        then the reranked "results" event (the same response as search()).
+
+        Candidate results are the top_n first-stage hits in first-stage order;
+        their reranker_score holds the first-stage score and their confidence
+        is "low" until the cross-encoder has run.
+        """
+        merged, survivors, budget, chunks = await self._first_stage(request)
+        preview = await self._db(lambda svc: svc._preview(request, merged, survivors, budget, chunks))
+        yield QueryStreamEvent(event="candidates", response=preview)
+        yield QueryStreamEvent(
+            event="results", response=await self._rerank(request, merged, survivors, budget, chunks)
+        )
+
+    async def _first_stage(
+        self, request: QueryRequest
+    ) -> tuple[list[tuple[str, float]], list[tuple[str, float]], int, list[Chunk]]:
+        # One reader call checks for the vector table and the embedding cache;
+        # only a cache miss occupies an inference thread
+        available, query_embedding = await self._db(
+            lambda svc: (
+                (True, cached_query_embedding(request.query, svc._conn))
+                if svc._dense.available
+                else (False, None)
+            )
+        )
+        if available and query_embedding is None:
+            query_embedding = await self._inference.run(encode_and_cache_query, request.query)
+        return await self._db(lambda svc: svc._first_stage(request, query_embedding))
+
+    async def _rerank(
+        self,
+        request: QueryRequest,
+        merged: list[tuple[str, float]],
+        survivors: list[tuple[str, float]],
+        budget: int,
+        chunks: list[Chunk],
+    ) -> QueryResponse:
+        if RERANK_ADAPTIVE:
+            scored, pairs_scored = await rerank_adaptive_async(
+                request.query, chunks, self._score_chunks, top_n=request.top_n
+            )
+        else:
+            scored = await rerank_candidates_async(
+                request.query, chunks, self._score_chunks, top_n=request.top_n
+            )
+            pairs_scored = len(chunks)
+        paper_by_id = await self._db(lambda svc: svc._papers([scored]))
+        return QueryService._response(
+            request, scored, paper_by_id,
+            QueryService._metadata(
+                merged, survivors, budget, pairs_scored, early_stopped=pairs_scored < len(chunks)
+            ),
+        )
+
+    async def _score_chunks(self, query: str, chunks: list[Chunk]) -> list[float]:
+        """Cross-encoder scores for chunks, consulting the rerank score cache."""
+        score_cache = get_pair_score_cache() if RERANK_SCORE_CACHE else None
+        if score_cache is None:
+            return await self._score_pairs([[query, c.text] for c in chunks])
+        model = reranker_key(get_rerank_batcher() if RERANK_BATCHING else get_reranker())
+        lookup = await self._readers.run(
+            lambda conn: score_cache.lookup(model, [(query, chunks)], conn)
+        )
+        fresh = await self._score_pairs(lookup.pairs) if lookup.pairs else []
+        return score_cache.complete(lookup, fresh)[0]
+
+    async def _score_pairs(self, pairs: list[list[str]]) -> list[float]:
+        if RERANK_BATCHING:
+            return await get_rerank_batcher().score_pairs_async(pairs)
+        return await self._inference.run(get_reranker().score_pairs, pairs)
@@ -0,0 +1,102 @@
+"""End-to-end cache of /api/query responses.
+
+Entries are keyed on every QueryRequest field plus the index generation, a
+counter bumped whenever ingest changes the live index, so a cached response
+can never outlive the index it was computed from. Entries also expire after
+a TTL (covering writes made by other processes, e.g. the CLI) and the cache
+is size-bounded with LRU eviction.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+from atheria.config import QUERY_RESULT_CACHE_SIZE, QUERY_RESULT_CACHE_TTL_SECONDS
+from atheria.schemas.query import QueryRequest, QueryResponse
+
+
+class QueryResultCache:
+    """Thread-safe TTL + LRU cache of QueryResponses."""
+
+    def __init__(
+        self,
+        max_entries: int = QUERY_RESULT_CACHE_SIZE,
+        ttl_seconds: float = QUERY_RESULT_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, QueryResponse]] = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def key(request: QueryRequest) -> str:
+        return json.dumps(request.model_dump(), sort_keys=True)
+
+    def get(self, request: QueryRequest, generation: int) -> QueryResponse | None:
+        key = self.key(request)
+        with self._lock:
+            self._sync_generation(generation)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            expires_at, response = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._expirations += 1
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return response
+
+    def put(self, request: QueryRequest, generation: int, response: QueryResponse) -> None:
+        key = self.key(request)
+        with self._lock:
+            self._sync_generation(generation)
+            if generation != self._generation:
+                return  # computed against an index that has since changed
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def _sync_generation(self, generation: int) -> None:
+        """Drop every entry once a newer index generation is seen (lock held)."""
+        if generation > self._generation:
+            self._generation = generation
+            if self._entries:
+                self._entries.clear()
+                self._invalidations += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "generation": self._generation,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else None,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
+
+
+@lru_cache(maxsize=1)
+def get_query_result_cache() -> QueryResultCache:
+    """Return the process-wide query result cache."""
+    return QueryResultCache()
@@ -0,0 +1,90 @@
+"""Model warm-up at API startup.
+
+The query encoder, cross-encoder and article encoder are loaded lazily on
+first use, which would make the first requests after a deploy pay
+multi-second model loads and first-call setup. The API lifespan starts a
+ModelWarmup, which loads each model and runs dummy forward passes on a
+background thread; /api/health reports not-ready (503) until it finishes,
+so a load balancer only routes traffic to warm instances.
+"""
+
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable
+
+from atheria.config import MODEL_WARMUP_ROUNDS
+from atheria.index.dense_index import warm_up_article_encoder, warm_up_query_encoder
+from atheria.retrieval.reranker import get_reranker
+
+logger = logging.getLogger(__name__)
+
+
+class ModelWarmup:
+    """Loads and warms the models once; tracks status for /api/health."""
+
+    def __init__(self, rounds: int = MODEL_WARMUP_ROUNDS) -> None:
+        self.rounds = rounds
+        self.status = "pending"  # pending, warming, ready, failed
+        self.error: str | None = None
+        self.threads: dict[str, int] = {}
+        self._seconds: dict[str, float] = {}
+        self._thread: threading.Thread | None = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def start(self, threads: dict[str, int] | None = None) -> None:
+        """Warm up on a background thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self.threads = threads or {}
+            self.status = "warming"
+            self._thread = threading.Thread(target=self.run, name="model-warmup", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until warm-up finishes; returns whether it is ready."""
+        self._done.wait(timeout)
+        return self.ready
+
+    def run(self) -> None:
+        steps: list[tuple[str, Callable[[int], None]]] = [
+            ("query_encoder", warm_up_query_encoder),
+            ("cross_encoder", get_reranker().warm_up),
+            ("article_encoder", warm_up_article_encoder),
+        ]
+        self.status = "warming"
+        try:
+            for name, warm_up in steps:
+                start = time.perf_counter()
+                warm_up(self.rounds)
+                self._seconds[name] = time.perf_counter() - start
+                logger.info("Warm-up: %s ready in %.2fs", name, self._seconds[name])
+            self.status = "ready"
+        except Exception as exc:
+            logger.exception("Model warm-up failed")
+            self.error = f"{type(exc).__name__}: {exc}"
+            self.status = "failed"
+        finally:
+            self._done.set()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "rounds": self.rounds,
+            "seconds": dict(self._seconds),
+            **self.threads,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_model_warmup() -> ModelWarmup:
+    """Return the process-wide model warm-up tracker."""
+    return ModelWarmup()